@@ -1,21 +1,42 @@
 """PPO agent builders used in the RMSA demo."""
 from __future__ import annotations
 
+import shutil
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 import torch
 import torch.nn as nn
 from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import EvalCallback
+from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
 from stable_baselines3.common.torch_layers import MlpExtractor
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
 from stable_baselines3.ppo.policies import MlpPolicy
 
+try:
+    from sb3_contrib import MaskablePPO
+    from sb3_contrib.common.maskable.callbacks import MaskableEvalCallback
+    from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
+except ImportError:  # pragma: no cover - optional dependency
+    MaskablePPO = None
+    MaskableEvalCallback = None
+    MaskableActorCriticPolicy = None
+
+from checkpointing import (
+    AtomicCheckpointCallback,
+    archive_checkpoints,
+    checkpoint_dir,
+    latest_checkpoint,
+    restore_checkpoint,
+    save_model_atomic,
+)
 from config import AgentConfig, TrainingConfig
 from environment import EnvironmentFactory, make_training_env
+from feature_extractors import POLICY_EXTRACTORS, features_extractor_kwargs
 from reward_functions import RewardFunction
+from shm_vec_env import SharedMemoryVecEnv
+from vec_env import RMSAVecEnv
 
 
 ACTIVATIONS: Dict[str, nn.Module] = {
@@ -68,12 +89,78 @@ class DropoutMlpPolicy(MlpPolicy):
         )
 
 
+if MaskableActorCriticPolicy is not None:
+
+    class DropoutMaskablePolicy(MaskableActorCriticPolicy):
+        def __init__(self, *args, dropout: float = 0.1, **kwargs) -> None:
+            self._dropout = dropout
+            super().__init__(*args, **kwargs)
+
+        _build_mlp_extractor = DropoutMlpPolicy._build_mlp_extractor
+
+
+def algorithm_for(config: AgentConfig) -> type:
+    """PPO, or MaskablePPO when the agent trains with action masks."""
+    if not config.action_masking:
+        return PPO
+    if MaskablePPO is None:
+        raise RuntimeError(
+            f"Agent {config.name} uses action masking, which requires sb3-contrib. Install requirements first"
+        )
+    return MaskablePPO
+
+
+VEC_ENV_BACKENDS = ("dummy", "subproc", "shared_memory", "native")
+
+
+def make_vec_env(
+    factory: EnvironmentFactory,
+    reward_fn: RewardFunction,
+    n_envs: int = 1,
+    backend: str = "dummy",
+    seed: Optional[int] = None,
+) -> VecEnv:
+    """``n_envs`` training envs (env ``i`` seeded ``seed + i``) on the chosen backend.
+
+    ``subproc`` and ``shared_memory`` run one env per worker process (the latter
+    passes observations through shared memory); ``native`` is the in-process
+    batched :class:`~vec_env.RMSAVecEnv`.
+    """
+
+    if backend not in VEC_ENV_BACKENDS:
+        raise ValueError(f"Unknown vec env backend: {backend}. Available: {', '.join(VEC_ENV_BACKENDS)}")
+    if backend == "native":
+        kwargs = {key: value for key, value in factory.base_kwargs.items() if key != "seed"}
+        return RMSAVecEnv(n_envs, reward_fn=reward_fn, seed=seed, **kwargs)
+
+    def env_fn(rank: int):
+        env_seed = None if seed is None else seed + rank
+        return lambda: make_training_env(factory, reward_fn, seed=env_seed)
+
+    env_fns = [env_fn(rank) for rank in range(n_envs)]
+    if backend == "subproc":
+        return SubprocVecEnv(env_fns)
+    if backend == "shared_memory":
+        return SharedMemoryVecEnv(env_fns)
+    return DummyVecEnv(env_fns)
+
+
 @dataclass
 class AgentBuilder:
     config: AgentConfig
     factory: EnvironmentFactory
     reward_fn: RewardFunction
 
+    def _features_extractor(self) -> str:
+        # An explicit extractor wins; otherwise the policy name decides (GatPolicy -> gat)
+        if self.config.features_extractor != "flatten":
+            return self.config.features_extractor
+        if self.config.policy not in POLICY_EXTRACTORS:
+            raise ValueError(
+                f"Unsupported policy {self.config.policy}. Available: {', '.join(POLICY_EXTRACTORS)}"
+            )
+        return POLICY_EXTRACTORS[self.config.policy]
+
     def _policy_and_kwargs(self) -> Tuple[type, Dict]:
         activation = ACTIVATIONS.get(self.config.activation.lower())
         if activation is None:
@@ -82,25 +169,28 @@ class AgentBuilder:
         policy_kwargs: Dict = {
             "net_arch": list(self.config.net_arch),
             "activation_fn": activation,
+            **features_extractor_kwargs(
+                self._features_extractor(),
+                self.factory,
+                activation_fn=activation,
+                **self.config.features_extractor_kwargs,
+            ),
         }
 
         policy_class: type
+        masked = algorithm_for(self.config) is not PPO
         if self.config.dropout > 0:
-            policy_class = DropoutMlpPolicy
+            policy_class = DropoutMaskablePolicy if masked else DropoutMlpPolicy
             policy_kwargs["dropout"] = self.config.dropout
         else:
-            policy_class = MlpPolicy
+            policy_class = MaskableActorCriticPolicy if masked else MlpPolicy
 
         return policy_class, policy_kwargs
 
-    def build(self, seed: int) -> PPO:
+    def build(self, seed: int, n_envs: int = 1, vec_env_backend: str = "dummy") -> PPO:
         policy_class, policy_kwargs = self._policy_and_kwargs()
-
-        def _make_env():
-            return make_training_env(self.factory, self.reward_fn, seed=seed)
-
-        vec_env = DummyVecEnv([_make_env])
-        model = PPO(
+        vec_env = make_vec_env(self.factory, self.reward_fn, n_envs, vec_env_backend, seed=seed)
+        model = algorithm_for(self.config)(
             policy_class,
             vec_env,
             learning_rate=self.config.learning_rate,
@@ -120,28 +210,57 @@ def train_agent(
     builder: AgentBuilder,
     training: TrainingConfig,
     seed: int,
+    callbacks: Sequence[BaseCallback] = (),
+    quiet: bool = False,
+    resume: bool = False,
+    fresh: bool = False,
 ) -> PPO:
+    """Train and save one agent; ``quiet`` drops the progress bar and eval logs (the
+    caller reports progress itself, e.g. through one of ``callbacks``).
+
+    Checkpoints go to ``checkpoint_dir(training.save_path)`` every
+    ``training.save_freq`` steps. With ``resume`` training continues from the
+    latest one. Otherwise a previous run's checkpoints are moved aside
+    (``archive_checkpoints``), or deleted with ``fresh``.
+    """
+
     Path(training.tensorboard_log).mkdir(parents=True, exist_ok=True)
     Path(training.save_path).parent.mkdir(parents=True, exist_ok=True)
 
-    model = builder.build(seed)
+    model = builder.build(seed, n_envs=training.n_envs, vec_env_backend=training.vec_env)
+
+    checkpoints = checkpoint_dir(training.save_path)
+    checkpoint = latest_checkpoint(checkpoints) if resume else None
+    if checkpoint is not None:
+        done = restore_checkpoint(model, checkpoint)
+        # New traffic rather than a replay of the requests already trained on
+        model.get_env().seed(seed + done)
+    elif fresh:
+        shutil.rmtree(checkpoints, ignore_errors=True)
+    else:
+        archive_checkpoints(checkpoints)
+    remaining = max(training.timesteps - model.num_timesteps, 0)
 
     eval_env = DummyVecEnv(
         [lambda: make_training_env(builder.factory, builder.reward_fn, seed=seed + 1)]
     )
-    eval_callback = EvalCallback(
+    callback_class = MaskableEvalCallback if builder.config.action_masking else EvalCallback
+    eval_callback = callback_class(
         eval_env,
         eval_freq=training.eval_freq,
         deterministic=True,
         render=False,
         n_eval_episodes=5,
+        verbose=0 if quiet else 1,
     )
 
-    model.learn(
-        total_timesteps=training.timesteps,
-        callback=eval_callback,
-        progress_bar=True,
-        tb_log_name=f"{builder.config.name}_ppo",
-    )
-    model.save(training.save_path)
+    if remaining > 0:
+        model.learn(
+            total_timesteps=remaining,
+            callback=[eval_callback, AtomicCheckpointCallback(checkpoints, training.save_freq), *callbacks],
+            reset_num_timesteps=checkpoint is None,
+            progress_bar=not quiet,
+            tb_log_name=f"{builder.config.name}_ppo",
+        )
+    save_model_atomic(model, training.save_path)
     return model
@@ -0,0 +1,657 @@
+"""Throughput benchmarks for the RMSA environment.
+
+Uso:
+    python benchmark.py steps                       # steps/sec en las 6 topologías
+    python benchmark.py steps --topologies USNET --steps 5000
+    python benchmark.py vec --num-envs 64            # RMSAVecEnv vs DummyVecEnv
+    python benchmark.py sweep --agent KSP-FF --loads 0.4 0.8 1.2   # blocking vs carga
+    python benchmark.py scaling --nodes 25 50 100 --slots 196 320  # topologías sintéticas
+    python benchmark.py wrappers                    # coste por step de gym.make y wrappers
+    python benchmark.py profile --topologies USNET  # tiempo por fase de RMSAEnv.step
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from scipy import stats
+
+from config import ENVIRONMENT, REWARD_WEIGHTS
+from environment import EnvironmentFactory
+from heuristics import HEURISTICS, SPECTRUM_ASSIGNMENT, HeuristicAgent
+from topology_generator import SYNTHETIC_MODELS
+from rmsa_environment import RMSAEnv
+from vec_env import RMSAVecEnv
+
+console = Console()
+
+ALL_TOPOLOGIES = ["NSFNET", "USNET", "EURO", "UKNET", "JAPAN", "BRAZIL"]
+
+
+def bench_steps(topology: str, steps: int = 2000, seed: int = 0, **env_kwargs: Any) -> Dict[str, float]:
+    """Measure construction time and raw ``RMSAEnv.step`` throughput for ``topology``."""
+
+    start = time.perf_counter()
+    env = RMSAEnv(topology=topology, seed=seed, **env_kwargs)
+    construct_s = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, env.action_space.n, size=steps)
+    env.reset(seed=seed)
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(int(action))
+        if terminated or truncated:
+            env.reset()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "spectrum_kb": env.spectrum.nbytes / 1024.0,
+        "construct_ms": construct_s * 1000.0,
+        "steps_per_sec": steps / max(elapsed, 1e-9),
+        "us_per_step": elapsed / max(steps, 1) * 1e6,
+    }
+
+
+def run_step_benchmark(
+    topologies: Iterable[str], steps: int, seed: int, **env_kwargs: Any
+) -> List[Dict[str, Any]]:
+    rows = []
+    table = Table(title=f"RMSAEnv step throughput ({steps:,} steps)")
+    table.add_column("Topology", style="cyan")
+    table.add_column("Spectrum (KB)", justify="right")
+    table.add_column("Construct (ms)", justify="right")
+    table.add_column("Steps/sec", justify="right", style="green")
+    table.add_column("µs/step", justify="right")
+
+    for topology in topologies:
+        result = bench_steps(topology, steps=steps, seed=seed, **env_kwargs)
+        rows.append({"topology": topology, **result})
+        table.add_row(
+            topology,
+            f"{result['spectrum_kb']:.1f}",
+            f"{result['construct_ms']:.1f}",
+            f"{result['steps_per_sec']:,.0f}",
+            f"{result['us_per_step']:.1f}",
+        )
+
+    console.print(table)
+    return rows
+
+
+def bench_vec(
+    topology: str, num_envs: int = 64, steps: int = 200, seed: int = 0, **env_kwargs: Any
+) -> Dict[str, float]:
+    """Compare ``RMSAVecEnv`` with a ``DummyVecEnv`` of ``num_envs`` ``RMSAEnv`` instances.
+
+    Both run the same random action batches; throughput is counted in env-steps
+    (``num_envs`` per batch step).
+    """
+
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    rng = np.random.default_rng(seed)
+    dummy = DummyVecEnv(
+        [lambda i=i: RMSAEnv(topology=topology, seed=seed + i, **env_kwargs) for i in range(num_envs)]
+    )
+    native = RMSAVecEnv(num_envs, seed=seed, topology=topology, **env_kwargs)
+    actions = rng.integers(0, native.action_space.n, size=(steps, num_envs))
+
+    results = {}
+    for name, vec in (("dummy", dummy), ("native", native)):
+        vec.reset()
+        start = time.perf_counter()
+        for batch in actions:
+            vec.step(batch)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_steps_per_sec"] = steps * num_envs / max(elapsed, 1e-9)
+        vec.close()
+
+    results["speedup"] = results["native_steps_per_sec"] / results["dummy_steps_per_sec"]
+    return results
+
+
+def run_vec_benchmark(
+    topologies: Iterable[str], num_envs: int, steps: int, seed: int, **env_kwargs: Any
+) -> List[Dict[str, Any]]:
+    rows = []
+    table = Table(title=f"Vectorised throughput ({num_envs} envs × {steps:,} steps)")
+    table.add_column("Topology", style="cyan")
+    table.add_column("DummyVecEnv steps/sec", justify="right")
+    table.add_column("RMSAVecEnv steps/sec", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="bold")
+
+    for topology in topologies:
+        result = bench_vec(topology, num_envs=num_envs, steps=steps, seed=seed, **env_kwargs)
+        rows.append({"topology": topology, **result})
+        table.add_row(
+            topology,
+            f"{result['dummy_steps_per_sec']:,.0f}",
+            f"{result['native_steps_per_sec']:,.0f}",
+            f"{result['speedup']:.1f}×",
+        )
+
+    console.print(table)
+    return rows
+
+
+def bench_scaling(
+    topology: str, num_freq_slots: int, steps: int = 1000, seed: int = 0, **env_kwargs: Any
+) -> Dict[str, float]:
+    """Construction time, peak construction memory, throughput and observation size.
+
+    Routing tables are cached per process, so each topology's first construction
+    pays for them; memory is the tracemalloc peak of that construction.
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    env = RMSAEnv(topology=topology, num_freq_slots=num_freq_slots, seed=seed, **env_kwargs)
+    construct_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, env.action_space.n, size=steps)
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(int(action))
+        if terminated or truncated:
+            env.reset()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "nodes": env.num_nodes,
+        "links": env.num_edges,
+        "construct_s": construct_s,
+        "peak_mb": peak / 2**20,
+        "tables_mb": (env.path_table.edge_ids.nbytes + env.path_table.nodes.nbytes + env.slot_table.nbytes) / 2**20,
+        "steps_per_sec": steps / max(elapsed, 1e-9),
+        "observation_size": int(np.prod(env.observation_space.shape)),
+    }
+
+
+def run_scaling_benchmark(
+    model: str, node_counts: Iterable[int], slot_counts: Iterable[int], steps: int, seed: int, **env_kwargs: Any
+) -> List[Dict[str, Any]]:
+    rows = []
+    table = Table(title=f"RMSAEnv scaling on synthetic {model} topologies ({steps:,} steps)")
+    table.add_column("Topology", style="cyan")
+    table.add_column("Nodes", justify="right")
+    table.add_column("Links", justify="right")
+    table.add_column("Slots", justify="right")
+    table.add_column("Construct (s)", justify="right")
+    table.add_column("Peak mem (MB)", justify="right")
+    table.add_column("Tables (MB)", justify="right")
+    table.add_column("Steps/sec", justify="right", style="green")
+    table.add_column("Obs size", justify="right")
+
+    for num_nodes in node_counts:
+        topology = f"{model}-{num_nodes}-S{seed}"
+        for num_slots in slot_counts:
+            result = bench_scaling(topology, num_slots, steps=steps, seed=seed, **env_kwargs)
+            rows.append({"topology": topology, "slots": num_slots, **result})
+            table.add_row(
+                topology,
+                str(result["nodes"]),
+                str(result["links"]),
+                str(num_slots),
+                f"{result['construct_s']:.2f}",
+                f"{result['peak_mb']:.1f}",
+                f"{result['tables_mb']:.1f}",
+                f"{result['steps_per_sec']:,.0f}",
+                f"{result['observation_size']:,}",
+            )
+
+    console.print(table)
+    return rows
+
+
+def _time_blocks(env: Any, actions: np.ndarray, seed: int, block: int = 250) -> np.ndarray:
+    """Seconds spent in each ``block`` of consecutive steps, from ``reset(seed)``."""
+
+    env.reset(seed=seed)
+    times = []
+    for offset in range(0, len(actions), block):
+        start = time.perf_counter()
+        for action in actions[offset : offset + block]:
+            _, _, terminated, truncated, _ = env.step(int(action))
+            if terminated or truncated:
+                env.reset()
+        times.append(time.perf_counter() - start)
+    return np.asarray(times)
+
+
+def bench_wrappers(
+    steps: int = 5000, seed: int = 0, reward_id: str = "multi_objective", repeats: int = 5, **env_kwargs: Any
+) -> Dict[str, float]:
+    """µs per step of each env construction path on the same action sequence.
+
+    ``raw`` is a bare ``RMSAEnv``; ``fused`` adds reward shaping inside the env
+    (``EnvironmentFactory(fast=True)``); ``gym_make`` is ``gym.make`` alone and
+    ``wrapped`` the default training env (``gym.make`` + ``RewardShapingWrapper``).
+    Each block of steps keeps its best time over ``repeats`` interleaved runs.
+    """
+
+    from reward_functions import build_reward_function
+
+    def reward_fn():
+        return build_reward_function(reward_id, REWARD_WEIGHTS.get(reward_id, {}))
+
+    variants = {
+        "raw": lambda: RMSAEnv(**env_kwargs),
+        "fused": lambda: EnvironmentFactory(env_kwargs, fast=True).make(reward_fn=reward_fn()),
+        "gym_make": lambda: EnvironmentFactory(env_kwargs).make(),
+        "wrapped": lambda: EnvironmentFactory(env_kwargs).make(reward_fn=reward_fn()),
+    }
+    envs = {name: make() for name, make in variants.items()}
+    actions = np.random.default_rng(seed).integers(0, envs["raw"].action_space.n, size=steps)
+    best = {name: np.full(-(-steps // 250), np.inf) for name in envs}
+    # Every run replays the same trajectory, so the fastest time of each block
+    # across interleaved repeats filters out interruptions and load drift
+    for _ in range(repeats):
+        for name, env in envs.items():
+            np.minimum(best[name], _time_blocks(env, actions, seed), out=best[name])
+    return {name: float(times.sum()) / steps * 1e6 for name, times in best.items()}
+
+
+def run_wrapper_benchmark(
+    topologies: Iterable[str], steps: int, seed: int, reward_id: str, **env_kwargs: Any
+) -> List[Dict[str, Any]]:
+    rows = []
+    table = Table(title=f"Per-step wrapper overhead ({steps:,} steps, reward {reward_id})")
+    table.add_column("Topology", style="cyan")
+    table.add_column("RMSAEnv µs", justify="right")
+    table.add_column("Fused reward µs", justify="right", style="green")
+    table.add_column("gym.make µs", justify="right")
+    table.add_column("gym.make + shaping µs", justify="right")
+    table.add_column("Wrapper overhead", justify="right", style="bold")
+
+    for topology in topologies:
+        result = bench_wrappers(steps=steps, seed=seed, reward_id=reward_id, topology=topology, **env_kwargs)
+        rows.append({"topology": topology, **result})
+        table.add_row(
+            topology,
+            f"{result['raw']:.1f}",
+            f"{result['fused']:.1f}",
+            f"{result['gym_make']:.1f}",
+            f"{result['wrapped']:.1f}",
+            f"{result['wrapped'] - result['fused']:+.1f} µs ({result['wrapped'] / result['fused'] - 1:+.0%})",
+        )
+
+    console.print(table)
+    return rows
+
+
+def run_profile(topology: str, steps: int, seed: int, **env_kwargs: Any) -> Dict[str, Dict[str, float]]:
+    """Per-phase breakdown of ``steps`` random-action steps with ``RMSAEnv(profile=True)``."""
+
+    env = RMSAEnv(topology=topology, seed=seed, profile=True, **env_kwargs)
+    actions = np.random.default_rng(seed).integers(0, env.action_space.n, size=steps)
+    env.reset(seed=seed)
+    env.profile_report(reset=True)
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(int(action))
+        if terminated or truncated:
+            env.reset()
+    report = env.profile_report()
+
+    table = Table(title=f"RMSAEnv phases on {topology} ({steps:,} steps, inclusive times)")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("µs/call", justify="right")
+    table.add_column("% of step", justify="right", style="green")
+    for name, stats in report.items():
+        if stats["calls"]:
+            table.add_row(
+                name,
+                f"{stats['calls']:,}",
+                f"{stats['total_ms']:.1f}",
+                f"{stats['mean_us']:.1f}",
+                f"{stats['share']:.1%}",
+            )
+    console.print(table)
+    return report
+
+
+# Trained models loaded once per worker process, keyed by agent name
+_SWEEP_MODELS: Dict[str, Tuple[Any, bool]] = {}
+
+
+def _sweep_policy(agent: str, env: RMSAEnv) -> Tuple[Any, bool]:
+    """``(policy, masked)`` for a heuristic name or a trained battle agent."""
+
+    key = agent.upper()
+    if key in HEURISTICS:
+        return HeuristicAgent(key, env), False
+    if key not in _SWEEP_MODELS:
+        from agents import algorithm_for
+        from config import BATTLE_AGENT_CONFIGS, BATTLE_TRAINING_CONFIGS
+
+        if key not in BATTLE_AGENT_CONFIGS:
+            available = list(HEURISTICS) + list(BATTLE_AGENT_CONFIGS)
+            raise ValueError(f"Unknown agent '{agent}'. Available: {available}")
+        config = BATTLE_AGENT_CONFIGS[key]
+        model = algorithm_for(config).load(BATTLE_TRAINING_CONFIGS[key].save_path, device="cpu")
+        _SWEEP_MODELS[key] = (model, config.action_masking)
+    return _SWEEP_MODELS[key]
+
+
+def run_replication(
+    agent: str,
+    topology: str,
+    load: float,
+    slots: int,
+    seed: int,
+    requests: int,
+    warmup: int,
+    env_kwargs: Dict[str, Any],
+) -> float:
+    """Blocking probability of one independent run, measured after ``warmup`` requests."""
+
+    if agent.upper() in HEURISTICS:
+        env_kwargs = {"spectrum_assignment": SPECTRUM_ASSIGNMENT[agent.upper()], **env_kwargs}
+    env = RMSAEnv(
+        topology=topology,
+        load=load,
+        num_freq_slots=slots,
+        seed=seed,
+        episode_length=warmup + requests,
+        **env_kwargs,
+    )
+    policy, masked = _sweep_policy(agent, env)
+    obs, _ = env.reset(seed=seed)
+    blocked_at_warmup = 0
+    for step in range(warmup + requests):
+        if step == warmup:
+            blocked_at_warmup = env.blocked
+        if masked:
+            action, _ = policy.predict(obs, deterministic=True, action_masks=env.action_masks())
+        else:
+            action, _ = policy.predict(obs, deterministic=True)
+        obs, _, _, _, _ = env.step(int(action))
+    return (env.blocked - blocked_at_warmup) / requests
+
+
+@dataclass
+class SweepPoint:
+    """Replications collected for one (topology, load, slots) point of a sweep."""
+
+    topology: str
+    load: float
+    slots: int
+    samples: List[float] = field(default_factory=list)
+    launched: int = 0
+
+    def interval(self, confidence: float) -> Tuple[float, float]:
+        """Mean blocking and Student-t confidence half-width over the replications."""
+        mean = float(np.mean(self.samples))
+        if len(self.samples) < 2:
+            return mean, float("inf")
+        sem = float(np.std(self.samples, ddof=1)) / np.sqrt(len(self.samples))
+        return mean, float(stats.t.ppf(0.5 + confidence / 2, len(self.samples) - 1)) * sem
+
+    def converged(self, confidence: float, precision: float, abs_precision: float, min_replications: int) -> bool:
+        if len(self.samples) < min_replications:
+            return False
+        mean, half_width = self.interval(confidence)
+        return half_width <= max(precision * mean, abs_precision)
+
+
+def run_load_sweep(
+    agent: str,
+    topologies: Iterable[str],
+    loads: Iterable[float],
+    slots: Iterable[int],
+    requests: int = 10_000,
+    warmup: int = 2_000,
+    confidence: float = 0.95,
+    precision: float = 0.05,
+    abs_precision: float = 1e-3,
+    min_replications: int = 4,
+    max_replications: int = 32,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    **env_kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Blocking-vs-load curves with replications stopped per point once the CI is tight.
+
+    Independent replications (distinct seeds) run in a process pool. A point stops
+    launching replications once the confidence half-width drops below
+    ``max(precision * mean, abs_precision)`` or ``max_replications`` is reached.
+    """
+
+    if min_replications < 2:
+        raise ValueError("min_replications must be at least 2 to estimate a confidence interval")
+    points = [
+        SweepPoint(topology=topology, load=load, slots=num_slots)
+        for topology in topologies
+        for num_slots in slots
+        for load in loads
+    ]
+    # Future -> (position in ``points``, point); the position keys the seeds, so
+    # repeated (topology, slots, load) entries still get distinct replications
+    pending: Dict[Future, Tuple[int, SweepPoint]] = {}
+
+    def launch(pool: ProcessPoolExecutor, index: int, point: SweepPoint) -> None:
+        replication_seed = seed + index * max_replications + point.launched
+        future = pool.submit(
+            run_replication,
+            agent,
+            point.topology,
+            point.load,
+            point.slots,
+            replication_seed,
+            requests,
+            warmup,
+            env_kwargs,
+        )
+        pending[future] = (index, point)
+        point.launched += 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, point in enumerate(points):
+            for _ in range(min_replications):
+                launch(pool, index, point)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, point = pending.pop(future)
+                point.samples.append(future.result())
+                if point.launched < max_replications and not point.converged(
+                    confidence, precision, abs_precision, min_replications
+                ):
+                    launch(pool, index, point)
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    table = Table(title=f"Blocking vs load — {agent.upper()} ({confidence:.0%} CI, ±{precision:.0%} target)")
+    table.add_column("Topology", style="cyan")
+    table.add_column("Slots", justify="right")
+    table.add_column("Load", justify="right")
+    table.add_column("Blocking", justify="right", style="green")
+    table.add_column("± CI", justify="right")
+    table.add_column("Replications", justify="right")
+
+    simulated = 0
+    for point in points:
+        mean, half_width = point.interval(confidence)
+        simulated += len(point.samples) * (requests + warmup)
+        rows.append(
+            {
+                "topology": point.topology,
+                "slots": point.slots,
+                "load": point.load,
+                "blocking_probability": mean,
+                "ci_half_width": half_width,
+                "replications": len(point.samples),
+            }
+        )
+        table.add_row(
+            point.topology,
+            str(point.slots),
+            f"{point.load:.2f}",
+            f"{mean:.2%}",
+            f"{half_width:.2%}",
+            str(len(point.samples)),
+        )
+
+    console.print(table)
+    budget = len(points) * max_replications * (requests + warmup)
+    console.print(
+        f"Simulated {simulated:,} requests ({simulated / budget:.0%} of a fixed {max_replications}-replication run) "
+        f"in {elapsed:.1f}s"
+    )
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="RMSA environment benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    steps = sub.add_parser("steps", help="Raw env.step throughput per topology")
+    steps.add_argument("--topologies", nargs="*", default=ALL_TOPOLOGIES)
+    steps.add_argument("--steps", type=int, default=2000)
+    steps.add_argument("--seed", type=int, default=0)
+    steps.add_argument("--spectrum-backend", choices=["dense", "bitpacked"], default="dense")
+    steps.add_argument("--slots", type=int, default=196, help="Frequency slots per link")
+    steps.add_argument(
+        "--no-copy-observation",
+        action="store_true",
+        help="Return the env's observation buffer without copying",
+    )
+
+    vec = sub.add_parser("vec", help="RMSAVecEnv vs DummyVecEnv throughput")
+    vec.add_argument("--topologies", nargs="*", default=["NSFNET"])
+    vec.add_argument("--num-envs", type=int, default=64)
+    vec.add_argument("--steps", type=int, default=200, help="Batch steps per backend")
+    vec.add_argument("--seed", type=int, default=0)
+    vec.add_argument("--slots", type=int, default=196, help="Frequency slots per link")
+
+    scaling = sub.add_parser("scaling", help="RMSAEnv cost on growing synthetic topologies")
+    scaling.add_argument("--model", choices=SYNTHETIC_MODELS, default="WAXMAN")
+    scaling.add_argument("--nodes", nargs="*", type=int, default=[25, 50, 100])
+    scaling.add_argument("--slots", nargs="*", type=int, default=[196])
+    scaling.add_argument("--steps", type=int, default=1000)
+    scaling.add_argument("--seed", type=int, default=0, help="Seed of the topologies and the actions")
+    scaling.add_argument("--observation-mode", choices=["full", "path"], default="full")
+
+    wrappers = sub.add_parser("wrappers", help="Per-step cost of gym.make and the reward wrapper")
+    wrappers.add_argument("--topologies", nargs="*", default=["NSFNET"])
+    wrappers.add_argument("--steps", type=int, default=5000)
+    wrappers.add_argument("--seed", type=int, default=0)
+    wrappers.add_argument("--reward", default="multi_objective", help="Reward id used for shaping")
+
+    profile = sub.add_parser("profile", help="Time spent per RMSAEnv.step phase")
+    profile.add_argument("--topologies", nargs="*", default=["NSFNET"])
+    profile.add_argument("--steps", type=int, default=5000)
+    profile.add_argument("--seed", type=int, default=0)
+    profile.add_argument("--episode-length", type=int, default=5000)
+    profile.add_argument("--load", type=float, default=ENVIRONMENT.load)
+    profile.add_argument("--observation-mode", choices=["full", "path"], default="full")
+    profile.add_argument("--spectrum-backend", choices=["dense", "bitpacked"], default="dense")
+
+    sweep = sub.add_parser("sweep", help="Blocking-vs-load curves with CI-based early stopping")
+    sweep.add_argument("--agent", default="KSP-FF", help="Heuristic or trained battle agent")
+    sweep.add_argument("--topologies", nargs="*", default=["NSFNET"])
+    sweep.add_argument("--loads", nargs="*", type=float, default=[0.4, 0.6, 0.8, 1.0, 1.2])
+    sweep.add_argument("--slots", nargs="*", type=int, default=[ENVIRONMENT.frequency_slots])
+    sweep.add_argument("--requests", type=int, default=10_000, help="Measured requests per replication")
+    sweep.add_argument("--warmup", type=int, default=2_000, help="Requests discarded before measuring")
+    sweep.add_argument("--confidence", type=float, default=0.95)
+    sweep.add_argument("--precision", type=float, default=0.05, help="Target CI half-width relative to the mean")
+    sweep.add_argument("--abs-precision", type=float, default=1e-3, help="Absolute CI half-width accepted")
+    sweep.add_argument("--min-replications", type=int, default=4)
+    sweep.add_argument("--max-replications", type=int, default=32)
+    sweep.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.add_argument("--output", type=str, default=None, help="Write the curve points as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "steps":
+        run_step_benchmark(
+            [t.upper() for t in args.topologies],
+            args.steps,
+            args.seed,
+            spectrum_backend=args.spectrum_backend,
+            num_freq_slots=args.slots,
+            copy_observation=not args.no_copy_observation,
+        )
+    elif args.command == "vec":
+        run_vec_benchmark(
+            [t.upper() for t in args.topologies],
+            args.num_envs,
+            args.steps,
+            args.seed,
+            num_freq_slots=args.slots,
+        )
+    elif args.command == "scaling":
+        run_scaling_benchmark(
+            args.model,
+            args.nodes,
+            args.slots,
+            args.steps,
+            args.seed,
+            observation_mode=args.observation_mode,
+        )
+    elif args.command == "wrappers":
+        run_wrapper_benchmark(
+            [t.upper() for t in args.topologies],
+            args.steps,
+            args.seed,
+            args.reward,
+            episode_length=ENVIRONMENT.episode_length,
+            load=ENVIRONMENT.load,
+            num_freq_slots=ENVIRONMENT.frequency_slots,
+        )
+    elif args.command == "profile":
+        for topology in args.topologies:
+            run_profile(
+                topology.upper(),
+                args.steps,
+                args.seed,
+                episode_length=args.episode_length,
+                load=args.load,
+                observation_mode=args.observation_mode,
+                spectrum_backend=args.spectrum_backend,
+            )
+    elif args.command == "sweep":
+        rows = run_load_sweep(
+            args.agent,
+            [t.upper() for t in args.topologies],
+            args.loads,
+            args.slots,
+            requests=args.requests,
+            warmup=args.warmup,
+            confidence=args.confidence,
+            precision=args.precision,
+            abs_precision=args.abs_precision,
+            min_replications=args.min_replications,
+            max_replications=args.max_replications,
+            workers=args.workers,
+            seed=args.seed,
+            observation_mode=ENVIRONMENT.observation_mode,
+            traffic_matrix=ENVIRONMENT.traffic_pattern,
+        )
+        if args.output:
+            Path(args.output).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Periodic atomic training checkpoints, so interrupted runs can resume.
+
+Every ``save_freq`` timesteps ``AtomicCheckpointCallback`` writes
+``<save_path stem>_checkpoints/step_<timesteps>/`` holding
+
+* ``model.zip``: policy and optimizer state (``model.save``),
+* ``state.pkl``: timestep and update counters, the Python/NumPy/torch RNG
+  states and the ``VecNormalize`` statistics when the env is normalised.
+
+A checkpoint is assembled in a temporary directory and renamed into place, and
+the ``latest`` pointer (itself replaced atomically) only ever names complete
+checkpoints, so a crash while saving leaves the previous one usable.
+Checkpoints are taken when a rollout starts, right after the previous one was
+trained on, so the saved parameters account for every counted timestep.
+
+A run that neither resumes nor passes ``--fresh`` moves the previous run's
+checkpoints aside instead of deleting them.
+
+Uso:
+    python trainer.py --agents META-LEARNING --resume
+    python trainer.py --agents META-LEARNING --fresh   # descarta checkpoints previos
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import torch
+from stable_baselines3.common.base_class import BaseAlgorithm
+from stable_baselines3.common.callbacks import BaseCallback
+
+LATEST = "latest"
+
+
+def checkpoint_dir(save_path: Union[str, Path]) -> Path:
+    """Checkpoint directory of the model saved at ``save_path``."""
+
+    save_path = Path(save_path)
+    return save_path.with_name(f"{save_path.stem}_checkpoints")
+
+
+def _replace_file(path: Path, write) -> None:
+    # Write next to the target so os.replace stays on one filesystem
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def save_model_atomic(model: BaseAlgorithm, path: Union[str, Path]) -> None:
+    """``model.save(path)`` without ever leaving a truncated file at ``path``."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(tmp: str) -> None:
+        # A file object: given a path without ".zip", SB3 would append one
+        with open(tmp, "wb") as fh:
+            model.save(fh)
+
+    _replace_file(path, write)
+
+
+def save_checkpoint(model: BaseAlgorithm, directory: Union[str, Path], keep: int = 2) -> Path:
+    """Write a checkpoint of ``model``, point ``latest`` at it and keep the ``keep`` newest."""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"step_{model.num_timesteps:010d}"
+
+    vec_normalize = model.get_vec_normalize_env()
+    state = {
+        "num_timesteps": model.num_timesteps,
+        "n_updates": getattr(model, "_n_updates", 0),
+        "python_rng": random.getstate(),
+        "numpy_rng": np.random.get_state(),
+        "torch_rng": torch.get_rng_state(),
+        "vec_normalize": None
+        if vec_normalize is None
+        else {"obs_rms": vec_normalize.obs_rms, "ret_rms": vec_normalize.ret_rms},
+    }
+
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=directory))
+    try:
+        model.save(staging / "model.zip")
+        with open(staging / "state.pkl", "wb") as fh:
+            pickle.dump(state, fh)
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _replace_file(directory / LATEST, lambda tmp: Path(tmp).write_text(target.name))
+    for old in sorted(directory.glob("step_*"))[:-keep] if keep > 0 else []:
+        shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def archive_checkpoints(directory: Union[str, Path]) -> Optional[Path]:
+    """Move a previous run's checkpoints aside to ``<directory>.prev-<timestamp>``.
+
+    Returns the new location, or ``None`` when there was nothing to keep.
+    """
+
+    directory = Path(directory)
+    if not directory.is_dir() or not any(directory.glob("step_*")):
+        return None
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    target = directory.with_name(f"{directory.name}.prev-{stamp}")
+    suffix = 1
+    while target.exists():
+        target = directory.with_name(f"{directory.name}.prev-{stamp}-{suffix}")
+        suffix += 1
+    os.replace(directory, target)
+    return target
+
+
+def latest_checkpoint(directory: Union[str, Path]) -> Optional[Path]:
+    """The checkpoint ``latest`` names in ``directory``, or ``None``."""
+
+    pointer = Path(directory) / LATEST
+    if not pointer.is_file():
+        return None
+    checkpoint = pointer.parent / pointer.read_text().strip()
+    return checkpoint if (checkpoint / "state.pkl").is_file() else None
+
+
+def restore_checkpoint(model: BaseAlgorithm, checkpoint: Union[str, Path]) -> int:
+    """Load a checkpoint into a freshly built ``model``; returns its timestep count.
+
+    Continue with ``model.learn(remaining, reset_num_timesteps=False)``.
+    """
+
+    checkpoint = Path(checkpoint)
+    model.set_parameters(str(checkpoint / "model.zip"), exact_match=True, device=model.device)
+    with open(checkpoint / "state.pkl", "rb") as fh:
+        state = pickle.load(fh)
+
+    model.num_timesteps = state["num_timesteps"]
+    if hasattr(model, "_n_updates"):
+        model._n_updates = state["n_updates"]
+    vec_normalize = model.get_vec_normalize_env()
+    if vec_normalize is not None and state["vec_normalize"] is not None:
+        vec_normalize.obs_rms = state["vec_normalize"]["obs_rms"]
+        vec_normalize.ret_rms = state["vec_normalize"]["ret_rms"]
+    random.setstate(state["python_rng"])
+    np.random.set_state(state["numpy_rng"])
+    torch.set_rng_state(state["torch_rng"])
+    return state["num_timesteps"]
+
+
+class AtomicCheckpointCallback(BaseCallback):
+    """Checkpoint into ``directory`` at the first rollout start after every ``save_freq`` steps."""
+
+    def __init__(self, directory: Union[str, Path], save_freq: int, keep: int = 2) -> None:
+        super().__init__()
+        self.directory = Path(directory)
+        self.save_freq = save_freq
+        self.keep = keep
+        self._last = 0
+
+    def _on_training_start(self) -> None:
+        self._last = self.model.num_timesteps
+
+    def _on_rollout_start(self) -> None:
+        if self.save_freq > 0 and self.model.num_timesteps - self._last >= self.save_freq:
+            self._last = self.model.num_timesteps
+            save_checkpoint(self.model, self.directory, keep=self.keep)
+
+    def _on_step(self) -> bool:
+        return True
+
+
+__all__ = [
+    "AtomicCheckpointCallback",
+    "archive_checkpoints",
+    "checkpoint_dir",
+    "latest_checkpoint",
+    "restore_checkpoint",
+    "save_checkpoint",
+    "save_model_atomic",
+]
@@ -21,6 +21,9 @@ class AgentConfig:
     ent_coef: float = 0.0
     vf_coef: float = 0.5
     max_grad_norm: float = 0.5
+    action_masking: bool = False  # MaskablePPO over RMSAEnv.action_masks (needs sb3-contrib)
+    features_extractor: str = "flatten"  # "spectrum_conv", "gat" (FEATURE_EXTRACTORS); "flatten" defers to policy
+    features_extractor_kwargs: Dict[str, Any] = field(default_factory=dict)
     extra_kwargs: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -32,6 +35,9 @@ class EnvironmentConfig:
     episode_length: int = 100
     seed: int = 42
     spectrum: str = "C"
+    observation_mode: str = "full"  # "full" spectrum or compact "path" features
+    traffic_pattern: str = "uniform"  # node-pair demand: "uniform" or "gravity"
+    fast_path: bool = False  # EnvironmentFactory(fast=True): RMSAEnv without gym.make wrappers
 
     def as_dict(self) -> Dict[str, Any]:
         return {
@@ -40,6 +46,8 @@ class EnvironmentConfig:
             "seed": self.seed,
             "topology": self.topology,
             "num_freq_slots": self.frequency_slots,
+            "observation_mode": self.observation_mode,
+            "traffic_matrix": self.traffic_pattern,
         }
 
 
@@ -50,6 +58,8 @@ class TrainingConfig:
     save_path: str
     eval_freq: int = 5000
     save_freq: int = 10000
+    n_envs: int = 1  # parallel rollout envs; PPO collects n_steps per env
+    vec_env: str = "dummy"  # "dummy", "subproc", "shared_memory" or "native" (RMSAVecEnv)
 
 
 @dataclass(frozen=True)
@@ -96,7 +106,7 @@ ULTHO_AGENT_CONFIG = AgentConfig(
 
 DEEPRMSA_QOT_AGENT_CONFIG = AgentConfig(
     name="DEEPRMSA-QOT",
-    policy="MlpPolicy",
+    policy="GatPolicy",  # graph attention over the link graph (feature_extractors.GatExtractor)
     learning_rate=1.5e-4,
     gamma=0.996,
     batch_size=224,
@@ -109,6 +119,7 @@ DEEPRMSA_QOT_AGENT_CONFIG = AgentConfig(
     ent_coef=0.006,
     vf_coef=0.5,
     max_grad_norm=0.75,
+    features_extractor_kwargs={"gat_layers": 2, "gat_hidden_dim": 128},
     extra_kwargs={},
 )
 
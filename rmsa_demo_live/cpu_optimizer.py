@@ -6,16 +6,19 @@ import torch
 import multiprocessing as mp
 
 
-def configure_cpu_performance() -> None:
-    """Configure PyTorch and system for maximum CPU performance on Ryzen 7 5700X3D."""
+def configure_cpu_performance(env_workers: int = 0) -> None:
+    """Configure PyTorch and system for maximum CPU performance on Ryzen 7 5700X3D.
+
+    ``env_workers`` threads are left free for subprocess rollout workers.
+    """
     
     # Ryzen 7 5700X3D: 8 cores, 16 threads
     num_cores = 8
-    num_threads = 16
+    num_threads = max(16 - env_workers, 1)
     
     # Set PyTorch to use all threads
     torch.set_num_threads(num_threads)
-    torch.set_num_interop_threads(num_cores)
+    torch.set_num_interop_threads(min(num_cores, num_threads))
     
     # Enable MKL optimizations for AMD
     os.environ["MKL_NUM_THREADS"] = str(num_threads)
@@ -42,6 +45,19 @@ def configure_cpu_performance() -> None:
     print(f"  - Device: {torch.get_num_threads()} threads available")
 
 
+def configure_thread_budget(intra_op_threads: int, inter_op_threads: int) -> None:
+    """Pin this process to a slice of the CPU (one job of a concurrent training run).
+
+    Must run before the process does any torch work: the inter-op pool can only
+    be sized once.
+    """
+
+    for var in ("MKL_NUM_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(intra_op_threads)
+    torch.set_num_threads(intra_op_threads)
+    torch.set_num_interop_threads(inter_op_threads)
+
+
 def get_optimal_batch_size(agent_complexity: str = "medium") -> int:
     """
     Calculate optimal batch size based on agent complexity and available RAM.
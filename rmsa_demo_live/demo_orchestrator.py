@@ -7,9 +7,9 @@ from __future__ import annotations
 import argparse
 import json
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 from rich.console import Console
@@ -17,10 +17,11 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
 from rich.text import Text
-from stable_baselines3 import PPO
 
+from agents import algorithm_for
 from config import BATTLE_AGENT_CONFIGS, BATTLE_TRAINING_CONFIGS, ENVIRONMENT, DEMO
 from environment import EnvironmentFactory
+from heuristics import HEURISTICS, SPECTRUM_ASSIGNMENT, HeuristicAgent
 from metrics import MetricsTracker
 from metrics_engine import AgentHistory, BattleMetrics, EpisodeRecord, record_from_info
 from reward_engineering import build_ultra_reward_function
@@ -35,13 +36,14 @@ console = Console()
 class AgentState:
     """Estado completo de un agente durante la demo."""
     name: str
-    model: PPO
+    model: Any  # PPO / MaskablePPO o HeuristicAgent
     env: any
     tracker: MetricsTracker
     history: AgentHistory
     total_reward: float = 0.0
     total_latency_ms: float = 0.0
     requests_processed: int = 0
+    masked: bool = False
 
 
 class DemoOrchestrator:
@@ -53,17 +55,32 @@ class DemoOrchestrator:
         episodes: int = 200,
         topology: str = "NSFNET",
         seed: int = 31415,
+        trace: Optional[str] = None,
     ):
         self.agents_to_load = agents_to_load
         self.episodes = episodes
         self.topology_name = topology
         self.seed = seed
         self.topology_manager = build_default_topology_manager()
-        self.factory = EnvironmentFactory(base_kwargs={**ENVIRONMENT.as_dict(), "topology": topology})
+        base_kwargs = {**ENVIRONMENT.as_dict(), "topology": topology}
+        self.trace = self._prepare_trace(Path(trace), base_kwargs) if trace else None
+        if self.trace is not None:
+            base_kwargs["traffic_trace"] = str(self.trace)
+        self.factory = EnvironmentFactory(base_kwargs=base_kwargs, fast=ENVIRONMENT.fast_path)
         self.agents: Dict[str, AgentState] = {}
         self.current_episode = 0
         self.live_data_file = Path("live_battle_data.json")
         
+    def _prepare_trace(self, path: Path, base_kwargs: Dict) -> Path:
+        """Graba la traza de tráfico si no existe; todos los agentes la reproducen."""
+        if not path.exists():
+            from rmsa_environment import RMSAEnv
+
+            # reset + step consume two requests per episode
+            RMSAEnv(**base_kwargs).record_trace(path, num_requests=2 * self.episodes, seed=self.seed)
+            console.print(f"[cyan]✓ Recorded traffic trace {path}[/cyan]")
+        return path
+
     def _write_live_data(self) -> None:
         """Escribe datos en tiempo real al archivo JSON para el dashboard."""
         data = {
@@ -99,7 +116,22 @@ class DemoOrchestrator:
         temp_file.replace(self.live_data_file)
         
     def _load_agent(self, name: str) -> Optional[AgentState]:
-        """Carga un agente entrenado desde disco."""
+        """Carga un agente entrenado desde disco (las heurísticas no necesitan modelo)."""
+        if name.upper() in HEURISTICS:
+            factory = replace(
+                self.factory,
+                base_kwargs={**self.factory.base_kwargs, "spectrum_assignment": SPECTRUM_ASSIGNMENT[name.upper()]},
+            )
+            env = factory.make(seed=self.seed)
+            console.print(f"[green]✓ Loaded heuristic {name.upper()}[/green]")
+            return AgentState(
+                name=name.upper(),
+                model=HeuristicAgent(name, env),
+                env=env,
+                tracker=MetricsTracker(),
+                history=AgentHistory(name=name.upper()),
+            )
+
         config = BATTLE_AGENT_CONFIGS.get(name)
         training = BATTLE_TRAINING_CONFIGS.get(name)
         
@@ -125,7 +157,7 @@ class DemoOrchestrator:
             env = self.factory.make(seed=self.seed)
             
             # Load model
-            model = PPO.load(str(model_path), env=env)
+            model = algorithm_for(config).load(str(model_path), env=env)
             
             tracker = MetricsTracker()
             history = AgentHistory(name=config.name)
@@ -138,6 +170,7 @@ class DemoOrchestrator:
                 env=env,
                 tracker=tracker,
                 history=history,
+                masked=config.action_masking,
             )
         except Exception as e:
             console.print(f"[red]✗ Error loading {name}: {e}[/red]")
@@ -189,7 +222,11 @@ class DemoOrchestrator:
         # Reset all agents
         observations = {}
         for name, agent in self.agents.items():
-            obs, _ = agent.env.reset(seed=self.seed + episode_num)
+            if self.trace is not None:
+                # Same trace for every agent: rewind once, then keep replaying
+                obs, _ = agent.env.reset(seed=0 if episode_num == 1 else None)
+            else:
+                obs, _ = agent.env.reset(seed=self.seed + episode_num)
             observations[name] = obs
             agent.tracker.reset()
         
@@ -201,7 +238,12 @@ class DemoOrchestrator:
             
             # Predict action
             start_time = time.perf_counter()
-            action, _ = agent.model.predict(obs, deterministic=True)
+            if agent.masked:
+                action, _ = agent.model.predict(
+                    obs, deterministic=True, action_masks=agent.env.unwrapped.action_masks()
+                )
+            else:
+                action, _ = agent.model.predict(obs, deterministic=True)
             latency_ms = (time.perf_counter() - start_time) * 1000
             
             # Step environment
@@ -334,7 +376,7 @@ def parse_args():
         "--agents",
         nargs="*",
         default=["CONTROL", "ULTHO", "HYPERQ-OPT", "BOHAMIANN", "DEEPRMSA-QOT", "META-LEARNING"],
-        help="Agents to include in battle royale",
+        help=f"Agents to include in battle royale (heuristics: {', '.join(HEURISTICS)})",
     )
     parser.add_argument("--episodes", type=int, default=200, help="Number of episodes to run")
     parser.add_argument("--topology", type=str, default="NSFNET", help="Network topology")
@@ -344,6 +386,12 @@ def parse_args():
         action="store_true",
         help="Use EXTREME battle configuration (USNET, 95%% load, 100 slots)",
     )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Traffic trace (.npy) replayed by every agent; recorded first if missing",
+    )
     return parser.parse_args()
 
 
@@ -378,6 +426,7 @@ def main():
         episodes=episodes,
         topology=topology,
         seed=args.seed,
+        trace=args.trace,
     )
     
     battle_metrics = orchestrator.run()
@@ -23,11 +23,23 @@ def _resolve_env_id() -> str:
 
 @dataclass
 class EnvironmentFactory:
-    base_kwargs: Dict[str, Any]
+    """Builds RMSA envs from ``base_kwargs``.
+
+    With ``fast`` the env is an ``RMSAEnv`` constructed directly, without the
+    checker and order-enforcing wrappers of ``gym.make``, and ``reward_fn`` is
+    applied inside ``RMSAEnv.step`` instead of by :class:`RewardShapingWrapper`.
+    """
 
-    def make(self, seed: Optional[int] = None) -> gym.Env:
-        env_id = _resolve_env_id()
-        env = gym.make(env_id, **self.base_kwargs)
+    base_kwargs: Dict[str, Any]
+    fast: bool = False
+
+    def make(self, seed: Optional[int] = None, reward_fn: Optional[RewardFunction] = None) -> gym.Env:
+        if self.fast:
+            env = rmsa_environment.RMSAEnv(**self.base_kwargs, reward_fn=reward_fn)
+        else:
+            env = gym.make(_resolve_env_id(), **self.base_kwargs)
+            if reward_fn is not None:
+                env = RewardShapingWrapper(env, reward_fn)
         if seed is not None:
             env.reset(seed=seed)
         return env
@@ -45,6 +57,10 @@ class RewardShapingWrapper(gym.Wrapper):
         info["shaped_reward"] = shaped
         return obs, shaped, terminated, truncated, info
 
+    def action_masks(self) -> np.ndarray:
+        """Forward ``RMSAEnv.action_masks`` for maskable algorithms."""
+        return self.env.unwrapped.action_masks()
+
 
 class RMSAEnvironmentWrapper:
     def __init__(
@@ -56,7 +72,7 @@ class RMSAEnvironmentWrapper:
         self._factory = factory
         self._reward_fn = reward_fn
         self._seed = seed
-        self._env = RewardShapingWrapper(self._factory.make(seed=seed), reward_fn)
+        self._env = self._factory.make(seed=seed, reward_fn=reward_fn)
         self._rng = np.random.default_rng(seed)
 
     @property
@@ -86,4 +102,4 @@ def make_training_env(
     reward_fn: RewardFunction,
     seed: Optional[int] = None,
 ) -> gym.Env:
-    return RewardShapingWrapper(factory.make(seed=seed), reward_fn)
+    return factory.make(seed=seed, reward_fn=reward_fn)
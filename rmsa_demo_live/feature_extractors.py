@@ -0,0 +1,328 @@
+"""Feature extractors for PPO policies over the ``full`` RMSA observation.
+
+SB3's default ``FlattenExtractor`` feeds the flattened ``num_edges x
+num_freq_slots`` spectrum straight into the first dense layer, so that layer
+alone grows with links x slots (BOHAMIANN: ~2.1M weights on NSFNET).
+``SpectrumConvExtractor`` instead runs every link's slot vector through one
+shared strided 1-D convolution stack, max-pools it into a few spectral bins and
+projects it, with the link utilisation, to a small per-link embedding. The
+policy sees the request fields plus the concatenated link embeddings, so link
+identity survives while the input width becomes ``2N + 1 + E * link_dim``.
+
+No weight depends on the slot count: a trained extractor (or whole policy)
+loads into a model for the same topology with a different number of slots via
+``policy.load_state_dict``.
+
+``GatExtractor`` (the ``GatPolicy`` of ``ultra_agents.DEEPRMSA_QOT_AGENT``)
+goes further and also drops the dependence on topology size: the same link
+encoder feeds graph-attention layers over the link graph (two links are
+neighbours when they share a node) and the readout pools over links, so one
+set of weights serves any topology and slot count.
+
+Agents pick an extractor by name with ``AgentConfig.features_extractor``;
+``AgentConfig.policy`` names from ``POLICY_EXTRACTORS`` select one as well.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+import gymnasium as gym
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+
+from environment import EnvironmentFactory
+
+
+def _slot_encoder(channels: int, pooled_bins: int) -> nn.Sequential:
+    # Stride 4 then 2: ~M/8 positions per channel before pooling
+    return nn.Sequential(
+        nn.Conv1d(1, channels, kernel_size=8, stride=4, padding=2),
+        nn.ReLU(),
+        nn.Conv1d(channels, channels, kernel_size=3, stride=2, padding=1),
+        nn.ReLU(),
+        nn.AdaptiveMaxPool1d(pooled_bins),
+        nn.Flatten(),
+    )
+
+
+def _spectrum_size(observation_space: gym.spaces.Box, num_nodes: int, num_edges: int) -> int:
+    spectrum_size = observation_space.shape[0] - (2 * num_nodes + 1) - num_edges
+    if spectrum_size <= 0 or spectrum_size % num_edges:
+        raise ValueError(
+            f"Observation of size {observation_space.shape[0]} is not a full RMSA observation "
+            f"for {num_nodes} nodes and {num_edges} links"
+        )
+    return spectrum_size
+
+
+class SpectrumConvExtractor(BaseFeaturesExtractor):
+    """Shared 1-D conv over each link's slots, concatenated per-link embeddings.
+
+    Observation layout (``RMSAEnv`` full mode): source one-hot (N), destination
+    one-hot (N), bit rate (1), spectrum (E x M), link utilisation (E); ``M`` is
+    inferred from the observation size.
+    """
+
+    layout_keys = ("num_nodes", "num_edges")
+    shares_activation = False
+
+    def __init__(
+        self,
+        observation_space: gym.spaces.Box,
+        num_nodes: int,
+        num_edges: int,
+        channels: int = 8,
+        pooled_bins: int = 4,
+        link_dim: int = 8,
+    ) -> None:
+        request_size = 2 * num_nodes + 1
+        spectrum_size = _spectrum_size(observation_space, num_nodes, num_edges)
+        super().__init__(observation_space, features_dim=request_size + num_edges * link_dim)
+
+        self.num_edges = num_edges
+        self.num_freq_slots = spectrum_size // num_edges
+        self._request_size = request_size
+        self._spectrum_end = request_size + spectrum_size
+
+        self.slot_conv = _slot_encoder(channels, pooled_bins)
+        self.link_head = nn.Sequential(nn.Linear(channels * pooled_bins + 1, link_dim), nn.ReLU())
+
+    def forward(self, observations: torch.Tensor) -> torch.Tensor:
+        batch = observations.shape[0]
+        request = observations[:, : self._request_size]
+        spectrum = observations[:, self._request_size : self._spectrum_end]
+        utilisation = observations[:, self._spectrum_end :]
+
+        links = self.slot_conv(spectrum.reshape(batch * self.num_edges, 1, self.num_freq_slots))
+        links = self.link_head(torch.cat([links, utilisation.reshape(batch * self.num_edges, 1)], dim=1))
+        return torch.cat([request, links.reshape(batch, -1)], dim=1)
+
+
+def line_graph_edges(links: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """``(2, L)`` source/target link indices: every ordered pair of links sharing a
+    node, plus a self loop per link."""
+
+    by_node: Dict[int, list] = {}
+    for idx, (u, v) in enumerate(links):
+        by_node.setdefault(u, []).append(idx)
+        by_node.setdefault(v, []).append(idx)
+    pairs = {(i, i) for i in range(len(links))}
+    for incident in by_node.values():
+        pairs.update((a, b) for a in incident for b in incident)
+    return np.array(sorted(pairs), dtype=np.int64).T
+
+
+class GraphAttentionLayer(nn.Module):
+    """Multi-head GAT layer over a batch of copies of one sparse graph.
+
+    Nodes of all graphs are stacked as ``(batch * num_nodes, features)``;
+    attention logits, the per-target softmax and the aggregation are computed
+    per edge with ``scatter_reduce`` / ``index_add_``, so cost grows with edges,
+    not nodes squared.
+    """
+
+    def __init__(self, in_dim: int, out_dim: int, heads: int, activation: nn.Module) -> None:
+        super().__init__()
+        if out_dim % heads:
+            raise ValueError(f"GAT hidden size {out_dim} is not divisible by {heads} heads")
+        self.heads = heads
+        self.head_dim = out_dim // heads
+        self.proj = nn.Linear(in_dim, out_dim, bias=False)
+        self.att_source = nn.Parameter(torch.empty(heads, self.head_dim))
+        self.att_target = nn.Parameter(torch.empty(heads, self.head_dim))
+        self.bias = nn.Parameter(torch.zeros(out_dim))
+        self.activation = activation
+        nn.init.xavier_uniform_(self.att_source)
+        nn.init.xavier_uniform_(self.att_target)
+
+    def forward(self, h: torch.Tensor, source: torch.Tensor, target: torch.Tensor) -> torch.Tensor:
+        z = self.proj(h)
+        heads = z.view(-1, self.heads, self.head_dim)
+        # (n, heads, 2): source and target attention terms in one contraction
+        scores = torch.einsum("nhd,hkd->nhk", heads, torch.stack([self.att_source, self.att_target], dim=1))
+        logits = F.leaky_relu(
+            scores[..., 0].index_select(0, source) + scores[..., 1].index_select(0, target), 0.2
+        )
+        # Softmax over the incoming edges of each target; every node has a self loop
+        with torch.no_grad():
+            peak = torch.full_like(scores[..., 0], -torch.inf).scatter_reduce_(
+                0, target[:, None].expand_as(logits), logits, reduce="amax"
+            )
+        weights = (logits - peak.index_select(0, target)).exp()
+        norm = torch.zeros_like(peak).index_add_(0, target, weights)
+        alpha = weights / norm.index_select(0, target)
+        messages = (heads.index_select(0, source) * alpha.unsqueeze(-1)).flatten(1)
+        out = self.activation(torch.zeros_like(z).index_add_(0, target, messages) + self.bias)
+        return out + h if out.shape == h.shape else out
+
+
+class GatExtractor(BaseFeaturesExtractor):
+    """Graph attention over the link graph; weights independent of topology and slots.
+
+    Each link starts from its spectrum encoding (as in ``SpectrumConvExtractor``),
+    utilisation, normalised length, whether it touches the request's source or
+    destination and the bit rate. After ``gat_layers`` attention layers the
+    features are: mean and max over all links, mean over the links at the source
+    and at the destination, and the bit rate (``4 * gat_hidden_dim + 1``).
+
+    ``links`` and ``link_km`` (edge order of ``RMSAEnv.spectrum_state``) become
+    non-persistent buffers, so a saved policy loads onto any topology.
+    ``activation_fn`` is shared with the policy network (``AgentConfig.activation``).
+    """
+
+    layout_keys = ("num_nodes", "links", "link_km")
+    shares_activation = True
+
+    def __init__(
+        self,
+        observation_space: gym.spaces.Box,
+        num_nodes: int,
+        links: Sequence[Tuple[int, int]],
+        link_km: Sequence[float],
+        gat_layers: int = 2,
+        gat_hidden_dim: int = 128,
+        gat_heads: int = 4,
+        activation_fn: Type[nn.Module] = nn.ELU,
+        channels: int = 8,
+        pooled_bins: int = 4,
+    ) -> None:
+        num_edges = len(links)
+        spectrum_size = _spectrum_size(observation_space, num_nodes, num_edges)
+        super().__init__(observation_space, features_dim=4 * gat_hidden_dim + 1)
+
+        self.num_nodes = num_nodes
+        self.num_edges = num_edges
+        self.num_freq_slots = spectrum_size // num_edges
+        self._spectrum_start = 2 * num_nodes + 1
+        self._spectrum_end = self._spectrum_start + spectrum_size
+
+        endpoints = torch.as_tensor(links, dtype=torch.long)
+        incidence = torch.zeros(num_nodes, num_edges)
+        incidence[endpoints[:, 0], torch.arange(num_edges)] = 1.0
+        incidence[endpoints[:, 1], torch.arange(num_edges)] = 1.0
+        length = torch.as_tensor(link_km, dtype=torch.float32)
+        self.register_buffer("incidence", incidence, persistent=False)
+        self.register_buffer("link_length", length / length.max(), persistent=False)
+        self.register_buffer("edge_index", torch.from_numpy(line_graph_edges(links)), persistent=False)
+        self._edge_cache: Dict[Tuple[int, torch.device], Tuple[torch.Tensor, torch.Tensor]] = {}
+
+        self.slot_conv = _slot_encoder(channels, pooled_bins)
+        self.link_input = nn.Sequential(nn.Linear(channels * pooled_bins + 5, gat_hidden_dim), activation_fn())
+        self.gat = nn.ModuleList(
+            GraphAttentionLayer(gat_hidden_dim, gat_hidden_dim, gat_heads, activation_fn())
+            for _ in range(gat_layers)
+        )
+
+    def _batched_edges(self, batch: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        # ``batch`` disjoint copies of the link graph; rollouts and minibatches reuse few sizes
+        key = (batch, self.edge_index.device)
+        if key not in self._edge_cache:
+            offsets = torch.arange(batch, device=self.edge_index.device) * self.num_edges
+            edges = (self.edge_index[:, None, :] + offsets[None, :, None]).flatten(1)
+            self._edge_cache[key] = (edges[0], edges[1])
+        return self._edge_cache[key]
+
+    def forward(self, observations: torch.Tensor) -> torch.Tensor:
+        batch, links = observations.shape[0], self.num_edges
+        nodes = self.num_nodes
+        at_source = observations[:, :nodes] @ self.incidence  # (B, E)
+        at_destination = observations[:, nodes : 2 * nodes] @ self.incidence
+        bit_rate = observations[:, 2 * nodes : 2 * nodes + 1]
+        spectrum = observations[:, self._spectrum_start : self._spectrum_end]
+        utilisation = observations[:, self._spectrum_end :]
+
+        encoded = self.slot_conv(spectrum.reshape(batch * links, 1, self.num_freq_slots)).view(batch, links, -1)
+        per_link = torch.stack(
+            [
+                utilisation,
+                self.link_length.expand(batch, links),
+                at_source,
+                at_destination,
+                bit_rate.expand(batch, links),
+            ],
+            dim=-1,
+        )
+        h = self.link_input(torch.cat([encoded, per_link], dim=-1).view(batch * links, -1))
+
+        source, target = self._batched_edges(batch)
+        for layer in self.gat:
+            h = layer(h, source, target)
+
+        h = h.view(batch, links, -1)
+        endpoints = torch.stack([at_source, at_destination], dim=1)  # (B, 2, E)
+        endpoint_mean = (endpoints @ h) / endpoints.sum(-1, keepdim=True).clamp_min(1.0)
+        return torch.cat([h.mean(1), h.amax(1), endpoint_mean.flatten(1), bit_rate], dim=1)
+
+
+# None keeps SB3's FlattenExtractor
+FEATURE_EXTRACTORS: Dict[str, Optional[type]] = {
+    "flatten": None,
+    "spectrum_conv": SpectrumConvExtractor,
+    "gat": GatExtractor,
+}
+
+# Custom policy names (as in ultra_agents.py) and the extractor they stand for
+POLICY_EXTRACTORS: Dict[str, str] = {
+    "MlpPolicy": "flatten",
+    "DropoutMlpPolicy": "flatten",
+    "GatPolicy": "gat",
+}
+
+
+def observation_layout(factory: EnvironmentFactory) -> Dict[str, Any]:
+    """Topology facts extractors are built from (``layout_keys``)."""
+
+    env = factory.make()
+    try:
+        base = env.unwrapped
+        if base.observation_mode != "full":
+            raise ValueError(
+                f"Spectrum feature extractors need observation_mode='full', got '{base.observation_mode}'"
+            )
+        topology = base.compiled_topology
+        return {
+            "num_nodes": base.num_nodes,
+            "num_edges": base.num_edges,
+            "links": [tuple(int(node) for node in pair) for pair in topology.edge_endpoints],
+            "link_km": [float(km) for km in topology.distances],
+        }
+    finally:
+        env.close()
+
+
+def features_extractor_kwargs(
+    name: str,
+    factory: EnvironmentFactory,
+    activation_fn: Optional[Type[nn.Module]] = None,
+    **overrides: Any,
+) -> Dict[str, Any]:
+    """``policy_kwargs`` entries selecting extractor ``name`` (empty for the default).
+
+    Extractors with ``shares_activation`` get the policy's ``activation_fn``.
+    """
+
+    if name not in FEATURE_EXTRACTORS:
+        raise ValueError(f"Unknown features extractor: {name}. Available: {', '.join(FEATURE_EXTRACTORS)}")
+    extractor = FEATURE_EXTRACTORS[name]
+    if extractor is None:
+        return {}
+    layout = observation_layout(factory)
+    kwargs = {key: layout[key] for key in extractor.layout_keys}
+    if extractor.shares_activation and activation_fn is not None:
+        kwargs["activation_fn"] = activation_fn
+    return {"features_extractor_class": extractor, "features_extractor_kwargs": {**kwargs, **overrides}}
+
+
+__all__ = [
+    "FEATURE_EXTRACTORS",
+    "GatExtractor",
+    "GraphAttentionLayer",
+    "POLICY_EXTRACTORS",
+    "SpectrumConvExtractor",
+    "features_extractor_kwargs",
+    "line_graph_edges",
+    "observation_layout",
+]
@@ -10,6 +10,7 @@ Este script automatiza:
 Uso:
     python mega_run.py              # Pipeline completo
     python mega_run.py --quick      # Solo demo (sin re-entrenar)
+    python mega_run.py --train-jobs 3   # Entrena 3 agentes a la vez
 """
 from __future__ import annotations
 
@@ -109,6 +110,7 @@ def main():
     parser.add_argument("--quick", action="store_true", help="Skip training (use existing models)")
     parser.add_argument("--no-viz", action="store_true", help="Skip dashboard generation")
     parser.add_argument("--episodes", type=int, default=200, help="Number of demo episodes")
+    parser.add_argument("--train-jobs", type=int, default=1, help="Agents trained concurrently (trainer.py --jobs)")
     args = parser.parse_args()
     
     # Banner
@@ -143,8 +145,9 @@ def main():
             
             success = run_step(
                 "1. TRAINING (6 AGENTS)",
-                [sys.executable, "rmsa_demo_live/trainer.py"],
-                "Training all 6 agents with optimized hyperparameters (~3-4 hours on Ryzen 7 5700X3D)"
+                [sys.executable, "rmsa_demo_live/trainer.py", "--jobs", str(args.train_jobs)],
+                "Training all 6 agents with optimized hyperparameters (~3-4 hours on Ryzen 7 5700X3D, "
+                f"{args.train_jobs} at a time)"
             )
             
             if not success:
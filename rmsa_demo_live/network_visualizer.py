@@ -19,6 +19,7 @@ from rmsa_environment import (
     NSFNETTopology,
     UKNETTopology,
     USNETTopology,
+    build_topology,
 )
 
 
@@ -42,14 +43,8 @@ class NetworkVisualizer:
     def _build_graphs(self) -> None:
         """Construye grafos NetworkX para todas las topologías."""
         
-        for name, topology_class in self.TOPOLOGY_MAP.items():
-            # Get topology graph - support both create_graph() and build() methods
-            if hasattr(topology_class, 'create_graph'):
-                G = topology_class.create_graph()
-            elif hasattr(topology_class, 'build'):
-                G = topology_class.build()
-            else:
-                raise AttributeError(f"{topology_class.__name__} has neither create_graph() nor build() method")
+        for name in self.TOPOLOGY_MAP:
+            G = build_topology(name)
             
             # Calculate layout (spring layout for aesthetic positioning)
             pos = nx.spring_layout(G, seed=42, k=2, iterations=50)
@@ -0,0 +1,64 @@
+"""Opt-in per-phase timers for ``RMSAEnv`` (``RMSAEnv(profile=True)``).
+
+Profiling replaces the chosen methods on one env *instance* with timed
+callables, so an env built without ``profile`` runs the plain class methods and
+pays nothing. Timers are inclusive: a phase called from another phase (e.g.
+``_find_slot`` inside ``_try_allocate``) counts in both.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class _TimedCall:
+    """Calls ``function(owner, ...)`` and adds its duration to ``counters``.
+
+    Holds the owner explicitly rather than a bound method, so ``copy.deepcopy``
+    of a profiled env re-targets the timers at the copy.
+    """
+
+    def __init__(self, owner: Any, function: Callable, counters: List[int]) -> None:
+        self.owner = owner
+        self.function = function
+        self.counters = counters
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return self.function(self.owner, *args, **kwargs)
+        finally:
+            self.counters[0] += 1
+            self.counters[1] += time.perf_counter_ns() - start
+
+
+class PhaseProfiler:
+    """Call counts and nanosecond totals per instrumented method."""
+
+    def __init__(self, owner: Any, phases: Iterable[str], total: str = "step") -> None:
+        self.total = total
+        self.counters: Dict[str, List[int]] = {}
+        for name in (total, *phases):
+            counters = [0, 0]
+            self.counters[name] = counters
+            setattr(owner, name, _TimedCall(owner, getattr(type(owner), name), counters))
+
+    def reset(self) -> None:
+        for counters in self.counters.values():
+            counters[0] = counters[1] = 0
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per phase: ``calls``, ``total_ms``, ``mean_us`` and ``share`` of the ``total`` phase time."""
+        total_ns = max(self.counters[self.total][1], 1)
+        return {
+            name: {
+                "calls": calls,
+                "total_ms": elapsed / 1e6,
+                "mean_us": elapsed / max(calls, 1) / 1e3,
+                "share": elapsed / total_ns,
+            }
+            for name, (calls, elapsed) in self.counters.items()
+        }
+
+
+__all__ = ["PhaseProfiler"]
@@ -2,13 +2,60 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import gymnasium as gym
 import networkx as nx
 import numpy as np
 from gymnasium import spaces
 
+from profiling import PhaseProfiler
+from reward_functions import RewardFunction
+from routing import CompiledTopology, PathTable, get_compiled_topology, get_path_table, get_slot_table
+from simulation import ConnectionSnapshot, ConnectionTable
+from spectrum import (
+    FIT_STRATEGIES,
+    SPECTRUM_BACKENDS,
+    SpectrumSnapshot,
+    free_blocks,
+    largest_free_block,
+    make_spectrum,
+)
+from topology_generator import parse_synthetic_name, synthetic_topology
+from topology_io import is_topology_file, read_topology
+from traffic import TraceReplay, TrafficGenerator, TrafficSpec, resolve_traffic_matrix
+
+
+# Bit rates: 25, 50, 100, 200, 400 Gbps
+BIT_RATES = (25, 50, 100, 200, 400)
+
+OBSERVATION_MODES = ("full", "path")
+
+# Methods timed by RMSAEnv(profile=True), besides step itself
+PROFILE_PHASES = (
+    "_lookup_route",
+    "_get_k_shortest_paths",
+    "_try_allocate",
+    "_find_slot",
+    "_find_first_fit",
+    "_release_expired",
+    "_generate_request",
+    "_get_observation",
+    "_get_info",
+    "_calculate_fragmentation",
+)
+
+# Per (candidate path, modulation) features of the "path" observation mode
+PATH_FEATURES = (
+    "required_slots",
+    "path_length",
+    "first_fit",
+    "largest_block",
+    "feasible_blocks",
+    "reach_ok",
+)
+
 
 @dataclass
 class ConnectionRequest:
@@ -17,6 +64,26 @@ class ConnectionRequest:
     bit_rate: float  # Gbps
     arrival_time: float
     holding_time: float
+    bit_rate_class: int = 0  # index into BIT_RATES
+
+
+@dataclass(frozen=True)
+class EnvState:
+    """Everything ``RMSAEnv.step`` reads or writes, captured by ``get_state()``.
+
+    Requests and pre-drawn traffic blocks are shared with the env rather than
+    copied, since neither is ever modified in place.
+    """
+
+    spectrum: SpectrumSnapshot
+    connections: ConnectionSnapshot
+    traffic: Tuple
+    observation: np.ndarray
+    current_request: Optional[ConnectionRequest]
+    clock: float
+    num_requests: int
+    allocated: int
+    blocked: int
 
 
 class NSFNETTopology:
@@ -394,6 +461,46 @@ class BRAZILTopology:
         return G
 
 
+# Graph builders by topology name. Synthetic names (``WAXMAN-100``,
+# ``GEOMETRIC-500-S3``) are resolved by ``topology_generator`` and paths to
+# SNDlib XML / GML / JSON files by ``topology_io`` instead.
+TOPOLOGY_BUILDERS: Dict[str, Callable[[], nx.Graph]] = {
+    "NSFNET": NSFNETTopology.create_graph,
+    "USNET": USNETTopology.create_graph,
+    "EURO": EUROTopology.build,
+    "UKNET": UKNETTopology.build,
+    "JAPAN": JAPANTopology.build,
+    "BRAZIL": BRAZILTopology.build,
+}
+
+
+def register_topology(name: str, builder: Callable[[], nx.Graph]) -> None:
+    """Make ``RMSAEnv(topology=name)`` build its graph with ``builder``.
+
+    Nodes must be labelled ``0..N-1`` and every link needs ``distance`` and
+    ``weight`` attributes in km. ``name`` also keys the process-wide routing
+    caches, so it must always map to the same graph.
+    """
+
+    TOPOLOGY_BUILDERS[name] = builder
+
+
+def build_topology(name: str) -> nx.Graph:
+    """Graph of a registered or synthetic topology."""
+
+    builder = TOPOLOGY_BUILDERS.get(name)
+    if builder is not None:
+        return builder()
+    if parse_synthetic_name(name) is not None:
+        return synthetic_topology(name)
+    if is_topology_file(name):
+        return read_topology(name)
+    raise ValueError(
+        f"Unknown topology: {name}. Available: {', '.join(TOPOLOGY_BUILDERS)}, "
+        "a synthetic WAXMAN-<nodes>[-S<seed>] / GEOMETRIC-<nodes>[-S<seed>] or a topology file"
+    )
+
+
 class RMSAEnv(gym.Env):
     """Routing, Modulation and Spectrum Assignment environment."""
 
@@ -406,39 +513,65 @@ class RMSAEnv(gym.Env):
         episode_length: int = 100,
         load: float = 0.8,
         seed: Optional[int] = None,
+        spectrum_assignment: str = "first_fit",
+        spectrum_backend: str = "dense",
+        dynamic_traffic: bool = True,
+        mean_holding_time: Optional[float] = None,
+        copy_observation: bool = True,
+        observation_mode: str = "full",
+        traffic_matrix: TrafficSpec = None,
+        traffic_trace: Optional[str] = None,
+        reward_fn: Optional[RewardFunction] = None,
+        profile: bool = False,
         **kwargs
     ):
         super().__init__()
 
+        if spectrum_assignment not in FIT_STRATEGIES:
+            raise ValueError(
+                f"Unknown spectrum assignment: {spectrum_assignment}. Available: {', '.join(FIT_STRATEGIES)}"
+            )
+        if observation_mode not in OBSERVATION_MODES:
+            raise ValueError(
+                f"Unknown observation mode: {observation_mode}. Available: {', '.join(OBSERVATION_MODES)}"
+            )
+        if spectrum_backend not in SPECTRUM_BACKENDS:
+            raise ValueError(
+                f"Unknown spectrum backend: {spectrum_backend}. Available: {', '.join(SPECTRUM_BACKENDS)}"
+            )
+
         self.episode_length = episode_length
         self.load = load
         self.num_freq_slots = num_freq_slots
+        self.spectrum_assignment = spectrum_assignment
+        self.dynamic_traffic = dynamic_traffic
+        self.copy_observation = copy_observation
+        self.observation_mode = observation_mode
+        # Reward shaping fused into step (EnvironmentFactory fast path), same
+        # contract as environment.RewardShapingWrapper
+        self.reward_fn = reward_fn
         self.num_requests = 0
         self.current_request: Optional[ConnectionRequest] = None
+        self.clock = 0.0
 
         # Create network topology
-        if topology == "NSFNET":
-            self.graph = NSFNETTopology.create_graph()
-        elif topology == "USNET":
-            self.graph = USNETTopology.create_graph()
-        elif topology == "EURO":
-            self.graph = EUROTopology.build()
-        elif topology == "UKNET":
-            self.graph = UKNETTopology.build()
-        elif topology == "JAPAN":
-            self.graph = JAPANTopology.build()
-        elif topology == "BRAZIL":
-            self.graph = BRAZILTopology.build()
-        else:
-            raise ValueError(f"Unknown topology: {topology}. Available: NSFNET, USNET, EURO, UKNET, JAPAN, BRAZIL")
+        self.graph = build_topology(topology)
 
         self.num_nodes = self.graph.number_of_nodes()
         self.num_edges = self.graph.number_of_edges()
 
-        # Spectrum state: [num_edges x num_freq_slots]
-        self.spectrum_state = np.zeros((self.num_edges, num_freq_slots), dtype=np.int8)
+        # Spectrum state: [num_edges x num_freq_slots], dense int8 or bit-packed uint64 words
+        self.spectrum = make_spectrum(spectrum_backend, self.num_edges, num_freq_slots)
         self.edge_list = list(self.graph.edges())
 
+        # Array form of the graph and k-shortest paths, shared by all envs on this topology
+        self.compiled_topology: CompiledTopology = get_compiled_topology(topology, self.graph)
+        self.k_paths = 3
+        self.path_table: PathTable = get_path_table(topology, self.graph, self.k_paths)
+
+        # Active lightpaths keyed by departure time (dynamic traffic)
+        self.connections = ConnectionTable(max_hops=self.path_table.max_hops)
+
         # Statistics
         self.allocated = 0
         self.blocked = 0
@@ -450,33 +583,97 @@ class RMSAEnv(gym.Env):
             "8QAM": {"reach": 1000, "spectral_efficiency": 3},
             "16QAM": {"reach": 500, "spectral_efficiency": 4},
         }
+        self.modulation_names = tuple(self.modulations)
+        self._reach_km = np.array([m["reach"] for m in self.modulations.values()], dtype=np.float64)
+        self._efficiency = np.array(
+            [m["spectral_efficiency"] for m in self.modulations.values()], dtype=np.float64
+        )
+
+        # Required slots per [source, destination, path, modulation, bit rate class],
+        # -1 where the path is missing or out of reach
+        self.slot_table = get_slot_table(topology, self.path_table, self._reach_km, self._efficiency, BIT_RATES)
+
+        # Node-pair demand distribution: None (uniform), "gravity" or an (N, N) array
+        self.traffic_matrix = resolve_traffic_matrix(traffic_matrix, self.graph)
+
+        # Unit-rate Poisson arrivals; holding time scaled so ``load`` is the offered
+        # fraction of total spectrum unless given explicitly
+        if mean_holding_time is None:
+            mean_holding_time = self._normalized_holding_time()
+        self.mean_holding_time = mean_holding_time
+
+        # Requests are pre-generated in blocks; the stream depends only on the seed,
+        # or is replayed from a recorded trace (reset(seed=...) then rewinds it)
+        self.traffic: Union[TrafficGenerator, TraceReplay]
+        if traffic_trace is not None:
+            self.traffic = TraceReplay(traffic_trace, num_nodes=self.num_nodes)
+        else:
+            self.traffic = TrafficGenerator(
+                self.num_nodes, len(BIT_RATES), mean_holding_time, seed=seed, traffic_matrix=self.traffic_matrix
+            )
 
         # Action space: k-shortest paths × modulation formats
-        self.k_paths = 3
         self.num_modulations = len(self.modulations)
         action_space_size = self.k_paths * self.num_modulations
         self.action_space = spaces.Discrete(action_space_size)
 
         # Observation space
-        obs_size = (
-            self.num_nodes * 2  # source and destination one-hot
-            + 1  # bit rate normalized
-            + self.num_edges * self.num_freq_slots  # spectrum state
-            + self.num_edges  # current link utilization
-        )
+        if observation_mode == "path":
+            # DeepRMSA-style: bit rate + k paths x modulations x PATH_FEATURES,
+            # independent of topology size
+            obs_size = 1 + self.k_paths * self.num_modulations * len(PATH_FEATURES)
+        else:
+            obs_size = (
+                self.num_nodes * 2  # source and destination one-hot
+                + 1  # bit rate normalized
+                + self.num_edges * self.num_freq_slots  # spectrum state
+                + self.num_edges  # current link utilization
+            )
         self.observation_space = spaces.Box(
             low=0.0, high=1.0, shape=(obs_size,), dtype=np.float32
         )
 
-        self.rng = np.random.default_rng(seed)
+        # Persistent observation buffer with a fixed view per segment; only the
+        # request fields and the spectrum cells touched by a step are rewritten.
+        # With copy_observation=False the buffer itself is returned, which suits
+        # vectorised wrappers that copy into their own storage anyway; the last
+        # observation of an episode is still a copy, because auto-reset wrappers
+        # keep it as ``terminal_observation`` across the reset that follows.
+        self._obs_buffer = np.zeros(obs_size, dtype=np.float32)
+        self._obs_spectrum: Optional[np.ndarray] = None
+        if observation_mode == "path":
+            self._obs_bit_rate = self._obs_buffer[:1]
+            self._obs_paths = self._obs_buffer[1:].reshape(
+                self.k_paths, self.num_modulations, len(PATH_FEATURES)
+            )
+        else:
+            offset = 0
+            self._obs_source = self._obs_buffer[offset : offset + self.num_nodes]
+            offset += self.num_nodes
+            self._obs_destination = self._obs_buffer[offset : offset + self.num_nodes]
+            offset += self.num_nodes
+            self._obs_bit_rate = self._obs_buffer[offset : offset + 1]
+            offset += 1
+            spectrum_size = self.num_edges * self.num_freq_slots
+            self._obs_spectrum = self._obs_buffer[offset : offset + spectrum_size].reshape(
+                self.num_edges, self.num_freq_slots
+            )
+            offset += spectrum_size
+            self._obs_link_util = self._obs_buffer[offset : offset + self.num_edges]
+
+        # Per-phase timers; without profile the class methods run untouched
+        self.profiler: Optional[PhaseProfiler] = PhaseProfiler(self, PROFILE_PHASES) if profile else None
 
     def reset(
         self, seed: Optional[int] = None, options: Optional[Dict] = None
     ) -> Tuple[np.ndarray, Dict[str, Any]]:
         if seed is not None:
-            self.rng = np.random.default_rng(seed)
+            self.traffic.seed(seed)
 
-        self.spectrum_state.fill(0)
+        self.spectrum.clear()
+        self._obs_buffer.fill(0.0)
+        self.connections.clear()
+        self.clock = 0.0
         self.num_requests = 0
         self.allocated = 0
         self.blocked = 0
@@ -492,18 +689,20 @@ class RMSAEnv(gym.Env):
         mod_idx = action % self.num_modulations
 
         # Decode action
-        paths = self._get_k_shortest_paths(
-            self.current_request.source, self.current_request.destination
-        )
+        request = self.current_request
+        source = request.source
+        destination = request.destination
+        path = None
 
-        if path_idx >= len(paths):
+        if path_idx >= self.path_table.num_paths[source, destination]:
             # Invalid path index
             allocated = False
             reward = -1.0
         else:
-            path = paths[path_idx]
-            modulation = list(self.modulations.keys())[mod_idx]
-            allocated = self._try_allocate(path, modulation, self.current_request.bit_rate)
+            path, edges = self._lookup_route(source, destination, path_idx)
+            # Out-of-reach modulations are rejected before the spectrum is touched
+            required_slots = int(self.slot_table[source, destination, path_idx, mod_idx, request.bit_rate_class])
+            allocated = required_slots > 0 and self._try_allocate(edges, required_slots)
             reward = 1.0 if allocated else -1.0
 
         if allocated:
@@ -515,131 +714,280 @@ class RMSAEnv(gym.Env):
         terminated = self.num_requests >= self.episode_length
         truncated = False
 
-        # Generate next request
+        # Generate next request and release lightpaths that departed before it arrives
         if not terminated:
             self.current_request = self._generate_request()
+            if self.dynamic_traffic:
+                self._release_expired(self.current_request.arrival_time)
 
-        obs = self._get_observation()
-        info = self._get_info(allocated=allocated, path=path if path_idx < len(paths) else None)
+        obs = self._get_observation(copy=terminated or truncated)
+        info = self._get_info(allocated=allocated, path=path)
+        if self.reward_fn is not None:
+            reward = self.reward_fn(obs, action, reward, terminated or truncated, info)
+            info["shaped_reward"] = reward
 
         return obs, reward, terminated, truncated, info
 
+    def get_state(self) -> EnvState:
+        """Snapshot the simulation for lookahead; restore it with :meth:`set_state`."""
+        return EnvState(
+            spectrum=self.spectrum.snapshot(),
+            connections=self.connections.snapshot(),
+            traffic=self.traffic.get_state(),
+            observation=self._obs_buffer.copy(),
+            current_request=self.current_request,
+            clock=self.clock,
+            num_requests=self.num_requests,
+            allocated=self.allocated,
+            blocked=self.blocked,
+        )
+
+    def set_state(self, state: EnvState) -> None:
+        """Return to ``state``; the same snapshot can be restored any number of times."""
+        self.spectrum.restore(state.spectrum)
+        self.connections.restore(state.connections)
+        self.traffic.set_state(state.traffic)
+        np.copyto(self._obs_buffer, state.observation)
+        self.current_request = state.current_request
+        self.clock = state.clock
+        self.num_requests = state.num_requests
+        self.allocated = state.allocated
+        self.blocked = state.blocked
+
+    def record_trace(self, path: Union[str, Path], num_requests: int, seed: Optional[int] = None) -> Path:
+        """Record ``num_requests`` requests of this env's traffic model to a trace file.
+
+        Replay it with ``RMSAEnv(traffic_trace=path)``; holding times are fixed at
+        this env's ``mean_holding_time``.
+        """
+        generator = TrafficGenerator(
+            self.num_nodes, len(BIT_RATES), self.mean_holding_time, seed=seed, traffic_matrix=self.traffic_matrix
+        )
+        return generator.record(path, num_requests)
+
+    def candidate_paths(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Candidate paths of the current request as arrays.
+
+        Returns ``required`` ``(k, M)`` slots from ``slot_table`` (-1 if infeasible),
+        the joint ``occupied`` spectrum ``(k, F)`` of each path (all occupied for
+        missing paths) and the path ``hops`` ``(k,)``.
+        """
+        request = self.current_request
+        source, destination = request.source, request.destination
+        occupied = np.ones((self.k_paths, self.num_freq_slots), dtype=bool)
+        for path_idx in range(int(self.path_table.num_paths[source, destination])):
+            edges = self.path_table.path_edges(source, destination, path_idx)
+            occupied[path_idx] = self.spectrum.joint_occupancy(edges)
+        required = self.slot_table[source, destination, :, :, request.bit_rate_class]
+        return required, occupied, self.path_table.hops[source, destination]
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean mask of the actions that would allocate the current request.
+
+        An action is valid when its path exists, the modulation reaches the
+        destination (``slot_table``) and the path has a free block at least as long
+        as the required slots. If nothing fits every action is allowed, since the
+        request is blocked whatever the agent picks.
+        """
+        mask = np.zeros((self.k_paths, self.num_modulations), dtype=bool)
+        request = self.current_request
+        if request is not None:
+            source, destination = request.source, request.destination
+            required = self.slot_table[source, destination, :, :, request.bit_rate_class]
+            for path_idx in range(int(self.path_table.num_paths[source, destination])):
+                feasible = required[path_idx] > 0
+                if not feasible.any():
+                    continue
+                edges = self.path_table.path_edges(source, destination, path_idx)
+                largest = largest_free_block(self.spectrum.joint_occupancy(edges))
+                mask[path_idx] = feasible & (required[path_idx] <= largest)
+
+        if not mask.any():
+            mask.fill(True)
+        return mask.ravel()
+
     def _generate_request(self) -> ConnectionRequest:
-        """Generate a random connection request."""
-        source = self.rng.integers(0, self.num_nodes)
-        destination = self.rng.integers(0, self.num_nodes)
-        while destination == source:
-            destination = self.rng.integers(0, self.num_nodes)
+        """Take the next connection request from the traffic stream."""
+        source, destination, bit_rate_class, inter_arrival, holding_time = self.traffic.next()
 
-        # Bit rates: 25, 50, 100, 200, 400 Gbps
-        bit_rate = self.rng.choice([25, 50, 100, 200, 400])
+        # Exponential holding time, Poisson arrivals (unit rate) advance the clock
+        self.clock += inter_arrival
 
-        # Exponential arrival and holding times
-        mean_holding = 1.0 / self.load
-        holding_time = self.rng.exponential(mean_holding)
-        arrival_time = self.rng.exponential(1.0)
+        return ConnectionRequest(
+            source, destination, BIT_RATES[bit_rate_class], self.clock, holding_time, bit_rate_class
+        )
 
-        return ConnectionRequest(source, destination, bit_rate, arrival_time, holding_time)
+    def _normalized_holding_time(self) -> float:
+        """Mean holding time for which ``load`` is the offered share of total spectrum.
+
+        With unit arrival rate the network carries ``mean_holding_time`` connections on
+        average; each is sized on its shortest path with the most efficient modulation
+        in reach, and node pairs are weighted by ``traffic_matrix`` when one is set.
+        """
+        table = self.path_table
+        routable = table.num_paths > 0
+        hops = table.hops[..., 0][routable].astype(np.float64)
+        lengths = table.lengths_km[..., 0][routable]
+
+        reach, efficiency = self._reach_km, self._efficiency
+        best = np.where(lengths[:, None] <= reach[None, :], efficiency[None, :], 0.0).max(axis=1)
+        in_reach = best > 0
+        if not np.any(in_reach):
+            return 1.0 / max(self.load, 1e-9)
+
+        slots = np.ceil(np.asarray(BIT_RATES, dtype=np.float64)[None, :] / (12.5 * best[in_reach, None]))
+        pair_footprint = (hops[in_reach, None] * slots).mean(axis=1)
+        weights = None if self.traffic_matrix is None else self.traffic_matrix[routable][in_reach]
+        if weights is not None and weights.sum() <= 0:
+            weights = None
+        footprint = float(np.average(pair_footprint, weights=weights))
+        return self.load * self.num_edges * self.num_freq_slots / footprint
+
+    def _release_expired(self, now: float) -> int:
+        """Release every lightpath whose departure time is at or before ``now``."""
+        expired = self.connections.pop_expired(now)
+        if expired.size:
+            edges, starts, lengths = self.connections.slot_ranges(expired)
+            self.spectrum.release_many(edges, starts, lengths)
+            if self._obs_spectrum is not None:
+                self._sync_observation_rows(np.unique(edges))
+        return int(expired.size)
+
+    def profile_report(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Calls and time per phase since construction (or the last ``reset``); needs ``profile=True``."""
+        if self.profiler is None:
+            raise RuntimeError("Profiling is disabled; create the env with profile=True")
+        report = self.profiler.report()
+        if reset:
+            self.profiler.reset()
+        return report
+
+    def _lookup_route(self, source: int, dest: int, path_idx: int) -> Tuple[list, np.ndarray]:
+        """Node sequence and edge indices of one precomputed path."""
+        return self.path_table.path(source, dest, path_idx), self.path_table.path_edges(source, dest, path_idx)
 
     def _get_k_shortest_paths(self, source: int, dest: int) -> list:
         """Get k-shortest paths between source and destination."""
-        try:
-            paths = list(
-                nx.shortest_simple_paths(self.graph, source, dest, weight="weight")
-            )
-            return paths[: self.k_paths]
-        except nx.NetworkXNoPath:
-            return []
-
-    def _try_allocate(self, path: list, modulation: str, bit_rate: float) -> bool:
-        """Try to allocate spectrum for the request."""
-        # Check if path length is within modulation reach
-        path_length = sum(
-            self.graph[path[i]][path[i + 1]]["distance"] for i in range(len(path) - 1)
-        )
-
-        if path_length > self.modulations[modulation]["reach"]:
-            return False
+        return self.path_table.paths(source, dest)
 
-        # Calculate required slots
-        spectral_efficiency = self.modulations[modulation]["spectral_efficiency"]
-        required_slots = int(np.ceil(bit_rate / (12.5 * spectral_efficiency)))
+    def _try_allocate(self, edges: np.ndarray, required_slots: int) -> bool:
+        """Try to allocate ``required_slots`` contiguous slots on the links ``edges``.
 
-        # Find first-fit slot
-        slot = self._find_first_fit(path, required_slots)
+        Reach and slot count come from ``slot_table``, so only the spectrum is checked here.
+        """
+        # Find a slot block with the configured assignment strategy
+        slot = self._find_slot(edges, required_slots)
 
         if slot is None:
             return False
 
         # Allocate spectrum
-        for i in range(len(path) - 1):
-            edge_idx = self._get_edge_index(path[i], path[i + 1])
-            self.spectrum_state[edge_idx, slot : slot + required_slots] = 1
+        self.spectrum.allocate(edges, slot, required_slots)
+        if self._obs_spectrum is not None:
+            self._obs_spectrum[edges, slot : slot + required_slots] = 1.0
+            self._obs_link_util[edges] = self.spectrum.edge_occupancy()[edges] / self.num_freq_slots
+        if self.dynamic_traffic:
+            request = self.current_request
+            self.connections.add(edges, slot, required_slots, request.arrival_time + request.holding_time)
 
         return True
 
-    def _find_first_fit(self, path: list, required_slots: int) -> Optional[int]:
-        """Find first available slot block that fits on all edges of the path."""
-        max_start = self.num_freq_slots - required_slots
-
-        for start in range(max_start + 1):
-            available = True
-            for i in range(len(path) - 1):
-                edge_idx = self._get_edge_index(path[i], path[i + 1])
-                if np.any(self.spectrum_state[edge_idx, start : start + required_slots]):
-                    available = False
-                    break
+    @property
+    def spectrum_state(self) -> np.ndarray:
+        """Dense ``int8`` view of the spectrum (unpacked copy for the bit-packed backend)."""
+        return self.spectrum.to_dense()
 
-            if available:
-                return start
+    def _find_slot(self, edges: np.ndarray, required_slots: int) -> Optional[int]:
+        """Find a slot block free on all edges of the path using ``spectrum_assignment``."""
+        return self.spectrum.find_slot(edges, required_slots, self.spectrum_assignment)
 
-        return None
+    def _find_first_fit(self, edges: np.ndarray, required_slots: int) -> Optional[int]:
+        """Find first available slot block that fits on all edges of the path."""
+        return self.spectrum.find_slot(edges, required_slots, "first_fit")
 
     def _get_edge_index(self, u: int, v: int) -> int:
         """Get edge index in edge list."""
-        try:
-            return self.edge_list.index((u, v))
-        except ValueError:
-            return self.edge_list.index((v, u))
-
-    def _get_observation(self) -> np.ndarray:
-        """Build observation vector."""
-        obs_parts = []
+        return int(self.compiled_topology.edge_ids[u, v])
+
+    def _sync_observation_rows(self, rows: np.ndarray) -> None:
+        """Refresh the spectrum and utilization segments of the buffer for ``rows``."""
+        self._obs_spectrum[rows] = self.spectrum.dense_rows(rows)
+        self._obs_link_util[rows] = self.spectrum.edge_occupancy()[rows] / self.num_freq_slots
+
+    def _get_observation(self, copy: bool = False) -> np.ndarray:
+        """Build observation vector.
+
+        Layout: source one-hot, destination one-hot, normalized bit rate, flattened
+        spectrum state and per-link utilization. Spectrum segments are kept in sync
+        by allocation/release, so only the request fields are written here.
+        ``copy`` forces a copy even with ``copy_observation=False``.
+        """
+        copy = copy or self.copy_observation
+        if self.observation_mode == "path":
+            self._fill_path_observation()
+            return self._obs_buffer.copy() if copy else self._obs_buffer
+
+        self._obs_source.fill(0.0)
+        self._obs_destination.fill(0.0)
+        self._obs_bit_rate[0] = 0.0
 
-        # Source one-hot
-        source_onehot = np.zeros(self.num_nodes, dtype=np.float32)
         if self.current_request:
-            source_onehot[self.current_request.source] = 1.0
-        obs_parts.append(source_onehot)
-
-        # Destination one-hot
-        dest_onehot = np.zeros(self.num_nodes, dtype=np.float32)
-        if self.current_request:
-            dest_onehot[self.current_request.destination] = 1.0
-        obs_parts.append(dest_onehot)
-
-        # Bit rate normalized
-        bit_rate_norm = np.array([self.current_request.bit_rate / 400.0], dtype=np.float32) if self.current_request else np.array([0.0])
-        obs_parts.append(bit_rate_norm)
-
-        # Spectrum state flattened
-        spectrum_flat = self.spectrum_state.flatten().astype(np.float32)
-        obs_parts.append(spectrum_flat)
-
-        # Link utilization
-        link_util = self.spectrum_state.mean(axis=1).astype(np.float32)
-        obs_parts.append(link_util)
-
-        return np.concatenate(obs_parts)
+            self._obs_source[self.current_request.source] = 1.0
+            self._obs_destination[self.current_request.destination] = 1.0
+            self._obs_bit_rate[0] = self.current_request.bit_rate / 400.0
+
+        if copy:
+            return self._obs_buffer.copy()
+        return self._obs_buffer
+
+    def _fill_path_observation(self) -> None:
+        """Write the per (path, modulation) features of the current request."""
+        self._obs_paths.fill(0.0)
+        self._obs_bit_rate[0] = 0.0
+        request = self.current_request
+        if request is None:
+            return
+
+        self._obs_bit_rate[0] = request.bit_rate / 400.0
+        source, destination = request.source, request.destination
+        num_slots = self.num_freq_slots
+        max_blocks = (num_slots + 1) // 2
+
+        reach = self._reach_km
+        required = np.ceil(request.bit_rate / (12.5 * self._efficiency))
+
+        for path_idx in range(int(self.path_table.num_paths[source, destination])):
+            edges = self.path_table.path_edges(source, destination, path_idx)
+            length = self.path_table.lengths_km[source, destination, path_idx]
+            starts, lengths = free_blocks(self.spectrum.joint_occupancy(edges))
+
+            fits = lengths[None, :] >= required[:, None]
+            feasible = fits.sum(axis=1)
+            first_fit = np.full(self.num_modulations, num_slots, dtype=np.float64)
+            if lengths.size:
+                first_fit = np.where(feasible > 0, starts[fits.argmax(axis=1)], num_slots)
+
+            features = self._obs_paths[path_idx]
+            features[:, 0] = np.minimum(required / num_slots, 1.0)
+            features[:, 1] = min(length / reach.max(), 1.0)
+            features[:, 2] = first_fit / num_slots
+            features[:, 3] = (lengths.max() if lengths.size else 0) / num_slots
+            features[:, 4] = np.minimum(feasible / max_blocks, 1.0)
+            features[:, 5] = length <= reach
 
     def _get_info(self, allocated: bool = False, path: Optional[list] = None) -> Dict[str, Any]:
         """Build info dictionary."""
         blocking_prob = self.blocked / max(self.num_requests, 1)
         acceptance_rate = self.allocated / max(self.num_requests, 1)
 
-        spectrum_util = self.spectrum_state.mean()
+        # Counters are maintained incrementally by the spectrum backend
+        spectrum_util = self.spectrum.occupied_total / (self.num_edges * self.num_freq_slots)
         fragmentation = self._calculate_fragmentation()
 
+        # Per-slot std across links of a 0/1 matrix is sqrt(p * (1 - p))
+        slot_share = self.spectrum.slot_occupancy() / self.num_edges
+        slot_std = np.sqrt(slot_share * (1.0 - slot_share))
+
         info = {
             "allocation_success": allocated,
             "blocking_probability": blocking_prob,
@@ -647,8 +995,10 @@ class RMSAEnv(gym.Env):
             "spectral_efficiency": spectrum_util,
             "fragmentation": fragmentation,
             "qot": 0.8 if allocated else 0.0,  # Simplified QoT
-            "load_balance": 1.0 - self.spectrum_state.std(axis=0).mean(),
+            "load_balance": 1.0 - slot_std.mean(),
             "steps": self.num_requests,
+            "active_connections": len(self.connections),
+            "sim_time": self.clock,
             "connection_label": f"{self.current_request.source}→{self.current_request.destination} @ {self.current_request.bit_rate}Gbps" if self.current_request else "",
         }
 
@@ -659,15 +1009,8 @@ class RMSAEnv(gym.Env):
 
     def _calculate_fragmentation(self) -> float:
         """Calculate spectrum fragmentation index."""
-        if self.spectrum_state.sum() == 0:
-            return 0.0
-
         # Simple fragmentation: count transitions in spectrum
-        transitions = 0
-        for edge_spectrum in self.spectrum_state:
-            for i in range(len(edge_spectrum) - 1):
-                if edge_spectrum[i] != edge_spectrum[i + 1]:
-                    transitions += 1
+        transitions = self.spectrum.transitions_total
 
         max_transitions = self.num_edges * (self.num_freq_slots - 1)
         return transitions / max(max_transitions, 1)
@@ -0,0 +1,327 @@
+"""Precomputed routing tables for the RMSA environment."""
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, fields
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CompiledTopology:
+    """Array form of a topology graph for the RMSA hot path.
+
+    Edge ``i`` is ``edge_endpoints[i]`` and follows the ``graph.edges()`` order, so
+    it indexes the rows of ``RMSAEnv.spectrum_state`` directly.
+    """
+
+    num_nodes: int
+    num_edges: int
+    edge_endpoints: np.ndarray  # (E, 2) int32
+    edge_ids: np.ndarray  # (N, N) int32, edge index per node pair or -1
+    distances: np.ndarray  # (E,) float64, link length in km
+    indptr: np.ndarray  # (N + 1,) int32, CSR row pointers
+    indices: np.ndarray  # (2E,) int32, CSR neighbour nodes
+    csr_edge_ids: np.ndarray  # (2E,) int32, edge index of each CSR entry
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def incident_edges(self, node: int) -> np.ndarray:
+        return self.csr_edge_ids[self.indptr[node] : self.indptr[node + 1]]
+
+    def path_edge_ids(self, path: Sequence[int]) -> np.ndarray:
+        """Translate a node sequence into the edge indices it traverses."""
+
+        nodes = np.asarray(path, dtype=np.intp)
+        return self.edge_ids[nodes[:-1], nodes[1:]]
+
+    def path_length(self, edges: np.ndarray) -> float:
+        return float(self.distances[edges].sum())
+
+
+def compile_topology(graph: nx.Graph) -> CompiledTopology:
+    """Build the :class:`CompiledTopology` for ``graph`` (nodes must be ``0..N-1``)."""
+
+    num_nodes = graph.number_of_nodes()
+    edge_list = list(graph.edges())
+    num_edges = len(edge_list)
+
+    edge_endpoints = np.asarray(edge_list, dtype=np.int32).reshape(num_edges, 2)
+    edge_ids = np.full((num_nodes, num_nodes), -1, dtype=np.int32)
+    distances = np.zeros(num_edges, dtype=np.float64)
+    for idx, (u, v) in enumerate(edge_list):
+        edge_ids[u, v] = idx
+        edge_ids[v, u] = idx
+        distances[idx] = graph[u][v]["distance"]
+
+    # CSR adjacency: both directions of every link, grouped by source node
+    src = np.concatenate([edge_endpoints[:, 0], edge_endpoints[:, 1]])
+    dst = np.concatenate([edge_endpoints[:, 1], edge_endpoints[:, 0]])
+    eid = np.concatenate([np.arange(num_edges), np.arange(num_edges)]).astype(np.int32)
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+
+    return CompiledTopology(
+        num_nodes=num_nodes,
+        num_edges=num_edges,
+        edge_endpoints=edge_endpoints,
+        edge_ids=edge_ids,
+        distances=distances,
+        indptr=indptr,
+        indices=dst[order].astype(np.int32),
+        csr_edge_ids=eid[order],
+    )
+
+
+@dataclass(frozen=True)
+class PathTable:
+    """All-pairs k-shortest-path table for a topology.
+
+    Paths are stored as padded dense arrays indexed ``[source, destination, path_idx]``
+    so that routing during ``RMSAEnv.step`` is a pure array lookup.
+    """
+
+    k: int
+    num_paths: np.ndarray  # (N, N) int8, number of valid paths per pair
+    hops: np.ndarray  # (N, N, k) int16, links per path (0 if absent)
+    nodes: np.ndarray  # (N, N, k, max_hops + 1) int32, node sequence padded with -1
+    edge_ids: np.ndarray  # (N, N, k, max_hops) int32, edge indices padded with -1
+    lengths_km: np.ndarray  # (N, N, k) float64, path length in km
+
+    @property
+    def max_hops(self) -> int:
+        return self.edge_ids.shape[-1]
+
+    def path(self, source: int, dest: int, path_idx: int) -> List[int]:
+        """Return the node sequence of one path as a Python list."""
+
+        hops = int(self.hops[source, dest, path_idx])
+        return self.nodes[source, dest, path_idx, : hops + 1].tolist()
+
+    def paths(self, source: int, dest: int) -> List[List[int]]:
+        """Return every stored path between ``source`` and ``dest``."""
+
+        return [self.path(source, dest, i) for i in range(int(self.num_paths[source, dest]))]
+
+    def path_edges(self, source: int, dest: int, path_idx: int) -> np.ndarray:
+        """Return the edge indices traversed by one path."""
+
+        hops = int(self.hops[source, dest, path_idx])
+        return self.edge_ids[source, dest, path_idx, :hops]
+
+
+def build_path_table(graph: nx.Graph, k: int, compiled: CompiledTopology) -> PathTable:
+    """Enumerate the ``k`` shortest simple paths for every ordered node pair.
+
+    Only the first ``k`` paths of Yen's enumeration are generated for each pair,
+    in the same order ``nx.shortest_simple_paths`` yields them.
+    """
+
+    num_nodes = compiled.num_nodes
+
+    found: Dict[Tuple[int, int], List[List[int]]] = {}
+    max_hops = 1
+    for source in range(num_nodes):
+        for dest in range(num_nodes):
+            if source == dest:
+                continue
+            try:
+                paths = list(islice(nx.shortest_simple_paths(graph, source, dest, weight="weight"), k))
+            except nx.NetworkXNoPath:
+                paths = []
+            found[(source, dest)] = paths
+            for path in paths:
+                max_hops = max(max_hops, len(path) - 1)
+
+    num_paths = np.zeros((num_nodes, num_nodes), dtype=np.int8)
+    hops = np.zeros((num_nodes, num_nodes, k), dtype=np.int16)
+    nodes = np.full((num_nodes, num_nodes, k, max_hops + 1), -1, dtype=np.int32)
+    edge_ids = np.full((num_nodes, num_nodes, k, max_hops), -1, dtype=np.int32)
+    lengths_km = np.zeros((num_nodes, num_nodes, k), dtype=np.float64)
+
+    for (source, dest), paths in found.items():
+        num_paths[source, dest] = len(paths)
+        for i, path in enumerate(paths):
+            n_hops = len(path) - 1
+            path_edges = compiled.path_edge_ids(path)
+            hops[source, dest, i] = n_hops
+            nodes[source, dest, i, : n_hops + 1] = path
+            edge_ids[source, dest, i, :n_hops] = path_edges
+            lengths_km[source, dest, i] = compiled.distances[path_edges].sum()
+
+    return PathTable(
+        k=k,
+        num_paths=num_paths,
+        hops=hops,
+        nodes=nodes,
+        edge_ids=edge_ids,
+        lengths_km=lengths_km,
+    )
+
+
+def build_slot_table(
+    table: PathTable,
+    reach_km: Sequence[float],
+    spectral_efficiency: Sequence[float],
+    bit_rates: Sequence[float],
+    slot_width_ghz: float = 12.5,
+) -> np.ndarray:
+    """Required slots per ``[source, destination, path_idx, modulation, bit_rate]``.
+
+    Entries are ``ceil(bit_rate / (slot_width * efficiency))`` when the path exists
+    and is within the modulation reach, and ``-1`` otherwise, so an action can be
+    validated with a single indexed load.
+    """
+
+    reach = np.asarray(reach_km, dtype=np.float64)
+    efficiency = np.asarray(spectral_efficiency, dtype=np.float64)
+    rates = np.asarray(bit_rates, dtype=np.float64)
+
+    required = np.ceil(rates[None, :] / (slot_width_ghz * efficiency[:, None])).astype(np.int16)  # (M, B)
+    path_exists = np.arange(table.k)[None, None, :] < table.num_paths[..., None]
+    feasible = path_exists[..., None] & (table.lengths_km[..., None] <= reach)  # (N, N, k, M)
+    return np.where(feasible[..., None], required, np.int16(-1)).astype(np.int16)
+
+
+def _freeze(*arrays: np.ndarray) -> None:
+    for array in arrays:
+        array.setflags(write=False)
+
+
+# Process-wide caches: every env instance on the same topology shares these.
+_COMPILED_TOPOLOGIES: Dict[str, CompiledTopology] = {}
+_PATH_TABLES: Dict[Tuple[str, int], PathTable] = {}
+_SLOT_TABLES: Dict[Tuple, np.ndarray] = {}
+
+# Topologies whose artefacts also persist on disk, see ``persist_routing``
+_ARTEFACT_DIRS: Dict[str, Path] = {}
+
+_COMPILED_ARRAYS = tuple(f.name for f in fields(CompiledTopology) if f.name not in ("num_nodes", "num_edges"))
+_PATH_TABLE_ARRAYS = tuple(f.name for f in fields(PathTable) if f.name != "k")
+
+
+def persist_routing(topology: str, directory: Union[str, Path]) -> None:
+    """Store the routing artefacts of ``topology`` in ``directory``.
+
+    Cache misses then load them as read-only memmaps instead of rebuilding them,
+    and build-and-save on first use. The directory must change whenever the
+    graph does (``topology_io`` names it after a content hash).
+    """
+
+    _ARTEFACT_DIRS[topology] = Path(directory)
+
+
+def _load_arrays(topology: str, prefix: str, names: Sequence[str]) -> Optional[Dict[str, np.ndarray]]:
+    directory = _ARTEFACT_DIRS.get(topology)
+    if directory is None:
+        return None
+    paths = {name: directory / f"{prefix}.{name}.npy" for name in names}
+    if not all(path.exists() for path in paths.values()):
+        return None
+    return {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
+
+
+def _save_arrays(topology: str, prefix: str, arrays: Dict[str, np.ndarray]) -> None:
+    directory = _ARTEFACT_DIRS.get(topology)
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        # Write then rename, so concurrent readers never map a partial file
+        partial = directory / f".{prefix}.{name}.{os.getpid()}.npy"
+        np.save(partial, np.ascontiguousarray(array))
+        os.replace(partial, directory / f"{prefix}.{name}.npy")
+
+
+def get_compiled_topology(topology: str, graph: nx.Graph) -> CompiledTopology:
+    """Return the cached :class:`CompiledTopology` for ``topology``."""
+
+    compiled = _COMPILED_TOPOLOGIES.get(topology)
+    if compiled is None:
+        stored = _load_arrays(topology, "topology", _COMPILED_ARRAYS)
+        if stored is not None:
+            compiled = CompiledTopology(
+                num_nodes=stored["edge_ids"].shape[0], num_edges=stored["distances"].shape[0], **stored
+            )
+        else:
+            compiled = compile_topology(graph)
+            _save_arrays(topology, "topology", {name: getattr(compiled, name) for name in _COMPILED_ARRAYS})
+        _freeze(
+            compiled.edge_endpoints,
+            compiled.edge_ids,
+            compiled.distances,
+            compiled.indptr,
+            compiled.indices,
+            compiled.csr_edge_ids,
+        )
+        _COMPILED_TOPOLOGIES[topology] = compiled
+    return compiled
+
+
+def get_path_table(topology: str, graph: nx.Graph, k: int) -> PathTable:
+    """Return the cached :class:`PathTable` for ``topology``, building it on first use."""
+
+    key = (topology, k)
+    table = _PATH_TABLES.get(key)
+    if table is None:
+        stored = _load_arrays(topology, f"paths-k{k}", _PATH_TABLE_ARRAYS)
+        if stored is not None:
+            table = PathTable(k=k, **stored)
+        else:
+            table = build_path_table(graph, k, get_compiled_topology(topology, graph))
+            _save_arrays(topology, f"paths-k{k}", {name: getattr(table, name) for name in _PATH_TABLE_ARRAYS})
+        _freeze(table.num_paths, table.hops, table.nodes, table.edge_ids, table.lengths_km)
+        _PATH_TABLES[key] = table
+    return table
+
+
+def get_slot_table(
+    topology: str,
+    table: PathTable,
+    reach_km: Sequence[float],
+    spectral_efficiency: Sequence[float],
+    bit_rates: Sequence[float],
+    slot_width_ghz: float = 12.5,
+) -> np.ndarray:
+    """Return the cached, read-only :func:`build_slot_table` result for ``topology``."""
+
+    params = (
+        table.k,
+        tuple(map(float, reach_km)),
+        tuple(map(float, spectral_efficiency)),
+        tuple(map(float, bit_rates)),
+        float(slot_width_ghz),
+    )
+    key = (topology, params)
+    slot_table = _SLOT_TABLES.get(key)
+    if slot_table is None:
+        prefix = "slots-" + hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+        stored = _load_arrays(topology, prefix, ("slot_table",))
+        if stored is not None:
+            slot_table = stored["slot_table"]
+        else:
+            slot_table = build_slot_table(table, reach_km, spectral_efficiency, bit_rates, slot_width_ghz)
+            _save_arrays(topology, prefix, {"slot_table": slot_table})
+        _freeze(slot_table)
+        _SLOT_TABLES[key] = slot_table
+    return slot_table
+
+
+__all__ = [
+    "CompiledTopology",
+    "PathTable",
+    "build_path_table",
+    "build_slot_table",
+    "compile_topology",
+    "get_compiled_topology",
+    "get_path_table",
+    "get_slot_table",
+    "persist_routing",
+]
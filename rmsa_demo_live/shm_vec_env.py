@@ -0,0 +1,156 @@
+"""Subprocess vector env whose observations travel through shared memory.
+
+``SubprocVecEnv`` pickles every observation through a pipe. RMSA observations
+are several thousand floats, so here each worker writes its observation into
+its row of one shared ``(n_envs, *obs_shape)`` buffer and the pipe only carries
+rewards, flags and info dicts. The parent copies the buffer once per step (SB3
+keeps references to returned observations).
+
+Only ``Box`` observation spaces are supported.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnvObs, VecEnvStepReturn
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+
+def _shared_memory_worker(
+    remote: mp.connection.Connection,
+    parent_remote: mp.connection.Connection,
+    env_fn_wrapper: CloudpickleWrapper,
+    index: int,
+) -> None:
+    # Same protocol as SB3's SubprocVecEnv worker, plus "attach"; step and
+    # reset write the observation into shared memory instead of sending it
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    env = _patch_env(env_fn_wrapper.var())
+    shm: Optional[shared_memory.SharedMemory] = None
+    row: Optional[np.ndarray] = None
+    reset_info: Optional[dict] = {}
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(data)
+                done = terminated or truncated
+                info["TimeLimit.truncated"] = truncated and not terminated
+                if done:
+                    # Copy first: an env may hand out one buffer that reset overwrites
+                    info["terminal_observation"] = np.array(observation, copy=True)
+                    observation, reset_info = env.reset()
+                row[...] = observation
+                remote.send((reward, done, info, reset_info))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                row[...] = observation
+                remote.send(reset_info)
+            elif cmd == "attach":
+                name, shape, dtype = data
+                shm = shared_memory.SharedMemory(name=name)
+                row = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[index]
+                remote.send(None)
+            elif cmd == "render":
+                remote.send(env.render())
+            elif cmd == "close":
+                env.close()
+                row = None
+                if shm is not None:
+                    shm.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "env_method":
+                method = getattr(env, data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(getattr(env, data))
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except EOFError:
+            break
+
+
+class SharedMemoryVecEnv(SubprocVecEnv):
+    """``SubprocVecEnv`` with observations in a shared-memory buffer.
+
+    Accepts the same arguments; ``get_attr``, ``env_method`` and the rest of the
+    VecEnv API behave exactly as in ``SubprocVecEnv``.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], gym.Env]], start_method: Optional[str] = None):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for index, (work_remote, remote, env_fn) in enumerate(zip(self.work_remotes, self.remotes, env_fns)):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), index)
+            process = ctx.Process(target=_shared_memory_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space = self.remotes[0].recv()
+        if not isinstance(observation_space, spaces.Box):
+            self.close()
+            raise ValueError(f"SharedMemoryVecEnv needs a Box observation space, got {observation_space}")
+
+        shape = (n_envs, *observation_space.shape)
+        dtype = np.dtype(observation_space.dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._obs = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        for remote in self.remotes:
+            remote.send(("attach", (self._shm.name, shape, dtype.str)))
+        for remote in self.remotes:
+            remote.recv()
+
+        super(SubprocVecEnv, self).__init__(n_envs, observation_space, action_space)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rews, dones, infos, self.reset_infos = zip(*results)
+        return self._obs.copy(), np.stack(rews), np.stack(dones), infos
+
+    def reset(self) -> VecEnvObs:
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        shm = getattr(self, "_shm", None)
+        if shm is not None:
+            self._obs = None
+            shm.close()
+            shm.unlink()
+
+
+__all__ = ["SharedMemoryVecEnv"]
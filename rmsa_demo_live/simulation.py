@@ -0,0 +1,137 @@
+"""Discrete-event bookkeeping for dynamic traffic in the RMSA environment."""
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ConnectionSnapshot:
+    """Copy of a :class:`ConnectionTable` taken by ``snapshot()``."""
+
+    edges: np.ndarray
+    hops: np.ndarray
+    start: np.ndarray
+    num_slots: np.ndarray
+    departure: np.ndarray
+    heap: Tuple[Tuple[float, int], ...]
+    free: Tuple[int, ...]
+
+
+class ConnectionTable:
+    """Active lightpaths plus a min-heap of their departure times.
+
+    Connection rows live in preallocated arrays (grown by doubling) so a batch of
+    expired connections can be turned into per-edge slot ranges without Python
+    loops over hops.
+    """
+
+    def __init__(self, max_hops: int, capacity: int = 256) -> None:
+        self.max_hops = max_hops
+        self.edges = np.full((capacity, max_hops), -1, dtype=np.int32)
+        self.hops = np.zeros(capacity, dtype=np.int16)
+        self.start = np.zeros(capacity, dtype=np.int32)
+        self.num_slots = np.zeros(capacity, dtype=np.int32)
+        self.departure = np.zeros(capacity, dtype=np.float64)
+        self._heap: List[Tuple[float, int]] = []
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def capacity(self) -> int:
+        return self.hops.shape[0]
+
+    def clear(self) -> None:
+        self.hops.fill(0)
+        self._heap.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def snapshot(self) -> ConnectionSnapshot:
+        return ConnectionSnapshot(
+            edges=self.edges.copy(),
+            hops=self.hops.copy(),
+            start=self.start.copy(),
+            num_slots=self.num_slots.copy(),
+            departure=self.departure.copy(),
+            heap=tuple(self._heap),
+            free=tuple(self._free),
+        )
+
+    def restore(self, snapshot: ConnectionSnapshot) -> None:
+        """Return to ``snapshot``, copying in place when the capacity still matches."""
+        if snapshot.hops.shape[0] == self.capacity:
+            np.copyto(self.edges, snapshot.edges)
+            np.copyto(self.hops, snapshot.hops)
+            np.copyto(self.start, snapshot.start)
+            np.copyto(self.num_slots, snapshot.num_slots)
+            np.copyto(self.departure, snapshot.departure)
+        else:
+            self.edges = snapshot.edges.copy()
+            self.hops = snapshot.hops.copy()
+            self.start = snapshot.start.copy()
+            self.num_slots = snapshot.num_slots.copy()
+            self.departure = snapshot.departure.copy()
+        # The heap tuple is already in heap order
+        self._heap = list(snapshot.heap)
+        self._free = list(snapshot.free)
+
+    def _grow(self) -> None:
+        old = self.capacity
+        new = old * 2
+        edges = np.full((new, self.max_hops), -1, dtype=np.int32)
+        edges[:old] = self.edges
+        self.edges = edges
+        self.hops = np.concatenate([self.hops, np.zeros(old, dtype=np.int16)])
+        self.start = np.concatenate([self.start, np.zeros(old, dtype=np.int32)])
+        self.num_slots = np.concatenate([self.num_slots, np.zeros(old, dtype=np.int32)])
+        self.departure = np.concatenate([self.departure, np.zeros(old, dtype=np.float64)])
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def add(self, edges: np.ndarray, start: int, num_slots: int, departure: float) -> int:
+        """Register a lightpath and return its connection id."""
+
+        if not self._free:
+            self._grow()
+        conn_id = self._free.pop()
+        hops = len(edges)
+        self.edges[conn_id, :hops] = edges
+        self.edges[conn_id, hops:] = -1
+        self.hops[conn_id] = hops
+        self.start[conn_id] = start
+        self.num_slots[conn_id] = num_slots
+        self.departure[conn_id] = departure
+        heapq.heappush(self._heap, (departure, conn_id))
+        return conn_id
+
+    def next_departure(self) -> float:
+        return self._heap[0][0] if self._heap else float("inf")
+
+    def pop_expired(self, now: float) -> np.ndarray:
+        """Remove every connection departing at or before ``now`` and return their ids."""
+
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            expired.append(heapq.heappop(heap)[1])
+        self._free.extend(expired)
+        return np.asarray(expired, dtype=np.intp)
+
+    def slot_ranges(self, conn_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flatten connections into ``(edge, start, num_slots)`` triples, one per hop."""
+
+        edges = self.edges[conn_ids]
+        valid = edges >= 0
+        per_hop = valid.sum(axis=1)
+        return (
+            edges[valid],
+            np.repeat(self.start[conn_ids], per_hop),
+            np.repeat(self.num_slots[conn_ids], per_hop),
+        )
+
+
+__all__ = ["ConnectionSnapshot", "ConnectionTable"]
@@ -0,0 +1,464 @@
+"""Spectrum storage backends and vectorised spectrum assignment for RMSA."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+FIT_STRATEGIES = ("first_fit", "last_fit", "best_fit", "exact_fit")
+SPECTRUM_BACKENDS = ("dense", "bitpacked")
+
+WORD_BITS = 64
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def joint_occupancy(spectrum_state: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """OR the spectrum rows of ``edges`` into one boolean occupancy vector."""
+
+    return np.logical_or.reduce(spectrum_state[edges], axis=0)
+
+
+def feasible_starts(occupied: np.ndarray, required_slots: int) -> np.ndarray:
+    """Return every start slot whose ``required_slots`` window is entirely free.
+
+    A single cumulative-sum pass counts free slots per window: a window is
+    feasible when its free count equals ``required_slots``.
+    """
+
+    num_slots = occupied.shape[-1]
+    if required_slots <= 0 or required_slots > num_slots:
+        return np.empty(0, dtype=np.intp)
+
+    free_count = np.zeros(num_slots + 1, dtype=np.int32)
+    np.cumsum(~occupied, out=free_count[1:])
+    window = free_count[required_slots:] - free_count[:-required_slots]
+    return np.flatnonzero(window == required_slots)
+
+
+def free_blocks(occupied: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(starts, lengths)`` of the maximal runs of free slots."""
+
+    padded = np.concatenate(([False], ~occupied, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts = edges[::2]
+    return starts, edges[1::2] - starts
+
+
+def largest_free_block(occupied: np.ndarray) -> np.ndarray:
+    """Length of the longest run of free slots along the last axis of ``occupied``.
+
+    Works on any leading batch shape: the running count of free slots minus its
+    value at the most recent occupied slot is the current run length.
+    """
+
+    free = ~np.asarray(occupied, dtype=bool)
+    counts = np.cumsum(free, axis=-1, dtype=np.int32)
+    last_occupied = np.maximum.accumulate(np.where(free, 0, counts), axis=-1)
+    return (counts - last_occupied).max(axis=-1)
+
+
+def tightest_fitting_block(occupied: np.ndarray, required_slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and length of the smallest free block holding ``required_slots``, per row.
+
+    Batched form of ``best_fit``: ``occupied`` is ``(..., F)`` and ``required_slots``
+    has its leading shape. Ties go to the lowest block, as in :func:`select_slot`;
+    the length is ``0`` where nothing fits.
+    """
+
+    free = ~np.asarray(occupied, dtype=bool)
+    counts = np.cumsum(free, axis=-1, dtype=np.int32)
+    run = counts - np.maximum.accumulate(np.where(free, 0, counts), axis=-1)
+    block_end = free.copy()
+    block_end[..., :-1] &= ~free[..., 1:]
+    fitting = block_end & (run >= np.asarray(required_slots)[..., None])
+    end = np.argmin(np.where(fitting, run, np.iinfo(np.int32).max), axis=-1)
+    length = np.where(fitting.any(axis=-1), np.take_along_axis(run, end[..., None], axis=-1)[..., 0], 0)
+    return end + 1 - length, length
+
+
+def clear_ranges(state: np.ndarray, rows: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Zero ``state[rows[i], starts[i] : starts[i] + lengths[i]]`` for every ``i``.
+
+    Ranges are accumulated in a difference array over the touched rows only, so
+    each row is rewritten once however many ranges it holds. Returns the unique
+    touched rows.
+    """
+
+    touched, local = np.unique(rows, return_inverse=True)
+    delta = np.zeros((touched.size, state.shape[-1] + 1), dtype=np.int32)
+    np.add.at(delta, (local, starts), 1)
+    np.add.at(delta, (local, starts + lengths), -1)
+    released = np.cumsum(delta[:, :-1], axis=1) > 0
+    state[touched] = np.where(released, 0, state[touched])
+    return touched
+
+
+def select_slot(occupied: np.ndarray, required_slots: int, strategy: str = "first_fit") -> Optional[int]:
+    """Pick the start slot for a ``required_slots`` block according to ``strategy``.
+
+    - ``first_fit``: lowest feasible start.
+    - ``last_fit``: highest feasible start.
+    - ``best_fit``: start of the smallest free block that still fits the request.
+    - ``exact_fit``: start of a free block of exactly ``required_slots``, else first-fit.
+    """
+
+    if strategy == "first_fit" or strategy == "last_fit":
+        starts = feasible_starts(occupied, required_slots)
+        if starts.size == 0:
+            return None
+        return int(starts[0] if strategy == "first_fit" else starts[-1])
+
+    if strategy not in FIT_STRATEGIES:
+        raise ValueError(f"Unknown spectrum assignment strategy: {strategy}. Available: {FIT_STRATEGIES}")
+
+    starts, lengths = free_blocks(occupied)
+    fits = lengths >= required_slots
+    if not np.any(fits):
+        return None
+
+    if strategy == "exact_fit":
+        exact = np.flatnonzero(lengths == required_slots)
+        return int(starts[exact[0]] if exact.size else starts[np.argmax(fits)])
+
+    # best_fit: argmin picks the lowest-index block among equally tight ones
+    slack = np.where(fits, lengths - required_slots, np.iinfo(np.int64).max)
+    return int(starts[np.argmin(slack)])
+
+
+@dataclass(frozen=True)
+class SpectrumSnapshot:
+    """Copy of a backend's storage and counters taken by ``snapshot()``."""
+
+    storage: np.ndarray  # DenseSpectrum.state or BitPackedSpectrum.words
+    edge_occupied: np.ndarray
+    slot_occupied: np.ndarray
+    edge_transitions: np.ndarray
+    occupied_total: int
+    transitions_total: int
+
+
+class _SpectrumCounters(ABC):
+    """Occupancy and fragmentation counters maintained incrementally by the backends.
+
+    Allocations update only the touched edges, slot range and the two range
+    boundaries; bulk releases recount the transitions of the touched edges only.
+    Backends implement the abstract storage accessors below.
+    """
+
+    num_edges: int
+    num_slots: int
+
+    @property
+    @abstractmethod
+    def _storage(self) -> np.ndarray:
+        """The array ``snapshot``/``restore`` copy."""
+
+    def snapshot(self) -> SpectrumSnapshot:
+        """Copy the spectrum and its counters (a few KB for the bit-packed backend)."""
+        return SpectrumSnapshot(
+            storage=self._storage.copy(),
+            edge_occupied=self._edge_occupied.copy(),
+            slot_occupied=self._slot_occupied.copy(),
+            edge_transitions=self._edge_transitions.copy(),
+            occupied_total=self.occupied_total,
+            transitions_total=self.transitions_total,
+        )
+
+    def restore(self, snapshot: SpectrumSnapshot) -> None:
+        """Overwrite the spectrum in place; ``snapshot`` stays reusable."""
+        np.copyto(self._storage, snapshot.storage)
+        self._edge_occupied = snapshot.edge_occupied.copy()
+        self._slot_occupied = snapshot.slot_occupied.copy()
+        self._edge_transitions = snapshot.edge_transitions.copy()
+        self.occupied_total = snapshot.occupied_total
+        self.transitions_total = snapshot.transitions_total
+
+    def _reset_counters(self) -> None:
+        self._edge_occupied = np.zeros(self.num_edges, dtype=np.int64)
+        self._slot_occupied = np.zeros(self.num_slots, dtype=np.int64)
+        self._edge_transitions = np.zeros(self.num_edges, dtype=np.int64)
+        self.occupied_total = 0
+        self.transitions_total = 0
+
+    @abstractmethod
+    def _slot_values(self, edges: np.ndarray, slot: int) -> np.ndarray:
+        """0/1 occupancy of ``slot`` on each of ``edges``, as ``int64``."""
+
+    @abstractmethod
+    def _row_transitions(self, rows: np.ndarray) -> np.ndarray:
+        """Free/occupied boundaries of each of ``rows``, recounted from storage."""
+
+    def _count_allocation(self, edges: np.ndarray, start: int, num_slots: int) -> None:
+        # Inside the (previously free) range no boundary changes; each outer
+        # neighbour flips its boundary: +1 if it was free, -1 if it was occupied.
+        delta = np.zeros(len(edges), dtype=np.int64)
+        if start > 0:
+            delta += 1 - 2 * self._slot_values(edges, start - 1)
+        end = start + num_slots
+        if end < self.num_slots:
+            delta += 1 - 2 * self._slot_values(edges, end)
+        self._edge_transitions[edges] += delta
+        self.transitions_total += int(delta.sum())
+
+        self._edge_occupied[edges] += num_slots
+        self._slot_occupied[start:end] += len(edges)
+        self.occupied_total += num_slots * len(edges)
+
+    def _count_release(self, rows: np.ndarray, edges: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> None:
+        np.subtract.at(self._edge_occupied, edges, lengths)
+        slot_delta = np.zeros(self.num_slots + 1, dtype=np.int64)
+        np.add.at(slot_delta, starts, 1)
+        np.add.at(slot_delta, starts + lengths, -1)
+        self._slot_occupied -= np.cumsum(slot_delta[:-1])
+        self.occupied_total -= int(lengths.sum())
+
+        fresh = self._row_transitions(rows)
+        self.transitions_total += int(fresh.sum() - self._edge_transitions[rows].sum())
+        self._edge_transitions[rows] = fresh
+
+    def recount(self) -> None:
+        """Rebuild every counter from the stored spectrum."""
+        rows = np.arange(self.num_edges)
+        dense = self.to_dense()
+        self._edge_occupied = dense.sum(axis=1, dtype=np.int64)
+        self._slot_occupied = dense.sum(axis=0, dtype=np.int64)
+        self._edge_transitions = self._row_transitions(rows).astype(np.int64)
+        self.occupied_total = int(self._edge_occupied.sum())
+        self.transitions_total = int(self._edge_transitions.sum())
+
+    def edge_occupancy(self) -> np.ndarray:
+        """Occupied slots per edge, shape ``(num_edges,)``."""
+        return self._edge_occupied
+
+    def slot_occupancy(self) -> np.ndarray:
+        """Number of edges using each slot, shape ``(num_slots,)``."""
+        return self._slot_occupied
+
+    def transitions(self) -> np.ndarray:
+        """Free/occupied boundaries between adjacent slots, per edge."""
+        return self._edge_transitions
+
+    def release(self, edges: np.ndarray, start: int, num_slots: int) -> None:
+        count = len(edges)
+        self.release_many(
+            np.asarray(edges),
+            np.full(count, start, dtype=np.int64),
+            np.full(count, num_slots, dtype=np.int64),
+        )
+
+    @abstractmethod
+    def to_dense(self) -> np.ndarray:
+        """The whole spectrum as a ``(num_edges, num_slots)`` ``int8`` array."""
+
+    @abstractmethod
+    def dense_rows(self, rows: np.ndarray) -> np.ndarray:
+        """Occupancy of ``rows`` as a ``(len(rows), num_slots)`` 0/1 array."""
+
+    @abstractmethod
+    def release_many(self, edges: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> None:
+        """Clear many ``(edge, start, length)`` ranges at once."""
+
+
+class DenseSpectrum(_SpectrumCounters):
+    """One ``int8`` per slot: ``state[edge, slot]`` is 1 when the slot is occupied."""
+
+    def __init__(self, num_edges: int, num_slots: int) -> None:
+        self.num_edges = num_edges
+        self.num_slots = num_slots
+        self.state = np.zeros((num_edges, num_slots), dtype=np.int8)
+        self._reset_counters()
+
+    @property
+    def nbytes(self) -> int:
+        return self.state.nbytes
+
+    @property
+    def _storage(self) -> np.ndarray:
+        return self.state
+
+    def clear(self) -> None:
+        self.state.fill(0)
+        self._reset_counters()
+
+    def joint_occupancy(self, edges: np.ndarray) -> np.ndarray:
+        return joint_occupancy(self.state, edges)
+
+    def find_slot(self, edges: np.ndarray, required_slots: int, strategy: str) -> Optional[int]:
+        return select_slot(self.joint_occupancy(edges), required_slots, strategy)
+
+    def allocate(self, edges: np.ndarray, start: int, num_slots: int) -> None:
+        self._count_allocation(edges, start, num_slots)
+        self.state[edges, start : start + num_slots] = 1
+
+    def release_many(self, edges: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> None:
+        """Clear many ``(edge, start, length)`` ranges at once."""
+        if edges.size == 0:
+            return
+        rows = clear_ranges(self.state, edges, starts, lengths)
+        self._count_release(rows, edges, starts, lengths)
+
+    def dense_rows(self, rows: np.ndarray) -> np.ndarray:
+        return self.state[rows]
+
+    def _slot_values(self, edges: np.ndarray, slot: int) -> np.ndarray:
+        return self.state[edges, slot].astype(np.int64)
+
+    def _row_transitions(self, rows: np.ndarray) -> np.ndarray:
+        block = self.state[rows]
+        return np.count_nonzero(block[:, 1:] != block[:, :-1], axis=1)
+
+    def to_dense(self) -> np.ndarray:
+        return self.state
+
+
+class BitPackedSpectrum(_SpectrumCounters):
+    """Spectrum state packed into ``uint64`` words, one bit per slot.
+
+    Slot ``i`` of an edge is bit ``i % 64`` of word ``i // 64``. Path-joint
+    availability is a word-wise OR of the path rows, and windows of ``n`` free
+    slots are found by AND-ing the free mask with shifted copies of itself.
+    """
+
+    def __init__(self, num_edges: int, num_slots: int) -> None:
+        self.num_edges = num_edges
+        self.num_slots = num_slots
+        self.num_words = -(-num_slots // WORD_BITS)
+        self.words = np.zeros((num_edges, self.num_words), dtype=np.uint64)
+
+        # _prefix[i] has bits [0, i) set; a slot range is a difference of two prefixes
+        bits = np.tri(num_slots + 1, self.num_words * WORD_BITS, -1, dtype=bool)
+        self._prefix = np.packbits(bits, axis=-1, bitorder="little").view(np.uint64)
+        self._valid = self._prefix[num_slots]
+        self._inner = self._prefix[max(num_slots - 1, 0)]
+        self._reset_counters()
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    @property
+    def _storage(self) -> np.ndarray:
+        return self.words
+
+    def clear(self) -> None:
+        self.words.fill(0)
+        self._reset_counters()
+
+    def _range_mask(self, start: int, num_slots: int) -> np.ndarray:
+        return self._prefix[start + num_slots] & ~self._prefix[start]
+
+    def joint_free(self, edges: np.ndarray) -> np.ndarray:
+        """Bit mask of slots free on every edge of ``edges``."""
+        return ~np.bitwise_or.reduce(self.words[edges], axis=0) & self._valid
+
+    def joint_occupancy(self, edges: np.ndarray) -> np.ndarray:
+        return ~_unpack(self.joint_free(edges), self.num_slots)
+
+    def window_starts(self, free: np.ndarray, required_slots: int) -> np.ndarray:
+        """Bit ``i`` set iff slots ``i .. i + required_slots - 1`` are all free."""
+        starts = free
+        covered = 1
+        while covered < required_slots:
+            step = min(covered, required_slots - covered)
+            starts = starts & _shift_down(starts, step)
+            covered += step
+        return starts
+
+    def find_slot(self, edges: np.ndarray, required_slots: int, strategy: str) -> Optional[int]:
+        if required_slots <= 0 or required_slots > self.num_slots:
+            return None
+        free = self.joint_free(edges)
+        if strategy == "first_fit" or strategy == "last_fit":
+            starts = self.window_starts(free, required_slots)
+            nonzero = np.flatnonzero(starts)
+            if nonzero.size == 0:
+                return None
+            if strategy == "first_fit":
+                word = int(nonzero[0])
+                bits = int(starts[word])
+                return word * WORD_BITS + (bits & -bits).bit_length() - 1
+            word = int(nonzero[-1])
+            return word * WORD_BITS + int(starts[word]).bit_length() - 1
+        return select_slot(~_unpack(free, self.num_slots), required_slots, strategy)
+
+    def allocate(self, edges: np.ndarray, start: int, num_slots: int) -> None:
+        self._count_allocation(edges, start, num_slots)
+        self.words[edges] |= self._range_mask(start, num_slots)
+
+    def release_many(self, edges: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> None:
+        """Clear many ``(edge, start, length)`` ranges with one OR-reduction per edge."""
+        if edges.size == 0:
+            return
+        rows, local = np.unique(edges, return_inverse=True)
+        masks = self._prefix[starts + lengths] & ~self._prefix[starts]
+        released = np.zeros((rows.size, self.num_words), dtype=np.uint64)
+        np.bitwise_or.at(released, local, masks)
+        self.words[rows] &= ~released
+        self._count_release(rows, edges, starts, lengths)
+
+    def dense_rows(self, rows: np.ndarray) -> np.ndarray:
+        return _unpack(self.words[rows], self.num_slots)
+
+    def _slot_values(self, edges: np.ndarray, slot: int) -> np.ndarray:
+        word, bit = divmod(slot, WORD_BITS)
+        return ((self.words[edges, word] >> np.uint64(bit)) & np.uint64(1)).astype(np.int64)
+
+    def _row_transitions(self, rows: np.ndarray) -> np.ndarray:
+        # bit i of (x ^ x >> 1) marks a change between slots i and i + 1
+        words = self.words[rows]
+        return _popcount_rows((words ^ _shift_down(words, 1)) & self._inner)
+
+    def to_dense(self) -> np.ndarray:
+        return _unpack(self.words, self.num_slots).astype(np.int8)
+
+
+def _shift_down(words: np.ndarray, shift: int) -> np.ndarray:
+    """Shift a little-endian multi-word bit set towards bit 0 along the last axis."""
+    whole, part = divmod(shift, WORD_BITS)
+    if whole:
+        pad = np.zeros(words.shape[:-1] + (whole,), dtype=np.uint64)
+        words = np.concatenate((words[..., whole:], pad), axis=-1)
+    if part:
+        carry = np.zeros_like(words)
+        carry[..., :-1] = words[..., 1:] << np.uint64(WORD_BITS - part)
+        words = (words >> np.uint64(part)) | carry
+    return words
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    counts = _POPCOUNT8[np.ascontiguousarray(words).view(np.uint8)]
+    return counts.reshape(words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+
+def _unpack(words: np.ndarray, num_slots: int) -> np.ndarray:
+    packed = np.ascontiguousarray(words).view(np.uint8)
+    return np.unpackbits(packed, axis=-1, count=num_slots, bitorder="little").astype(bool)
+
+
+def make_spectrum(backend: str, num_edges: int, num_slots: int):
+    """Instantiate the spectrum storage named by ``backend``."""
+
+    if backend == "dense":
+        return DenseSpectrum(num_edges, num_slots)
+    if backend == "bitpacked":
+        return BitPackedSpectrum(num_edges, num_slots)
+    raise ValueError(f"Unknown spectrum backend: {backend}. Available: {', '.join(SPECTRUM_BACKENDS)}")
+
+
+__all__ = [
+    "BitPackedSpectrum",
+    "DenseSpectrum",
+    "FIT_STRATEGIES",
+    "SPECTRUM_BACKENDS",
+    "SpectrumSnapshot",
+    "clear_ranges",
+    "make_spectrum",
+    "feasible_starts",
+    "free_blocks",
+    "joint_occupancy",
+    "largest_free_block",
+    "select_slot",
+    "tightest_fitting_block",
+]
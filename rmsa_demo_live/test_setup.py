@@ -1,6 +1,7 @@
 """Quick test script to verify RMSA environment works correctly."""
 import sys
 
+import gymnasium as gym
 import numpy as np
 from rich.console import Console
 from rich.table import Table
@@ -124,6 +125,819 @@ def test_config():
     return True
 
 
+def _reference_first_fit(spectrum_state, edges, required_slots):
+    """Slot-by-slot first-fit search used before the vectorised engine."""
+    max_start = spectrum_state.shape[1] - required_slots
+    for start in range(max_start + 1):
+        available = True
+        for edge_idx in edges:
+            if np.any(spectrum_state[edge_idx, start : start + required_slots]):
+                available = False
+                break
+        if available:
+            return start
+    return None
+
+
+def test_spectrum_search():
+    """Vectorised spectrum search must match the reference first-fit."""
+    from spectrum import FIT_STRATEGIES, free_blocks, joint_occupancy, select_slot, tightest_fitting_block
+
+    console.print("\n[bold cyan]🔎 Testing Spectrum Search...[/bold cyan]\n")
+
+    rng = np.random.default_rng(7)
+    checks = 0
+    for density in (0.05, 0.3, 0.6, 0.9):
+        for _ in range(200):
+            spectrum = (rng.random((21, 196)) < density).astype(np.int8)
+            edges = rng.choice(21, size=rng.integers(1, 6), replace=False)
+            required = int(rng.integers(1, 33))
+            occupied = joint_occupancy(spectrum, edges)
+
+            expected = _reference_first_fit(spectrum, edges, required)
+            assert select_slot(occupied, required, "first_fit") == expected
+
+            starts, lengths = free_blocks(occupied)
+            for strategy in FIT_STRATEGIES:
+                slot = select_slot(occupied, required, strategy)
+                if expected is None:
+                    assert slot is None
+                    continue
+                assert not occupied[slot : slot + required].any()
+                assert slot + required <= spectrum.shape[1]
+                if strategy == "best_fit":
+                    block = lengths[starts <= slot][-1]
+                    assert block == lengths[lengths >= required].min()
+            checks += 1
+
+    console.print(f"✓ {checks} random spectra matched reference first-fit")
+
+    # Batched best fit (RMSAVecEnv, heuristics) against the per-row search
+    occupied = rng.random((400, 196)) < rng.random((400, 1))
+    required = rng.integers(1, 33, size=400)
+    starts, lengths = tightest_fitting_block(occupied, required)
+    for row, slots, start, length in zip(occupied, required, starts, lengths):
+        expected = select_slot(row, int(slots), "best_fit")
+        assert (length > 0) == (expected is not None)
+        if expected is not None:
+            assert start == expected
+    console.print(f"✓ Batched best fit matched select_slot on {len(required)} spectra")
+    console.print("\n[bold green]✓ Spectrum search test PASSED![/bold green]\n")
+    return True
+
+
+def test_incremental_counters():
+    """Incremental occupancy/fragmentation counters must match a full recount."""
+    console.print("\n[bold cyan]📈 Testing Incremental Spectrum Counters...[/bold cyan]\n")
+
+    for backend in ("dense", "bitpacked"):
+        env = rmsa_environment.RMSAEnv(
+            topology="NSFNET", load=1.0, episode_length=2000, spectrum_backend=backend
+        )
+        env.reset(seed=5)
+        rng = np.random.default_rng(5)
+        for _ in range(1500):
+            env.step(int(rng.integers(env.action_space.n)))
+
+        dense = env.spectrum_state
+        assert np.array_equal(env.spectrum.edge_occupancy(), dense.sum(axis=1))
+        assert np.array_equal(env.spectrum.slot_occupancy(), dense.sum(axis=0))
+        assert np.array_equal(env.spectrum.transitions(), (dense[:, 1:] != dense[:, :-1]).sum(axis=1))
+        assert env.spectrum.occupied_total == dense.sum()
+        console.print(f"✓ {backend}: counters consistent after 1500 dynamic steps")
+
+    # A backend missing part of the storage interface fails when it is created
+    from spectrum import _SpectrumCounters
+
+    class _NoReleaseSpectrum(_SpectrumCounters):
+        def __init__(self, num_edges, num_slots):
+            self.num_edges, self.num_slots = num_edges, num_slots
+
+    try:
+        _NoReleaseSpectrum(4, 8)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("an incomplete spectrum backend must not be instantiable")
+    console.print("✓ Incomplete backends are rejected at construction")
+
+    console.print("\n[bold green]✓ Incremental counters test PASSED![/bold green]\n")
+    return True
+
+
+def test_vec_env():
+    """RMSAVecEnv counters and observations must match its spectrum tensor."""
+    console.print("\n[bold cyan]🧮 Testing Batched RMSAVecEnv...[/bold cyan]\n")
+
+    from vec_env import RMSAVecEnv
+
+    vec = RMSAVecEnv(8, seed=3, topology="NSFNET", load=1.0, episode_length=200)
+    vec.reset()
+    rng = np.random.default_rng(3)
+    for _ in range(500):
+        obs, rewards, dones, infos = vec.step(rng.integers(vec.action_space.n, size=vec.num_envs))
+
+    assert obs.shape == (vec.num_envs,) + vec.observation_space.shape
+    state = vec.spectrum[:, : vec.num_edges]
+    assert not vec.spectrum[:, vec.num_edges].any()
+    assert np.array_equal(vec._obs_spectrum, state)
+    assert np.array_equal(vec._slot_occupancy, state.sum(axis=1))
+    assert np.array_equal(vec._occupied_total, state.sum(axis=(1, 2)))
+    assert np.array_equal(vec._transitions_total, (state[:, :, 1:] != state[:, :, :-1]).sum(axis=(1, 2)))
+    assert all("terminal_observation" in info for info, done in zip(infos, dones) if done)
+    console.print(f"✓ {vec.num_envs} networks consistent after 500 batched steps")
+
+    from spectrum import select_slot
+
+    vec = RMSAVecEnv(8, seed=3, topology="NSFNET", load=1.0, episode_length=200, spectrum_assignment="best_fit")
+    vec.reset()
+    for _ in range(300):
+        vec.step(rng.integers(vec.action_space.n, size=vec.num_envs))
+    envs = vec._env_idx
+    edges = vec.path_table.edge_ids[vec.source, vec.destination, 0]
+    edges = np.where(edges < 0, vec.num_edges, edges)
+    required = np.maximum(vec.slot_table[vec.source, vec.destination, 0, 0, vec.bit_rate_class], 1)
+    slots, found = vec._find_slots(envs, edges, required)
+    occupied = vec.spectrum[envs[:, None], edges].any(axis=1)
+    for i in envs:
+        expected = select_slot(occupied[i], int(required[i]), "best_fit")
+        assert found[i] == (expected is not None) and (expected is None or slots[i] == expected)
+    console.print("✓ best_fit placement matches select_slot")
+
+    console.print("\n[bold green]✓ Vector environment test PASSED![/bold green]\n")
+    return True
+
+
+def test_action_masks():
+    """Every unmasked action must allocate; masked actions must block."""
+    console.print("\n[bold cyan]🎭 Testing Action Masks...[/bold cyan]\n")
+
+    import copy
+
+    env = rmsa_environment.RMSAEnv(topology="NSFNET", load=1.5, episode_length=3000)
+    env.reset(seed=11)
+    rng = np.random.default_rng(11)
+    for step in range(300):
+        mask = env.action_masks()
+        if step % 25 == 0 and not mask.all():
+            for action in range(env.action_space.n):
+                _, _, _, _, info = copy.deepcopy(env).step(action)
+                assert mask[action] == info["allocation_success"]
+        env.step(int(rng.choice(np.flatnonzero(mask))))
+
+    console.print(f"✓ Masks agree with step outcomes (blocking {env.blocked / env.num_requests:.1%} under masking)")
+    console.print("\n[bold green]✓ Action mask test PASSED![/bold green]\n")
+    return True
+
+
+def test_state_snapshot():
+    """Restoring a snapshot must replay the exact same rollout."""
+    console.print("\n[bold cyan]📸 Testing State Snapshots...[/bold cyan]\n")
+
+    env = rmsa_environment.RMSAEnv(topology="NSFNET", load=1.2, episode_length=5000)
+    env.reset(seed=7)
+    for step in range(1000):
+        env.step(step % env.action_space.n)
+
+    def rollout():
+        rng = np.random.default_rng(7)
+        return [env.step(int(rng.integers(env.action_space.n)))[0] for _ in range(200)]
+
+    state = env.get_state()
+    first = rollout()
+    env.set_state(state)
+    second = rollout()
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    console.print("✓ 200-step rollout identical after set_state")
+
+    console.print("\n[bold green]✓ State snapshot test PASSED![/bold green]\n")
+    return True
+
+
+def test_heuristics():
+    """Heuristics that search all k paths must allocate whenever some action can."""
+    console.print("\n[bold cyan]📏 Testing Heuristic Baselines...[/bold cyan]\n")
+
+    from heuristics import HEURISTICS, SPECTRUM_ASSIGNMENT, HeuristicAgent
+
+    for name in HEURISTICS:
+        env = rmsa_environment.RMSAEnv(
+            topology="NSFNET", load=1.2, episode_length=3000, spectrum_assignment=SPECTRUM_ASSIGNMENT[name]
+        )
+        env.reset(seed=5)
+        agent = HeuristicAgent(name, env)
+        for _ in range(500):
+            feasible = not env.action_masks().all()
+            action, _ = agent.predict()
+            _, _, _, _, info = env.step(action)
+            if name != "SP-FF":
+                assert info["allocation_success"] == feasible
+        console.print(f"✓ {name}: blocking {env.blocked / env.num_requests:.1%}")
+
+    try:
+        HeuristicAgent("KSP-BF", rmsa_environment.RMSAEnv(topology="NSFNET"))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("KSP-BF must refuse an env that places slots first fit")
+    console.print("✓ KSP-BF requires a best_fit env")
+
+    # Blocking comes from the allocation result, not the (here always positive) reward
+    from heuristics import evaluate_heuristic
+
+    plain = evaluate_heuristic("SP-FF", "NSFNET", 4000, num_envs=8, seed=2, load=1.2)
+    shaped = evaluate_heuristic("SP-FF", "NSFNET", 4000, num_envs=8, seed=2, load=1.2, reward_fn=lambda *_: 1.0)
+    assert plain["blocking_probability"] > 0
+    assert shaped["blocking_probability"] == plain["blocking_probability"]
+    console.print(f"✓ Shaped rewards leave the blocking estimate at {plain['blocking_probability']:.1%}")
+
+    console.print("\n[bold green]✓ Heuristic test PASSED![/bold green]\n")
+    return True
+
+
+def test_synthetic_topology():
+    """Synthetic topologies must be 2-connected and reproducible from their name."""
+    console.print("\n[bold cyan]🕸️ Testing Synthetic Topologies...[/bold cyan]\n")
+
+    import networkx as nx
+
+    from topology_generator import synthetic_topology
+    from topology_manager import TopologyManager
+
+    for name in ("WAXMAN-20-S1", "GEOMETRIC-20-S1"):
+        graph = synthetic_topology(name)
+        assert nx.is_biconnected(graph)
+        assert all(data["distance"] >= 1 for _, _, data in graph.edges(data=True))
+        env = rmsa_environment.RMSAEnv(topology=name, episode_length=50)
+        assert env.num_nodes == 20 and env.num_edges == graph.number_of_edges()
+        env.reset(seed=0)
+        env.step(0)
+        console.print(f"✓ {name}: {env.num_nodes} nodes, {env.num_edges} links, 2-connected")
+
+        descriptor = TopologyManager.descriptor(name)
+        assert (descriptor.nodes, descriptor.links) == (20, graph.number_of_edges())
+        assert descriptor.diameter == nx.diameter(graph) and "sintética" in descriptor.description
+        assert TopologyManager.descriptor(name) is descriptor
+
+    try:
+        TopologyManager.descriptor("NOT-A-TOPOLOGY")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown topology names must raise ValueError")
+    console.print("✓ TopologyManager.descriptor registers synthetic names on demand")
+
+    console.print("\n[bold green]✓ Synthetic topology test PASSED![/bold green]\n")
+    return True
+
+
+def test_topology_files():
+    """A JSON topology must load into the env and leave its routing tables on disk."""
+    console.print("\n[bold cyan]🗂️ Testing Topology Files...[/bold cyan]\n")
+
+    import json
+    import tempfile
+    from pathlib import Path
+
+    from topology_io import artefact_dir
+    from topology_manager import TopologyManager
+
+    graph = rmsa_environment.build_topology("JAPAN")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "japan.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "nodes": [{"id": f"n{node}"} for node in graph.nodes],
+                    "links": [
+                        {"source": f"n{u}", "target": f"n{v}", "distance": dist}
+                        for u, v, dist in graph.edges(data="distance")
+                    ],
+                }
+            )
+        )
+        env = rmsa_environment.RMSAEnv(topology=str(path))
+        reference = rmsa_environment.RMSAEnv(topology="JAPAN")
+        assert np.array_equal(env.path_table.edge_ids, reference.path_table.edge_ids)
+        assert np.array_equal(env.slot_table, reference.slot_table)
+
+        stored = np.load(artefact_dir(path) / "paths-k3.lengths_km.npy", mmap_mode="r")
+        assert np.array_equal(stored, reference.path_table.lengths_km)
+        console.print(f"✓ {path.name}: {env.num_nodes} nodes, routing tables cached in {artefact_dir(path).name}")
+
+        descriptor = TopologyManager.descriptor(str(path))
+        assert descriptor.name == str(path)
+        assert (descriptor.nodes, descriptor.links) == (graph.number_of_nodes(), graph.number_of_edges())
+        assert descriptor.description == f"Cargada desde {path.name}"
+        console.print(f"✓ TopologyManager.descriptor loads {path.name} by path")
+
+    console.print("\n[bold green]✓ Topology file test PASSED![/bold green]\n")
+    return True
+
+
+def test_profiler():
+    """Profiling must count every phase call without changing the rollout."""
+    console.print("\n[bold cyan]⏱️ Testing Step Profiler...[/bold cyan]\n")
+
+    plain = rmsa_environment.RMSAEnv(topology="NSFNET", episode_length=1000)
+    profiled = rmsa_environment.RMSAEnv(topology="NSFNET", episode_length=1000, profile=True)
+    assert plain.profiler is None and "step" not in vars(plain)
+    for env in (plain, profiled):
+        env.reset(seed=3)
+    for step in range(300):
+        action = step % plain.action_space.n
+        assert np.array_equal(plain.step(action)[0], profiled.step(action)[0])
+
+    report = profiled.profile_report()
+    assert report["step"]["calls"] == 300 and report["_get_observation"]["calls"] == 301
+    console.print(f"✓ {report['step']['mean_us']:.1f} µs/step, _get_info {report['_get_info']['share']:.0%} of step")
+    console.print("\n[bold green]✓ Profiler test PASSED![/bold green]\n")
+    return True
+
+
+class _SharedBufferObservation(gym.ObservationWrapper):
+    """Returns every observation in one reused array, like copy_observation=False."""
+
+    def observation(self, observation):
+        if not hasattr(self, "_buffer"):
+            self._buffer = np.empty_like(observation)
+        self._buffer[...] = observation
+        return self._buffer
+
+
+def test_shared_memory_vec_env():
+    """Shared-memory workers must reproduce DummyVecEnv rollouts exactly."""
+    console.print("\n[bold cyan]🧵 Testing Shared-Memory VecEnv...[/bold cyan]\n")
+
+    from agents import make_vec_env
+    from reward_functions import build_reward_function
+
+    factory = EnvironmentFactory(base_kwargs={**ENVIRONMENT.as_dict(), "episode_length": 40})
+    reward_fn = build_reward_function("binary", {})
+    actions = np.random.default_rng(0).integers(0, 12, size=(100, 3))
+    rollouts, terminals = {}, {}
+    for backend in ("dummy", "shared_memory"):
+        vec = make_vec_env(factory, reward_fn, n_envs=3, backend=backend, seed=5)
+        observations = [vec.reset()]
+        terminals[backend] = []
+        for batch in actions:
+            obs, rewards, dones, infos = vec.step(batch)
+            observations.append(obs)
+            terminals[backend].extend(info["terminal_observation"] for info, done in zip(infos, dones) if done)
+            observations.extend(info["terminal_observation"][None] for info, done in zip(infos, dones) if done)
+        vec.close()
+        rollouts[backend] = np.concatenate(observations)
+
+    assert np.array_equal(rollouts["dummy"], rollouts["shared_memory"])
+    console.print(f"✓ {len(rollouts['dummy'])} observations identical across backends")
+
+    # An env that reuses one observation buffer: the worker must copy the
+    # terminal observation before its reset overwrites the buffer
+    from shm_vec_env import SharedMemoryVecEnv
+
+    vec = SharedMemoryVecEnv(
+        [
+            lambda rank=rank: _SharedBufferObservation(factory.make(seed=5 + rank, reward_fn=reward_fn))
+            for rank in range(3)
+        ]
+    )
+    vec.reset()
+    aliased = []
+    for batch in actions:
+        _, _, dones, infos = vec.step(batch)
+        aliased.extend(info["terminal_observation"] for info, done in zip(infos, dones) if done)
+    vec.close()
+    assert len(aliased) == len(terminals["dummy"]) > 0
+    assert all(np.array_equal(a, b) for a, b in zip(aliased, terminals["dummy"]))
+    console.print(f"✓ {len(aliased)} terminal observations match DummyVecEnv with a reused buffer")
+    console.print("\n[bold green]✓ Shared-memory VecEnv test PASSED![/bold green]\n")
+    return True
+
+
+def test_training_schedule():
+    """Concurrent jobs must start longest-first and split the CPU threads."""
+    console.print("\n[bold cyan]🗂️ Testing Training Scheduler...[/bold cyan]\n")
+
+    from trainer import _resolve_roster, plan_jobs
+
+    roster = _resolve_roster(["CONTROL", "META-LEARNING", "SP-FF", "ULTHO"])
+    jobs = plan_jobs(roster, seed=42, jobs=3, cpu_threads=16)
+    timesteps = [job.training.timesteps for job in jobs]
+    assert [job.name for job in jobs] == ["META-LEARNING", "ULTHO", "CONTROL"]
+    assert timesteps == sorted(timesteps, reverse=True)
+    assert all(1 <= job.inter_op_threads <= job.intra_op_threads <= 16 // 3 for job in jobs)
+    # Same seeds as the serial run: roster position * 101
+    assert {job.name: job.seed for job in jobs}["ULTHO"] == 42 + 4 * 101
+    console.print(f"✓ Order: {', '.join(job.name for job in jobs)}")
+    console.print("\n[bold green]✓ Training scheduler test PASSED![/bold green]\n")
+    return True
+
+
+def test_checkpoint_resume():
+    """Checkpoints must restore the exact weights and let training continue."""
+    console.print("\n[bold cyan]💾 Testing Checkpoint / Resume...[/bold cyan]\n")
+
+    import dataclasses
+    import tempfile
+    from pathlib import Path
+
+    import torch
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    from agents import AgentBuilder, train_agent
+    from checkpointing import checkpoint_dir, latest_checkpoint, restore_checkpoint
+    from config import BATTLE_AGENT_CONFIGS, TrainingConfig
+    from reward_functions import build_reward_function
+
+    config = dataclasses.replace(BATTLE_AGENT_CONFIGS["CONTROL"], n_steps=64, batch_size=32, net_arch=(16,))
+    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict())
+    builder = AgentBuilder(config=config, factory=factory, reward_fn=build_reward_function("binary", {}))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        training = TrainingConfig(
+            timesteps=256,
+            tensorboard_log=f"{tmp}/logs",
+            save_path=f"{tmp}/agent.zip",
+            eval_freq=10_000,
+            save_freq=64,
+        )
+        train_agent(builder, training, seed=7, quiet=True)
+        checkpoints = checkpoint_dir(training.save_path)
+        checkpoint = latest_checkpoint(checkpoints)
+        assert checkpoint is not None and checkpoint.name == "step_0000000192"
+        assert len(list(checkpoints.glob("step_*"))) == 2
+        assert Path(training.save_path).is_file()
+
+        model = builder.build(seed=7)
+        assert restore_checkpoint(model, checkpoint) == 192
+        _, params, _ = load_from_zip_file(checkpoint / "model.zip")
+        for key, value in params["policy"].items():
+            assert torch.equal(model.policy.state_dict()[key], value)
+
+        resumed = train_agent(builder, dataclasses.replace(training, timesteps=320), seed=7, quiet=True, resume=True)
+        assert resumed.num_timesteps == 320
+        console.print(f"✓ Resumed from {checkpoint.name} to {resumed.num_timesteps} steps")
+
+        # A rerun without --resume keeps the old checkpoints aside; --fresh deletes them
+        train_agent(builder, training, seed=7, quiet=True)
+        archived = list(checkpoints.parent.glob(f"{checkpoints.name}.prev-*"))
+        assert len(archived) == 1 and latest_checkpoint(archived[0]).name == "step_0000000256"
+        train_agent(builder, training, seed=7, quiet=True, fresh=True)
+        assert len(list(checkpoints.parent.glob(f"{checkpoints.name}.prev-*"))) == 1
+        assert latest_checkpoint(checkpoints).name == "step_0000000192"
+        console.print(f"✓ Previous checkpoints kept in {archived[0].name}")
+
+    from trainer import _effective_training
+
+    fast = _effective_training("META-LEARNING", fast=True)
+    assert fast.save_freq < fast.timesteps
+
+    console.print("\n[bold green]✓ Checkpoint / resume test PASSED![/bold green]\n")
+    return True
+
+
+def test_spectrum_extractor():
+    """The conv extractor must shrink the policy and transfer across slot counts."""
+    console.print("\n[bold cyan]📡 Testing Spectrum Feature Extractor...[/bold cyan]\n")
+
+    import dataclasses
+
+    from agents import AgentBuilder
+    from config import BATTLE_AGENT_CONFIGS
+    from reward_functions import build_reward_function
+
+    reward_fn = build_reward_function("binary", {})
+    config = BATTLE_AGENT_CONFIGS["BOHAMIANN"]
+    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict())
+    models = {}
+    for name in ("flatten", "spectrum_conv"):
+        agent = dataclasses.replace(config, features_extractor=name)
+        models[name] = AgentBuilder(config=agent, factory=factory, reward_fn=reward_fn).build(seed=1)
+    sizes = {name: sum(p.numel() for p in model.policy.parameters()) for name, model in models.items()}
+    assert sizes["spectrum_conv"] * 5 < sizes["flatten"]
+    console.print(f"✓ Policy parameters: {sizes['flatten']:,} -> {sizes['spectrum_conv']:,}")
+
+    # Same topology, fewer slots: the trained weights load unchanged
+    narrow = EnvironmentFactory(base_kwargs={**ENVIRONMENT.as_dict(), "num_freq_slots": 96})
+    agent = dataclasses.replace(config, features_extractor="spectrum_conv")
+    model = AgentBuilder(config=agent, factory=narrow, reward_fn=reward_fn).build(seed=2)
+    model.policy.load_state_dict(models["spectrum_conv"].policy.state_dict())
+    obs, _ = narrow.make(seed=3).reset(seed=3)
+    action, _ = model.predict(obs, deterministic=True)
+    assert 0 <= int(action) < model.action_space.n
+    console.print("✓ 196-slot weights drive a 96-slot env")
+
+    console.print("\n[bold green]✓ Spectrum feature extractor test PASSED![/bold green]\n")
+    return True
+
+
+def test_gat_policy():
+    """GatPolicy must batch exactly and share one set of weights across topologies."""
+    console.print("\n[bold cyan]🕸️ Testing GAT Policy...[/bold cyan]\n")
+
+    import dataclasses
+    import warnings
+
+    import torch
+
+    from agents import AgentBuilder
+    from config import BATTLE_AGENT_CONFIGS
+    from feature_extractors import GatExtractor
+    from reward_functions import build_reward_function
+
+    config = BATTLE_AGENT_CONFIGS["DEEPRMSA-QOT"]
+    assert config.policy == "GatPolicy"
+    reward_fn = build_reward_function("binary", {})
+    models = {}
+    for topology in ("NSFNET", "JAPAN"):
+        factory = EnvironmentFactory(base_kwargs={**ENVIRONMENT.as_dict(), "topology": topology})
+        models[topology] = AgentBuilder(config=config, factory=factory, reward_fn=reward_fn).build(seed=1)
+    extractor = models["NSFNET"].policy.features_extractor
+    assert isinstance(extractor, GatExtractor)
+
+    # One pass over a minibatch equals one pass per observation
+    env = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict()).make(seed=4)
+    obs, _ = env.reset(seed=4)
+    batch = [obs]
+    for _ in range(7):
+        obs, _, _, _, _ = env.step(env.action_space.sample())
+        batch.append(obs)
+    batch = torch.as_tensor(np.stack(batch))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with torch.no_grad():
+            together = extractor(batch)
+            alone = torch.cat([extractor(row[None]) for row in batch])
+    assert torch.allclose(together, alone, atol=1e-5)
+    console.print(f"✓ Batched message passing matches per-sample ({batch.shape[0]} observations)")
+
+    # Edge-wise attention equals a dense softmax over each link's neighbours
+    layer = extractor.gat[0]
+    h = torch.randn(extractor.num_edges, layer.proj.in_features)
+    source, target = extractor.edge_index
+    adjacency = torch.zeros(extractor.num_edges, extractor.num_edges, dtype=torch.bool)
+    adjacency[target, source] = True
+    z = layer.proj(h).view(-1, layer.heads, layer.head_dim)
+    logits = torch.nn.functional.leaky_relu(
+        (z * layer.att_source).sum(-1).T[:, None, :] + (z * layer.att_target).sum(-1).T[:, :, None], 0.2
+    )
+    alpha = logits.masked_fill(~adjacency, -torch.inf).softmax(-1)  # (heads, target, source)
+    dense = layer.activation(torch.einsum("hts,shd->thd", alpha, z).flatten(1) + layer.bias) + h
+    with torch.no_grad():
+        assert torch.allclose(layer(h, source, target), dense, atol=1e-5)
+    console.print("✓ Edge-wise attention matches a dense masked softmax")
+
+    assert all(isinstance(layer.activation, torch.nn.ELU) for layer in extractor.gat)
+    tanh_config = dataclasses.replace(config, activation="tanh")
+    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict())
+    tanh_model = AgentBuilder(config=tanh_config, factory=factory, reward_fn=reward_fn).build(seed=1)
+    assert all(isinstance(layer.activation, torch.nn.Tanh) for layer in tanh_model.policy.features_extractor.gat)
+    console.print("✓ GAT layers use AgentConfig.activation")
+
+    models["JAPAN"].policy.load_state_dict(models["NSFNET"].policy.state_dict())
+    console.print(
+        f"✓ NSFNET weights load on JAPAN ({sum(p.numel() for p in extractor.parameters()):,} extractor parameters)"
+    )
+    console.print("\n[bold green]✓ GAT policy test PASSED![/bold green]\n")
+    return True
+
+
+def test_no_copy_terminal_observation():
+    """copy_observation=False must not alias terminal_observation with the reset observation."""
+    console.print("\n[bold cyan]🔚 Testing No-Copy Terminal Observations...[/bold cyan]\n")
+
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    actions = np.random.default_rng(1).integers(0, 12, size=(25, 1))
+    terminals = {}
+    for copy in (True, False):
+        kwargs = {**ENVIRONMENT.as_dict(), "episode_length": 6, "copy_observation": copy}
+        vec = DummyVecEnv([lambda: rmsa_environment.RMSAEnv(**kwargs)])
+        vec.seed(3)
+        vec.reset()
+        terminals[copy] = []
+        for action in actions:
+            obs, _, dones, infos = vec.step(action)
+            if dones[0]:
+                terminal = infos[0]["terminal_observation"]
+                assert not np.array_equal(terminal, obs[0])
+                terminals[copy].append(terminal)
+        vec.close()
+
+    assert len(terminals[False]) == 4
+    assert all(np.array_equal(a, b) for a, b in zip(terminals[True], terminals[False]))
+    console.print(f"✓ {len(terminals[False])} terminal observations differ from the reset observation")
+    console.print("\n[bold green]✓ No-copy terminal observation test PASSED![/bold green]\n")
+    return True
+
+
+def test_trace_replay():
+    """A recorded trace must replay the live request stream and blocking exactly."""
+    console.print("\n[bold cyan]📼 Testing Trace Replay...[/bold cyan]\n")
+
+    import dataclasses
+    import tempfile
+
+    from traffic import REQUEST_DTYPE, TraceReplay, _RequestStream
+
+    num_requests = 400
+    kwargs = {**ENVIRONMENT.as_dict(), "episode_length": num_requests}
+    live = rmsa_environment.RMSAEnv(**kwargs)
+    actions = np.random.default_rng(2).integers(0, live.action_space.n, size=num_requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = live.record_trace(f"{tmp}/trace.npy", num_requests, seed=11)
+        replay = rmsa_environment.RMSAEnv(**kwargs, traffic_trace=str(path))
+
+        runs = {}
+        for name, env in (("live", live), ("replay", replay)):
+            env.reset(seed=11)
+            requests, allocated = [], []
+            for action in actions:
+                requests.append(dataclasses.astuple(env.current_request))
+                _, _, terminated, _, info = env.step(int(action))
+                allocated.append(info["allocation_success"])
+            assert terminated
+            runs[name] = (requests, allocated)
+        assert runs["live"][0] == runs["replay"][0]
+        assert runs["live"][1] == runs["replay"][1]
+        console.print(f"✓ {num_requests} requests and allocation outcomes identical")
+
+        # The stream wraps around at the end, and seed() only rewinds
+        stream = TraceReplay(path, num_nodes=live.num_nodes, block_size=64)
+        first = stream.take(num_requests + 5)
+        assert np.array_equal(first[num_requests:], first[:5])
+        stream.seed(12345)
+        assert np.array_equal(stream.take(5), first[:5])
+        console.print("✓ Wrap-around and rewind-only seed()")
+
+        # Node ids are validated over the whole trace, not just its first block
+        requests = np.load(path)
+        for bad in (live.num_nodes, -1):
+            corrupt = np.concatenate([requests] * 12)
+            corrupt["destination"][4500] = bad
+            np.save(f"{tmp}/corrupt.npy", corrupt)
+            try:
+                TraceReplay(f"{tmp}/corrupt.npy", num_nodes=live.num_nodes)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"node {bad} at request 4500 must be rejected")
+        console.print("✓ Out-of-range nodes past the first block are rejected")
+
+    # A request source without its block/state hooks fails when it is created
+    class _NoStateStream(_RequestStream):
+        def _next_block(self, count):
+            return np.empty(0, dtype=REQUEST_DTYPE)
+
+    try:
+        _NoStateStream()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("an incomplete request stream must not be instantiable")
+    console.print("✓ Incomplete request streams are rejected at construction")
+
+    console.print("\n[bold green]✓ Trace replay test PASSED![/bold green]\n")
+    return True
+
+
+def test_lightpath_expiry():
+    """Lightpaths must release their slots once they depart, before the next arrival."""
+    console.print("\n[bold cyan]⏳ Testing Lightpath Expiry...[/bold cyan]\n")
+
+    env = rmsa_environment.RMSAEnv(episode_length=50, seed=5, traffic_matrix=None)
+    env.reset(seed=5)
+
+    def allocate(holding_time):
+        env.current_request.holding_time = holding_time
+        action = int(np.flatnonzero(env.action_masks())[0])
+        _, _, _, _, info = env.step(action)
+        assert info["allocation_success"]
+
+    # A long-lived lightpath stays in the table and on the spectrum
+    allocate(1e9)
+    kept = env.spectrum_state.copy()
+    occupied = env.spectrum.occupied_total
+    assert len(env.connections) == 1 and occupied > 0
+
+    # One departing before the next arrival is released within the same step
+    allocate(1e-9)
+    assert len(env.connections) == 1
+    assert env.spectrum.occupied_total == occupied
+    assert np.array_equal(env.spectrum_state, kept)
+    assert np.array_equal(env._obs_spectrum, kept)
+    console.print("✓ Expired lightpath freed its slots and left the connection table")
+
+    # Holding time is scaled so ``load`` is the offered share of total spectrum:
+    # shortest path, fewest slots over the modulations in reach
+    table = env.path_table
+    routable = table.num_paths > 0
+    slots = env.slot_table[:, :, 0].astype(np.float64)
+    slots[slots <= 0] = np.inf
+    footprint = table.hops[..., 0][routable] * slots.min(axis=2)[routable].mean(axis=1)
+    expected = env.load * env.num_edges * env.num_freq_slots / footprint.mean()
+    assert np.isclose(env.mean_holding_time, expected)
+    doubled = rmsa_environment.RMSAEnv(episode_length=50, load=2 * env.load, traffic_matrix=None)
+    assert np.isclose(doubled.mean_holding_time, 2 * env.mean_holding_time)
+    explicit = rmsa_environment.RMSAEnv(episode_length=50, mean_holding_time=3.0, traffic_matrix=None)
+    assert explicit.mean_holding_time == 3.0
+    console.print(f"✓ Normalised mean holding time {env.mean_holding_time:.1f}")
+
+    console.print("\n[bold green]✓ Lightpath expiry test PASSED![/bold green]\n")
+    return True
+
+
+def test_path_observation():
+    """Path-mode features must describe the free blocks of each candidate path."""
+    console.print("\n[bold cyan]🛣️  Testing Path Observation...[/bold cyan]\n")
+
+    from spectrum import feasible_starts, free_blocks
+
+    env = rmsa_environment.RMSAEnv(observation_mode="path", episode_length=10)
+    env.reset(seed=1)
+    k, modulations = env.k_paths, env.num_modulations
+    features = len(rmsa_environment.PATH_FEATURES)
+    assert env.observation_space.shape == (1 + k * modulations * features,)
+
+    # Hand-built state on path 0 of 0 -> 13: free blocks [0, 5), [10, 30), [40, 50)
+    source, destination = 0, 13
+    edges = env.path_table.path_edges(source, destination, 0)
+    env.spectrum.clear()
+    for edge, start, num_slots in ((edges[0], 5, 5), (edges[-1], 30, 10), (edges[0], 50, 146)):
+        env.spectrum.allocate(np.array([edge]), start, num_slots)
+    env.current_request = rmsa_environment.ConnectionRequest(source, destination, 200, env.clock, 1.0, 3)
+
+    obs = env._get_observation()
+    assert obs.shape == env.observation_space.shape
+    assert obs[0] == 200 / 400.0
+    paths = obs[1:].reshape(k, modulations, features)
+
+    num_slots = env.num_freq_slots
+    required = np.ceil(200 / (12.5 * env._efficiency)).astype(int)  # 16, 8, 6, 4 slots
+    assert np.allclose(paths[0, :, 2] * num_slots, [10, 10, 10, 0])  # first fit
+    assert np.allclose(paths[0, :, 3] * num_slots, 20)  # largest free block
+    assert np.allclose(paths[0, :, 4] * ((num_slots + 1) // 2), [1, 2, 2, 3])  # blocks that fit
+    assert np.array_equal(paths[0, :, 5], [1, 0, 0, 0])  # 3750 km: only BPSK in reach
+
+    for path_idx in range(int(env.path_table.num_paths[source, destination])):
+        occupied = env.spectrum.joint_occupancy(env.path_table.path_edges(source, destination, path_idx))
+        _, lengths = free_blocks(occupied)
+        for mod_idx, slots in enumerate(required):
+            row = paths[path_idx, mod_idx]
+            starts = feasible_starts(occupied, int(slots))
+            assert np.isclose(row[0] * num_slots, slots)
+            assert np.isclose(row[2] * num_slots, starts[0] if starts.size else num_slots)
+            assert np.isclose(row[3] * num_slots, lengths.max())
+            assert np.isclose(row[4] * ((num_slots + 1) // 2), (lengths >= slots).sum())
+    console.print(f"✓ {k} paths x {modulations} modulations match free_blocks / feasible_starts")
+
+    console.print("\n[bold green]✓ Path observation test PASSED![/bold green]\n")
+    return True
+
+
+def test_fast_env_parity():
+    """EnvironmentFactory(fast=True) must behave exactly like gym.make + wrappers."""
+    console.print("\n[bold cyan]🏎️  Testing Fast-Path Env Parity...[/bold cyan]\n")
+
+    from reward_functions import build_reward_function
+
+    base_kwargs = {**ENVIRONMENT.as_dict(), "episode_length": 300}
+    choices = np.random.default_rng(4).random(base_kwargs["episode_length"])
+    runs = {}
+    for fast in (False, True):
+        env = EnvironmentFactory(base_kwargs=base_kwargs, fast=fast).make(
+            seed=9, reward_fn=build_reward_function("multi_objective", {})
+        )
+        observations, rewards, infos, masks = [env.reset(seed=9)[0]], [], [], []
+        for choice in choices:
+            mask = env.action_masks()
+            valid = np.flatnonzero(mask)
+            obs, reward, terminated, truncated, info = env.step(int(valid[int(choice * valid.size)]))
+            masks.append(mask)
+            observations.append(obs)
+            rewards.append(reward)
+            infos.append(info)
+        assert terminated and not truncated
+        env.close()
+        runs[fast] = observations, rewards, infos, masks
+
+    (slow_obs, slow_rewards, slow_infos, slow_masks), (fast_obs, fast_rewards, fast_infos, fast_masks) = (
+        runs[False],
+        runs[True],
+    )
+    assert np.array_equal(np.stack(slow_obs), np.stack(fast_obs))
+    assert slow_rewards == fast_rewards and len(set(fast_rewards)) > 1
+    assert all(np.array_equal(a, b) for a, b in zip(slow_masks, fast_masks))
+    for slow, fast in zip(slow_infos, fast_infos):
+        assert slow.keys() == fast.keys() and "shaped_reward" in fast
+        assert all(np.array_equal(slow[key], fast[key]) for key in slow)
+    console.print(f"✓ {len(choices)} steps: observations, rewards, infos and action masks identical")
+
+    console.print("\n[bold green]✓ Fast-path parity test PASSED![/bold green]\n")
+    return True
+
+
 def main():
     """Run all tests."""
     console.print("[bold magenta]═" * 60)
@@ -139,6 +953,82 @@ def main():
             console.print("[bold red]✗ Environment test FAILED![/bold red]")
             return False
 
+        if not test_spectrum_search():
+            console.print("[bold red]✗ Spectrum search test FAILED![/bold red]")
+            return False
+
+        if not test_incremental_counters():
+            console.print("[bold red]✗ Incremental counters test FAILED![/bold red]")
+            return False
+
+        if not test_vec_env():
+            console.print("[bold red]✗ Vector environment test FAILED![/bold red]")
+            return False
+
+        if not test_action_masks():
+            console.print("[bold red]✗ Action mask test FAILED![/bold red]")
+            return False
+
+        if not test_state_snapshot():
+            console.print("[bold red]✗ State snapshot test FAILED![/bold red]")
+            return False
+
+        if not test_heuristics():
+            console.print("[bold red]✗ Heuristic test FAILED![/bold red]")
+            return False
+
+        if not test_synthetic_topology():
+            console.print("[bold red]✗ Synthetic topology test FAILED![/bold red]")
+            return False
+
+        if not test_topology_files():
+            console.print("[bold red]✗ Topology file test FAILED![/bold red]")
+            return False
+
+        if not test_profiler():
+            console.print("[bold red]✗ Profiler test FAILED![/bold red]")
+            return False
+
+        if not test_shared_memory_vec_env():
+            console.print("[bold red]✗ Shared-memory VecEnv test FAILED![/bold red]")
+            return False
+
+        if not test_training_schedule():
+            console.print("[bold red]✗ Training scheduler test FAILED![/bold red]")
+            return False
+
+        if not test_checkpoint_resume():
+            console.print("[bold red]✗ Checkpoint / resume test FAILED![/bold red]")
+            return False
+
+        if not test_spectrum_extractor():
+            console.print("[bold red]✗ Spectrum feature extractor test FAILED![/bold red]")
+            return False
+
+        if not test_gat_policy():
+            console.print("[bold red]✗ GAT policy test FAILED![/bold red]")
+            return False
+
+        if not test_no_copy_terminal_observation():
+            console.print("[bold red]✗ No-copy terminal observation test FAILED![/bold red]")
+            return False
+
+        if not test_trace_replay():
+            console.print("[bold red]✗ Trace replay test FAILED![/bold red]")
+            return False
+
+        if not test_lightpath_expiry():
+            console.print("[bold red]✗ Lightpath expiry test FAILED![/bold red]")
+            return False
+
+        if not test_path_observation():
+            console.print("[bold red]✗ Path observation test FAILED![/bold red]")
+            return False
+
+        if not test_fast_env_parity():
+            console.print("[bold red]✗ Fast-path parity test FAILED![/bold red]")
+            return False
+
         console.print("[bold green]═" * 60)
         console.print("[bold green]   ✓ ALL TESTS PASSED - Ready for Training!")
         console.print("[bold green]═" * 60)
@@ -0,0 +1,169 @@
+"""Synthetic optical topologies for scaling studies.
+
+Nodes are scattered over a continental-size plane and linked either with the
+Waxman model (link probability decaying with distance) or geometrically (the
+shortest node pairs). Both aim at the mean nodal degree of real backbones (~3)
+and are then augmented with the shortest extra links until the graph is
+2-connected, so every node pair survives a single link or node failure. Link
+lengths are Euclidean distances in km inflated by a fibre route factor.
+
+Synthetic topologies are addressed by name, e.g. ``WAXMAN-100`` or
+``GEOMETRIC-500-S3`` (seed 3), so the name alone rebuilds the same graph in any
+process.
+
+Uso:
+    from topology_generator import synthetic_topology
+    graph = synthetic_topology("WAXMAN-200")
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+SYNTHETIC_MODELS = ("WAXMAN", "GEOMETRIC")
+
+_SYNTHETIC_NAME = re.compile(r"^(?P<model>[A-Z]+)-(?P<nodes>\d+)(?:-S(?P<seed>\d+))?$")
+
+# Fibre routes are longer than the straight line between sites
+ROUTE_FACTOR = 1.2
+
+
+def parse_synthetic_name(name: str) -> Optional[Tuple[str, int, int]]:
+    """``(model, num_nodes, seed)`` for a synthetic topology name, else ``None``."""
+
+    match = _SYNTHETIC_NAME.match(name)
+    if match is None or match["model"] not in SYNTHETIC_MODELS:
+        return None
+    return match["model"], int(match["nodes"]), int(match["seed"] or 0)
+
+
+def _pairwise_km(positions: np.ndarray) -> np.ndarray:
+    delta = positions[:, None, :] - positions[None, :, :]
+    return np.sqrt((delta ** 2).sum(axis=-1)) * ROUTE_FACTOR
+
+
+def _make_graph(positions: np.ndarray, distances: np.ndarray, pairs: np.ndarray) -> nx.Graph:
+    graph = nx.Graph()
+    for node, (x, y) in enumerate(positions):
+        graph.add_node(node, pos=(float(x), float(y)))
+    for u, v in pairs:
+        _add_link(graph, distances, int(u), int(v))
+    return graph
+
+
+def _add_link(graph: nx.Graph, distances: np.ndarray, u: int, v: int) -> None:
+    dist = max(int(round(distances[u, v])), 1)
+    graph.add_edge(u, v, distance=dist, weight=dist)
+
+
+def _closest_pair(distances: np.ndarray, inside: np.ndarray, outside: np.ndarray) -> Tuple[int, int]:
+    block = distances[np.ix_(inside, outside)]
+    i, j = np.unravel_index(np.argmin(block), block.shape)
+    return int(inside[i]), int(outside[j])
+
+
+def make_two_connected(graph: nx.Graph, distances: np.ndarray) -> nx.Graph:
+    """Add the shortest links needed to make ``graph`` connected and 2-connected (in place)."""
+
+    nodes = np.arange(graph.number_of_nodes())
+    components = [np.fromiter(c, dtype=np.intp) for c in nx.connected_components(graph)]
+    while len(components) > 1:
+        # Join the smallest component to its nearest neighbour component
+        components.sort(key=len)
+        inside = components.pop(0)
+        outside = np.setdiff1d(nodes, inside)
+        _add_link(graph, distances, *_closest_pair(distances, inside, outside))
+        components = [np.fromiter(c, dtype=np.intp) for c in nx.connected_components(graph)]
+
+    while not nx.is_biconnected(graph):
+        cut_nodes = set(nx.articulation_points(graph))
+        for block in list(nx.biconnected_components(graph)):
+            cuts = block & cut_nodes
+            if len(cuts) != 1:
+                continue
+            # Leaf block of the block-cut tree: link one of its inner nodes past its cut node
+            inner = np.fromiter(block - cuts, dtype=np.intp)
+            outside = np.setdiff1d(nodes, np.fromiter(block, dtype=np.intp))
+            u, v = _closest_pair(distances, inner, outside)
+            if not graph.has_edge(u, v):
+                _add_link(graph, distances, u, v)
+    return graph
+
+
+def waxman_topology(
+    num_nodes: int,
+    seed: Optional[int] = None,
+    mean_degree: float = 3.0,
+    alpha: float = 0.15,
+    area_km: Tuple[float, float] = (3000.0, 2000.0),
+) -> nx.Graph:
+    """Waxman random graph: link ``(u, v)`` with probability ``∝ exp(-d / (alpha * L))``.
+
+    The probabilities are scaled so the expected degree is ``mean_degree``
+    regardless of ``num_nodes``; ``L`` is the largest node distance.
+    """
+
+    if num_nodes < 3:
+        raise ValueError("Synthetic topologies need at least 3 nodes")
+    rng = np.random.default_rng(seed)
+    positions = rng.random((num_nodes, 2)) * np.asarray(area_km)
+    distances = _pairwise_km(positions)
+
+    u, v = np.triu_indices(num_nodes, k=1)
+    weight = np.exp(-distances[u, v] / (alpha * distances.max()))
+    probability = np.minimum(weight * (mean_degree * num_nodes / 2.0) / weight.sum(), 1.0)
+    linked = rng.random(probability.size) < probability
+
+    graph = _make_graph(positions, distances, np.column_stack([u[linked], v[linked]]))
+    return make_two_connected(graph, distances)
+
+
+def geometric_topology(
+    num_nodes: int,
+    seed: Optional[int] = None,
+    mean_degree: float = 3.0,
+    area_km: Tuple[float, float] = (3000.0, 2000.0),
+) -> nx.Graph:
+    """Geometric graph: the ``mean_degree * N / 2`` shortest node pairs become links."""
+
+    if num_nodes < 3:
+        raise ValueError("Synthetic topologies need at least 3 nodes")
+    rng = np.random.default_rng(seed)
+    positions = rng.random((num_nodes, 2)) * np.asarray(area_km)
+    distances = _pairwise_km(positions)
+
+    u, v = np.triu_indices(num_nodes, k=1)
+    num_links = int(round(mean_degree * num_nodes / 2.0))
+    shortest = np.argsort(distances[u, v], kind="stable")[:num_links]
+
+    graph = _make_graph(positions, distances, np.column_stack([u[shortest], v[shortest]]))
+    return make_two_connected(graph, distances)
+
+
+@lru_cache(maxsize=None)
+def synthetic_topology(name: str) -> nx.Graph:
+    """Build (once per process) the synthetic topology ``name``; the graph is frozen."""
+
+    parsed = parse_synthetic_name(name)
+    if parsed is None:
+        raise ValueError(
+            f"Not a synthetic topology name: {name}. Expected <MODEL>-<nodes>[-S<seed>] "
+            f"with MODEL in {', '.join(SYNTHETIC_MODELS)}"
+        )
+    model, num_nodes, seed = parsed
+    builder = waxman_topology if model == "WAXMAN" else geometric_topology
+    return nx.freeze(builder(num_nodes, seed=seed))
+
+
+__all__ = [
+    "SYNTHETIC_MODELS",
+    "geometric_topology",
+    "make_two_connected",
+    "parse_synthetic_name",
+    "synthetic_topology",
+    "waxman_topology",
+]
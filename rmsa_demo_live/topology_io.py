@@ -0,0 +1,193 @@
+"""Topology files (SNDlib XML, GML, JSON) with on-disk routing artefacts.
+
+A loaded file becomes a graph in the env's convention: nodes ``0..N-1`` in file
+order (the original id kept as ``label``) and every link carrying ``distance``
+and ``weight`` in km. Links without an explicit length get the great-circle
+distance between geographic coordinates (or the Euclidean one for plain x/y).
+Parallel links collapse into the shortest one.
+
+The compiled topology, k-shortest-path tables and slot requirements of a file
+are stored next to it in ``<stem>.<hash>.rmsa/``, where ``hash`` covers the file
+content, so the next env on that topology maps them from disk instead of
+enumerating paths again, and editing the file invalidates them.
+
+Uso:
+    env = RMSAEnv(topology="redes/germany50.xml")
+    TopologyManager.load_file("redes/germany50.xml", name="GERMANY50")
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import networkx as nx
+
+from routing import persist_routing
+
+TOPOLOGY_FILE_FORMATS = (".xml", ".gml", ".json")
+
+# Bump when the stored artefact layout changes
+ARTEFACT_VERSION = 1
+
+# Edge attributes read as a link length in km, in order of preference
+_LENGTH_KEYS = ("distance", "length", "LinkLength", "km")
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def is_topology_file(name: str) -> bool:
+    path = Path(name)
+    return path.suffix.lower() in TOPOLOGY_FILE_FORMATS and path.is_file()
+
+
+def artefact_dir(path: Union[str, Path]) -> Path:
+    """Directory holding the routing artefacts of the current content of ``path``."""
+
+    path = Path(path)
+    digest = hashlib.sha256(path.read_bytes() + f"rmsa-artefacts-v{ARTEFACT_VERSION}".encode()).hexdigest()
+    return path.with_name(f"{path.stem}.{digest[:16]}.rmsa")
+
+
+def _great_circle_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    (lon1, lat1), (lon2, lat2) = (map(math.radians, a), map(math.radians, b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def _normalise(
+    nodes: List[Tuple[Any, Optional[Tuple[float, float]]]],
+    labels: Optional[List[str]],
+    links: List[Tuple[Any, Any, Optional[float]]],
+    geographic: bool,
+    source: Path,
+) -> nx.Graph:
+    index = {node_id: i for i, (node_id, _) in enumerate(nodes)}
+    graph = nx.Graph()
+    for i, (node_id, pos) in enumerate(nodes):
+        graph.add_node(i, label=labels[i] if labels else str(node_id), pos=pos)
+
+    for u_id, v_id, length in links:
+        if u_id not in index or v_id not in index:
+            raise ValueError(f"{source}: link {u_id}-{v_id} references an unknown node")
+        u, v = index[u_id], index[v_id]
+        if u == v:
+            continue
+        if length is None:
+            pos_u, pos_v = nodes[u][1], nodes[v][1]
+            if pos_u is None or pos_v is None:
+                raise ValueError(f"{source}: link {u_id}-{v_id} has no length and its nodes no coordinates")
+            length = _great_circle_km(pos_u, pos_v) if geographic else math.dist(pos_u, pos_v)
+        dist = max(float(length), 1.0)
+        if graph.has_edge(u, v) and graph[u][v]["distance"] <= dist:
+            continue
+        graph.add_edge(u, v, distance=dist, weight=dist)
+    return graph
+
+
+def _link_length(attrs: Dict[str, Any]) -> Optional[float]:
+    for key in _LENGTH_KEYS:
+        if key in attrs:
+            return float(attrs[key])
+    return None
+
+
+def read_sndlib_xml(path: Path) -> nx.Graph:
+    root = ET.parse(path).getroot()
+    nodes_el = root.find(".//{*}nodes")
+    if nodes_el is None:
+        raise ValueError(f"{path}: no <nodes> section, not an SNDlib network")
+    geographic = nodes_el.get("coordinatesType", "geographical") == "geographical"
+
+    nodes = []
+    for node in nodes_el.iterfind("{*}node"):
+        x, y = node.find(".//{*}x"), node.find(".//{*}y")
+        pos = (float(x.text), float(y.text)) if x is not None and y is not None else None
+        nodes.append((node.get("id"), pos))
+
+    links = []
+    for link in root.iterfind(".//{*}links/{*}link"):
+        length = link.find("{*}length")
+        links.append(
+            (
+                link.findtext("{*}source"),
+                link.findtext("{*}target"),
+                float(length.text) if length is not None else None,
+            )
+        )
+    return _normalise(nodes, None, links, geographic, path)
+
+
+def read_gml(path: Path) -> nx.Graph:
+    # Ids rather than labels: Topology Zoo files repeat labels
+    raw = nx.read_gml(path, label="id")
+    geographic = any("Longitude" in attrs for _, attrs in raw.nodes(data=True))
+    nodes = []
+    for node_id, attrs in raw.nodes(data=True):
+        if geographic and "Longitude" in attrs and "Latitude" in attrs:
+            pos = (float(attrs["Longitude"]), float(attrs["Latitude"]))
+        elif "x" in attrs and "y" in attrs:
+            pos = (float(attrs["x"]), float(attrs["y"]))
+        else:
+            pos = None
+        nodes.append((node_id, pos))
+    labels = [str(attrs.get("label", node_id)) for node_id, attrs in raw.nodes(data=True)]
+    links = [(u, v, _link_length(attrs)) for u, v, attrs in raw.edges(data=True)]
+    return _normalise(nodes, labels, links, geographic, path)
+
+
+def read_json(path: Path) -> nx.Graph:
+    """Node-link JSON: ``nodes`` with ``id`` and ``longitude``/``latitude`` (or ``x``/``y``),
+    ``links`` with ``source``, ``target`` and optionally ``distance`` in km."""
+
+    data = json.loads(path.read_text())
+    raw_nodes = data.get("nodes", [])
+    geographic = any("longitude" in node for node in raw_nodes)
+    nodes = []
+    for node in raw_nodes:
+        if geographic and "longitude" in node and "latitude" in node:
+            pos = (float(node["longitude"]), float(node["latitude"]))
+        elif "x" in node and "y" in node:
+            pos = (float(node["x"]), float(node["y"]))
+        else:
+            pos = None
+        nodes.append((node["id"], pos))
+    labels = [str(node.get("label", node["id"])) for node in raw_nodes]
+    links = [(link["source"], link["target"], _link_length(link)) for link in data.get("links", data.get("edges", []))]
+    return _normalise(nodes, labels, links, geographic, path)
+
+
+_READERS = {".xml": read_sndlib_xml, ".gml": read_gml, ".json": read_json}
+
+
+def read_topology(path: Union[str, Path], name: Optional[str] = None, cache: bool = True) -> nx.Graph:
+    """Load a topology file; with ``cache`` its routing artefacts persist next to it.
+
+    ``name`` is the topology name the env will be created with (the path itself
+    by default); the artefacts are attached to that name.
+    """
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in _READERS:
+        raise ValueError(f"Unsupported topology file {path}. Supported: {', '.join(TOPOLOGY_FILE_FORMATS)}")
+    graph = _READERS[suffix](path)
+    if graph.number_of_edges() == 0:
+        raise ValueError(f"{path}: topology has no links")
+    if cache:
+        persist_routing(name or str(path), artefact_dir(path))
+    return graph
+
+
+__all__ = [
+    "TOPOLOGY_FILE_FORMATS",
+    "artefact_dir",
+    "is_topology_file",
+    "read_gml",
+    "read_json",
+    "read_sndlib_xml",
+    "read_topology",
+]
@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, Iterator, List, Optional
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import networkx as nx
 
 from environment import EnvironmentFactory
 from rmsa_environment import (
@@ -13,7 +16,10 @@ from rmsa_environment import (
     RMSAEnv,
     UKNETTopology,
     USNETTopology,
+    register_topology,
 )
+from topology_generator import parse_synthetic_name, synthetic_topology
+from topology_io import is_topology_file, read_topology
 
 
 @dataclass(frozen=True)
@@ -109,9 +115,50 @@ class TopologyManager:
     def descriptor(cls, name: str) -> TopologyDescriptor:
         try:
             return cls._DESCRIPTORS[name]
-        except KeyError as exc:  # pragma: no cover - guard
+        except KeyError as exc:
+            # Same names RMSAEnv accepts: synthetic generators and topology files
+            if parse_synthetic_name(name) is not None:
+                return cls.register(name, lambda: synthetic_topology(name))
+            if is_topology_file(name):
+                return cls.load_file(name, name=name)
             raise ValueError(f"Unknown topology: {name}") from exc
 
+    @classmethod
+    def register(
+        cls, name: str, builder: Callable[[], nx.Graph], description: Optional[str] = None
+    ) -> TopologyDescriptor:
+        """Registra una topología nueva (p. ej. sintética) junto a las seis clásicas."""
+
+        graph = builder()
+        if description is None:
+            parsed = parse_synthetic_name(name)
+            description = (
+                f"Topología sintética {parsed[0].title()} 2-conexa ({parsed[1]} nodos, semilla {parsed[2]})"
+                if parsed
+                else "Topología registrada por el usuario"
+            )
+        descriptor = TopologyDescriptor(
+            name=name,
+            nodes=graph.number_of_nodes(),
+            links=graph.number_of_edges(),
+            diameter=nx.diameter(graph) if nx.is_connected(graph) else None,
+            description=description,
+        )
+        register_topology(name, builder)
+        cls._DESCRIPTORS[name] = descriptor
+        return descriptor
+
+    @classmethod
+    def load_file(
+        cls, path: Union[str, Path], name: Optional[str] = None, description: Optional[str] = None
+    ) -> TopologyDescriptor:
+        """Registra una topología SNDlib XML / GML / JSON; sus tablas de rutas se guardan junto al archivo."""
+
+        path = Path(path)
+        name = name or path.stem.upper()
+        graph = read_topology(path, name=name)
+        return cls.register(name, lambda: graph, description or f"Cargada desde {path.name}")
+
     @classmethod
     def iter_descriptors(cls) -> Iterator[TopologyDescriptor]:
         for name in cls.available_names():
@@ -0,0 +1,259 @@
+"""Block-wise traffic generation and trace replay for the RMSA environment.
+
+Requests are drawn a block at a time into a structured array (one RNG call per
+field per block) and handed out one by one, so the per-request cost is a list
+index. The sequence depends only on the seed, never on the agent's actions, so
+every agent evaluated with the same seed sees the same traffic.
+
+Traces are the same structured array saved as a ``.npy`` file. Replay maps the
+file read-only with ``np.memmap``: opening is instant whatever the trace size,
+and processes replaying the same trace share its pages through the OS cache.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+REQUEST_DTYPE = np.dtype(
+    [
+        ("source", np.int32),
+        ("destination", np.int32),
+        ("bit_rate_class", np.int8),
+        ("inter_arrival", np.float64),
+        ("holding_time", np.float64),
+    ]
+)
+
+TRAFFIC_PATTERNS = ("uniform", "gravity")
+
+TrafficSpec = Union[None, str, np.ndarray]
+
+
+def gravity_traffic_matrix(graph: nx.Graph) -> np.ndarray:
+    """Gravity model: demand between two nodes proportional to the product of their degrees."""
+
+    degree = np.array([graph.degree(node) for node in range(graph.number_of_nodes())], dtype=np.float64)
+    matrix = np.outer(degree, degree)
+    np.fill_diagonal(matrix, 0.0)
+    return matrix / matrix.sum()
+
+
+def resolve_traffic_matrix(traffic: TrafficSpec, graph: nx.Graph) -> Optional[np.ndarray]:
+    """Normalise a traffic spec into an ``(N, N)`` pair distribution, or ``None`` for uniform."""
+
+    if traffic is None or (isinstance(traffic, str) and traffic == "uniform"):
+        return None
+    if isinstance(traffic, str):
+        if traffic == "gravity":
+            return gravity_traffic_matrix(graph)
+        raise ValueError(f"Unknown traffic pattern: {traffic}. Available: {', '.join(TRAFFIC_PATTERNS)}")
+
+    num_nodes = graph.number_of_nodes()
+    matrix = np.array(traffic, dtype=np.float64)
+    if matrix.shape != (num_nodes, num_nodes):
+        raise ValueError(f"Traffic matrix must be {num_nodes}x{num_nodes}, got {matrix.shape}")
+    np.fill_diagonal(matrix, 0.0)
+    if np.any(matrix < 0) or matrix.sum() <= 0:
+        raise ValueError("Traffic matrix must be non-negative with positive total demand")
+    return matrix / matrix.sum()
+
+
+class _RequestStream(ABC):
+    """Hands out requests from lazily refilled blocks produced by ``_next_block``."""
+
+    block_size: int
+
+    def __init__(self) -> None:
+        self._block = np.empty(0, dtype=REQUEST_DTYPE)
+        self._rows: List[Tuple] = []
+        self._cursor = 0
+
+    @abstractmethod
+    def _next_block(self, count: int) -> np.ndarray:
+        """The next ``count`` (or fewer) requests of the source as ``REQUEST_DTYPE``."""
+
+    @abstractmethod
+    def _source_state(self):
+        """Position of the source (RNG state, trace offset) for ``get_state``."""
+
+    @abstractmethod
+    def _set_source_state(self, state) -> None:
+        """Return the source to a ``_source_state`` value."""
+
+    def get_state(self) -> Tuple:
+        """Position in the stream; the pre-drawn block is shared, never copied."""
+        return (self._source_state(), self._block, self._rows, self._cursor)
+
+    def set_state(self, state: Tuple) -> None:
+        source_state, self._block, self._rows, self._cursor = state
+        self._set_source_state(source_state)
+
+    def _rewind(self) -> None:
+        self._block = np.empty(0, dtype=REQUEST_DTYPE)
+        self._rows = []
+        self._cursor = 0
+
+    def _refill(self) -> None:
+        self._block = self._next_block(self.block_size)
+        self._rows = self._block.tolist()
+        self._cursor = 0
+
+    def next(self) -> Tuple[int, int, int, float, float]:
+        """Next request as ``(source, destination, bit_rate_class, inter_arrival, holding_time)``."""
+        if self._cursor >= len(self._rows):
+            self._refill()
+        row = self._rows[self._cursor]
+        self._cursor += 1
+        return row
+
+    def take(self, count: int) -> np.ndarray:
+        """Next ``count`` requests of the stream as a structured array."""
+        out = np.empty(count, dtype=REQUEST_DTYPE)
+        filled = 0
+        while filled < count:
+            if self._cursor >= len(self._rows):
+                self._refill()
+            chunk = min(count - filled, len(self._rows) - self._cursor)
+            out[filled : filled + chunk] = self._block[self._cursor : self._cursor + chunk]
+            self._cursor += chunk
+            filled += chunk
+        return out
+
+
+class TrafficGenerator(_RequestStream):
+    """Pre-generated Poisson traffic handed out from lazily refilled blocks.
+
+    ``traffic_matrix`` is an optional ``(N, N)`` distribution over ordered node
+    pairs (see :func:`resolve_traffic_matrix`); without it pairs are uniform over
+    distinct nodes. Inter-arrival times are exponential with unit rate.
+    """
+
+    def __init__(
+        self,
+        num_nodes: int,
+        num_bit_rates: int,
+        mean_holding_time: float,
+        seed: Optional[int] = None,
+        traffic_matrix: Optional[np.ndarray] = None,
+        block_size: int = 4096,
+    ) -> None:
+        super().__init__()
+        self.num_nodes = num_nodes
+        self.num_bit_rates = num_bit_rates
+        self.mean_holding_time = mean_holding_time
+        self.block_size = block_size
+        self._pair_cdf: Optional[np.ndarray] = None
+        if traffic_matrix is not None:
+            self._pair_cdf = np.cumsum(np.asarray(traffic_matrix, dtype=np.float64).ravel())
+            self._pair_cdf /= self._pair_cdf[-1]
+        self.rng = np.random.default_rng(seed)
+
+    def seed(self, seed: Optional[int]) -> None:
+        """Restart the stream from ``seed``, dropping any pre-generated requests."""
+        self.rng = np.random.default_rng(seed)
+        self._rewind()
+
+    def generate(self, count: int) -> np.ndarray:
+        """Draw ``count`` fresh requests as a structured array."""
+        block = np.empty(count, dtype=REQUEST_DTYPE)
+        if self._pair_cdf is None:
+            # Uniform over distinct pairs: draw the destination among the other
+            # N - 1 nodes and shift it past the source, no retry loop needed
+            source = self.rng.integers(0, self.num_nodes, size=count)
+            destination = self.rng.integers(0, self.num_nodes - 1, size=count)
+            destination += destination >= source
+        else:
+            pair = np.searchsorted(self._pair_cdf, self.rng.random(count), side="right")
+            source, destination = np.divmod(np.minimum(pair, self._pair_cdf.size - 1), self.num_nodes)
+        block["source"] = source
+        block["destination"] = destination
+        block["bit_rate_class"] = self.rng.integers(0, self.num_bit_rates, size=count)
+        block["inter_arrival"] = self.rng.exponential(1.0, size=count)
+        block["holding_time"] = self.rng.exponential(self.mean_holding_time, size=count)
+        return block
+
+    _next_block = generate
+
+    def _source_state(self):
+        return self.rng.bit_generator.state
+
+    def _set_source_state(self, state) -> None:
+        self.rng.bit_generator.state = state
+
+    def record(self, path: Union[str, Path], num_requests: int) -> Path:
+        """Draw ``num_requests`` fresh requests from this generator into a trace file at ``path``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace = np.lib.format.open_memmap(path, mode="w+", dtype=REQUEST_DTYPE, shape=(num_requests,))
+        for offset in range(0, num_requests, self.block_size):
+            count = min(self.block_size, num_requests - offset)
+            # Whole blocks, drawn as the live stream draws them, so the trace is its prefix
+            trace[offset : offset + count] = self.generate(self.block_size)[:count]
+        trace.flush()
+        del trace
+        return path
+
+
+def open_trace(path: Union[str, Path]) -> np.memmap:
+    """Map a recorded trace read-only; nothing is read until requests are used."""
+    trace = np.load(path, mmap_mode="r")
+    if trace.dtype != REQUEST_DTYPE:
+        raise ValueError(f"{path} is not an RMSA traffic trace (dtype {trace.dtype})")
+    if trace.size == 0:
+        raise ValueError(f"Traffic trace {path} is empty")
+    return trace
+
+
+class TraceReplay(_RequestStream):
+    """Replays a recorded trace block by block, wrapping around at its end.
+
+    ``seed`` only rewinds to the first request: the trace, not an RNG, fixes the
+    sequence, including holding times recorded for the original load.
+    """
+
+    def __init__(self, path: Union[str, Path], num_nodes: Optional[int] = None, block_size: int = 4096) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.trace = open_trace(self.path)
+        self.block_size = block_size
+        self._position = 0
+        if num_nodes is not None:
+            # Whole columns: one strided pass over the map, cheap next to replaying it
+            nodes = [self.trace[field] for field in ("source", "destination")]
+            lowest, highest = min(int(col.min()) for col in nodes), max(int(col.max()) for col in nodes)
+            if lowest < 0 or highest >= num_nodes:
+                raise ValueError(f"Trace {self.path} references nodes outside a {num_nodes}-node topology")
+
+    def __len__(self) -> int:
+        return int(self.trace.size)
+
+    def seed(self, seed: Optional[int] = None) -> None:
+        self._position = 0
+        self._rewind()
+
+    def _source_state(self) -> int:
+        return self._position
+
+    def _set_source_state(self, state: int) -> None:
+        self._position = state
+
+    def _next_block(self, count: int) -> np.ndarray:
+        stop = min(self._position + count, self.trace.size)
+        block = np.array(self.trace[self._position : stop])
+        self._position = stop % self.trace.size
+        return block
+
+
+__all__ = [
+    "REQUEST_DTYPE",
+    "TRAFFIC_PATTERNS",
+    "TraceReplay",
+    "TrafficGenerator",
+    "gravity_traffic_matrix",
+    "open_trace",
+    "resolve_traffic_matrix",
+]
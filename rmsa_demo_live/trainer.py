@@ -2,12 +2,20 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing as mp
+import os
 import time
-from typing import Dict, Iterable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+from rich.table import Table
+from stable_baselines3.common.callbacks import BaseCallback
 
 from agents import AgentBuilder, train_agent
+from checkpointing import checkpoint_dir, latest_checkpoint
 from config import (
     BATTLE_AGENT_CONFIGS,
     BATTLE_TRAINING_CONFIGS,
@@ -15,13 +23,17 @@ from config import (
     TrainingConfig,
     REWARD_WEIGHTS,
 )
-from cpu_optimizer import configure_cpu_performance, print_system_info
+from cpu_optimizer import configure_cpu_performance, configure_thread_budget, print_system_info
 from environment import EnvironmentFactory
+from heuristics import HEURISTICS, evaluate_heuristic
 from reward_engineering import build_ultra_reward_function
 from reward_functions import build_reward_function
 
 console = Console()
 
+# Requests used to measure a heuristic baseline (nothing to train)
+HEURISTIC_REQUESTS = 200_000
+
 
 def build_reward(reward_id: str):
     weights = REWARD_WEIGHTS.get(reward_id, {})
@@ -35,42 +47,99 @@ def _resolve_roster(selection: Iterable[str]) -> Dict[str, str]:
     roster = {}
     for alias in selection:
         key = alias.upper()
-        if key not in BATTLE_AGENT_CONFIGS:
-            raise ValueError(f"Unknown agent '{alias}'. Available: {list(BATTLE_AGENT_CONFIGS)}")
+        if key not in BATTLE_AGENT_CONFIGS and key not in HEURISTICS:
+            available = list(BATTLE_AGENT_CONFIGS) + list(HEURISTICS)
+            raise ValueError(f"Unknown agent '{alias}'. Available: {available}")
         roster[key] = key
     return roster
 
 
-def run_training(selected_agents: Iterable[str], seed: int, fast: bool = False) -> None:
+def run_heuristic_baseline(name: str, seed: int, requests: int) -> None:
+    env_kwargs = {
+        key: value
+        for key, value in ENVIRONMENT.as_dict().items()
+        if key not in ("topology", "seed", "episode_length")
+    }
+    result = evaluate_heuristic(name, ENVIRONMENT.topology, requests, seed=seed, **env_kwargs)
+    console.print(
+        f"[bold green]✓ {name} baseline: blocking {result['blocking_probability']:.2%} "
+        f"({result['decisions_per_sec']:,.0f} decisions/s, {requests:,} requests)[/bold green]\n"
+    )
+
+
+def _effective_training(name: str, fast: bool) -> TrainingConfig:
+    training = BATTLE_TRAINING_CONFIGS[name]
+    if not fast:
+        return training
+    return TrainingConfig(
+        timesteps=max(training.timesteps // 20, 5_000),
+        tensorboard_log=training.tensorboard_log,
+        save_path=training.save_path,
+        eval_freq=max(training.eval_freq // 5, 1_000),
+        save_freq=max(training.save_freq // 5, 1_000),
+        n_envs=training.n_envs,
+        vec_env=training.vec_env,
+    )
+
+
+def _env_workers(training: TrainingConfig) -> int:
+    return training.n_envs if training.vec_env in ("subproc", "shared_memory") else 0
+
+
+def run_training(
+    selected_agents: Iterable[str],
+    seed: int,
+    fast: bool = False,
+    jobs: int = 1,
+    resume: bool = False,
+    fresh: bool = False,
+) -> None:
+    """Train the roster; ``jobs > 1`` trains that many agents at once (see ``run_concurrent_training``).
+
+    With ``resume`` each agent continues from its latest checkpoint, if any.
+    Otherwise previous checkpoints are moved aside, or deleted with ``fresh``.
+    """
+
+    roster = _resolve_roster(selected_agents)
+    if jobs > 1:
+        run_concurrent_training(roster, seed, fast=fast, jobs=jobs, resume=resume, fresh=fresh)
+        return
+
+    # Leave cores for the rollout worker processes of the widest agent
+    env_workers = max(
+        (_env_workers(BATTLE_TRAINING_CONFIGS[name]) for name in roster if name in BATTLE_TRAINING_CONFIGS),
+        default=0,
+    )
+
     console.print("\n[bold cyan]🚀 Configuring CPU Performance...[/bold cyan]")
-    configure_cpu_performance()
+    configure_cpu_performance(env_workers=env_workers)
     print_system_info()
 
-    roster = _resolve_roster(selected_agents)
-    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict())
+    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict(), fast=ENVIRONMENT.fast_path)
 
     console.print(f"\n[bold green]✓ Training {len(roster)} agent(s)[/bold green]\n")
 
     for idx, name in enumerate(roster, 1):
-        config = BATTLE_AGENT_CONFIGS[name]
-        training = BATTLE_TRAINING_CONFIGS[name]
         agent_seed = seed + idx * 101
+        if name in HEURISTICS:
+            console.print(f"[bold cyan]📏 Agent {idx}/{len(roster)}: {name} (heuristic, no training)[/bold cyan]")
+            requests = HEURISTIC_REQUESTS // 20 if fast else HEURISTIC_REQUESTS
+            run_heuristic_baseline(name, agent_seed, requests)
+            continue
 
-        effective_training = training
-        if fast:
-            effective_training = TrainingConfig(
-                timesteps=max(training.timesteps // 20, 5_000),
-                tensorboard_log=training.tensorboard_log,
-                save_path=training.save_path,
-                eval_freq=max(training.eval_freq // 5, 1_000),
-            )
+        config = BATTLE_AGENT_CONFIGS[name]
+        effective_training = _effective_training(name, fast)
 
         console.print(f"[bold magenta]{'=' * 72}[/bold magenta]")
         console.print(f"[bold cyan]🤖 Agent {idx}/{len(roster)}: {config.name}[/bold cyan]")
         console.print(f"[bold magenta]{'=' * 72}[/bold magenta]\n")
         console.print(f"  Architecture: {config.net_arch}")
         console.print(f"  Timesteps: {effective_training.timesteps:,}")
+        console.print(f"  Rollout envs: {effective_training.n_envs} ({effective_training.vec_env})")
         console.print(f"  Reward: {config.reward_id}\n")
+        checkpoint = latest_checkpoint(checkpoint_dir(effective_training.save_path)) if resume else None
+        if checkpoint is not None:
+            console.print(f"  [yellow]↻ Resuming from {checkpoint}[/yellow]\n")
 
         builder = AgentBuilder(
             config=config,
@@ -78,29 +147,209 @@ def run_training(selected_agents: Iterable[str], seed: int, fast: bool = False)
             reward_fn=build_reward(config.reward_id),
         )
         start = time.time()
-        train_agent(builder, effective_training, agent_seed)
+        train_agent(builder, effective_training, agent_seed, resume=resume, fresh=fresh)
         elapsed = time.time() - start
         console.print(f"\n[bold green]✓ {config.name} finished in {elapsed/60:.1f} min[/bold green]\n")
 
     console.print("\n[bold green]🎉 ALL TRAINING COMPLETED![/bold green]\n")
 
 
+@dataclass(frozen=True)
+class TrainingJob:
+    """One agent of a concurrent run and the CPU slice it trains on."""
+
+    name: str
+    seed: int
+    training: TrainingConfig
+    intra_op_threads: int = 1
+    inter_op_threads: int = 1
+    resume: bool = False
+    fresh: bool = False
+
+
+class ProgressQueueCallback(BaseCallback):
+    """Reports ``num_timesteps`` of a worker's model to the parent through ``queue``."""
+
+    def __init__(self, queue, name: str, every: int = 1_000) -> None:
+        super().__init__()
+        self.queue = queue
+        self.name = name
+        self.every = every
+        self._last = 0
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps - self._last >= self.every:
+            self._last = self.num_timesteps
+            self.queue.put((self.name, self.num_timesteps))
+        return True
+
+
+def plan_jobs(
+    roster: Iterable[str],
+    seed: int,
+    fast: bool = False,
+    jobs: int = 2,
+    cpu_threads: Optional[int] = None,
+    resume: bool = False,
+    fresh: bool = False,
+) -> List[TrainingJob]:
+    """Trainable agents of ``roster``, longest first, each with its share of ``cpu_threads``.
+
+    Longest-first keeps the pool packed: the long jobs start immediately and
+    the short ones fill the slots they leave. Each of the ``jobs`` slots gets an
+    equal share of the hardware threads, minus the rollout worker processes of
+    the agent running in it.
+    """
+
+    cpu_threads = cpu_threads or os.cpu_count() or 1
+    slot_threads = max(cpu_threads // max(jobs, 1), 1)
+    planned = []
+    for idx, name in enumerate(roster, 1):
+        if name in HEURISTICS:
+            continue
+        training = _effective_training(name, fast)
+        intra_op = max(slot_threads - _env_workers(training), 1)
+        planned.append(
+            TrainingJob(
+                name=name,
+                seed=seed + idx * 101,
+                training=training,
+                intra_op_threads=intra_op,
+                inter_op_threads=max(intra_op // 2, 1),
+                resume=resume,
+                fresh=fresh,
+            )
+        )
+    planned.sort(key=lambda job: job.training.timesteps, reverse=True)
+    return planned
+
+
+def _train_job(job: TrainingJob, queue) -> Tuple[str, float]:
+    configure_thread_budget(job.intra_op_threads, job.inter_op_threads)
+    config = BATTLE_AGENT_CONFIGS[job.name]
+    factory = EnvironmentFactory(base_kwargs=ENVIRONMENT.as_dict(), fast=ENVIRONMENT.fast_path)
+    builder = AgentBuilder(config=config, factory=factory, reward_fn=build_reward(config.reward_id))
+    start = time.time()
+    train_agent(
+        builder,
+        job.training,
+        job.seed,
+        callbacks=[ProgressQueueCallback(queue, job.name, every=max(job.training.timesteps // 200, 1))],
+        quiet=True,
+        resume=job.resume,
+        fresh=job.fresh,
+    )
+    return job.name, time.time() - start
+
+
+def run_concurrent_training(
+    roster: Iterable[str],
+    seed: int,
+    fast: bool = False,
+    jobs: int = 2,
+    resume: bool = False,
+    fresh: bool = False,
+) -> None:
+    """Train up to ``jobs`` agents at a time in a process pool, one progress bar per agent.
+
+    Every job runs in a fresh spawned process (torch thread pools cannot be
+    resized once used) pinned to its thread budget from ``plan_jobs``.
+    Heuristics are evaluated in this process before the pool starts. Seeds are
+    the ones of the serial run, so each agent trains exactly as it would there.
+    """
+
+    roster = list(roster)
+    for idx, name in enumerate(roster, 1):
+        if name in HEURISTICS:
+            console.print(f"[bold cyan]📏 {name} (heuristic, no training)[/bold cyan]")
+            requests = HEURISTIC_REQUESTS // 20 if fast else HEURISTIC_REQUESTS
+            run_heuristic_baseline(name, seed + idx * 101, requests)
+
+    planned = plan_jobs(roster, seed, fast=fast, jobs=jobs, resume=resume, fresh=fresh)
+    if not planned:
+        return
+    slots = min(jobs, len(planned))
+
+    table = Table(title=f"Concurrent training: {len(planned)} agent(s), {slots} at a time")
+    table.add_column("Agent", style="cyan")
+    table.add_column("Timesteps", justify="right")
+    table.add_column("Rollout envs", justify="right")
+    table.add_column("Torch threads (intra/inter)", justify="right")
+    for job in planned:
+        table.add_row(
+            job.name,
+            f"{job.training.timesteps:,}",
+            f"{job.training.n_envs} ({job.training.vec_env})",
+            f"{job.intra_op_threads}/{job.inter_op_threads}",
+        )
+    console.print(table)
+
+    context = mp.get_context("spawn")
+    start = time.time()
+    with context.Manager() as manager, Progress(
+        TextColumn("[bold cyan]{task.description:<16}"),
+        BarColumn(),
+        TextColumn("{task.completed:>10,.0f}/{task.total:,.0f}"),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        queue = manager.Queue()
+        tasks = {job.name: progress.add_task(job.name, total=job.training.timesteps) for job in planned}
+        with ProcessPoolExecutor(max_workers=slots, mp_context=context, max_tasks_per_child=1) as pool:
+            pending = {pool.submit(_train_job, job, queue) for job in planned}
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                while not queue.empty():
+                    name, timesteps = queue.get()
+                    progress.update(tasks[name], completed=timesteps)
+                for future in done:
+                    name, elapsed = future.result()
+                    progress.update(tasks[name], completed=progress.tasks[tasks[name]].total)
+                    progress.console.print(f"[bold green]✓ {name} finished in {elapsed/60:.1f} min[/bold green]")
+
+    console.print(
+        f"\n[bold green]🎉 ALL TRAINING COMPLETED![/bold green] "
+        f"({len(planned)} agents in {(time.time() - start)/60:.1f} min)\n"
+    )
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Train RMSA Battle Royale agents")
     parser.add_argument(
         "--agents",
         nargs="*",
         default=["CONTROL", "ULTHO", "HYPERQ-OPT", "BOHAMIANN", "DEEPRMSA-QOT", "META-LEARNING"],
-        help="Subset of agents to train (case insensitive).",
+        help="Subset of agents to train (case insensitive). Heuristics "
+        f"({', '.join(HEURISTICS)}) are evaluated instead of trained.",
     )
     parser.add_argument("--seed", type=int, default=42, help="Base random seed")
     parser.add_argument("--fast", action="store_true", help="Run a fast smoke-test training (5% timesteps)")
+    checkpoints = parser.add_mutually_exclusive_group()
+    checkpoints.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each agent from its latest checkpoint (written every TrainingConfig.save_freq steps)",
+    )
+    checkpoints.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Delete previous checkpoints instead of moving them aside (<model>_checkpoints.prev-<time>)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Agents trained concurrently, each on its share of the CPU threads (1 = one after another)",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    run_training(args.agents, args.seed, fast=args.fast)
+    run_training(
+        args.agents, args.seed, fast=args.fast, jobs=args.jobs, resume=args.resume, fresh=args.fresh
+    )
 
 
 if __name__ == "__main__":
@@ -100,7 +100,7 @@ BOHAMIANN_AGENT = AgentArch(
 # 5. Agente DEEPRMSA-QOT (GAT)
 DEEPRMSA_QOT_AGENT = AgentArch(
     name="DEEPRMSA-QOT",
-    policy="GatPolicy", # Política custom basada en Graph Attention Network
+    policy="GatPolicy", # Graph Attention Network sobre el grafo de enlaces (feature_extractors.GatExtractor)
     net_arch={"gat_layers": 2, "gat_hidden_dim": 128}, # Arq. para GAT
     activation="elu",
     reward_id="qot_aware",
@@ -0,0 +1,434 @@
+"""Native batched vector environment: N RMSA networks in one spectrum tensor.
+
+``RMSAVecEnv`` implements the Stable-Baselines3 ``VecEnv`` interface without one
+``RMSAEnv`` per sub-environment. The spectrum of every network lives in a single
+``(num_envs, num_edges + 1, num_freq_slots)`` array (the extra row is an always
+free padding edge that absorbs the ``-1`` entries of padded paths), and request
+generation, routing, reach checks, slot search, allocation and release are done
+with batched numpy operations across all sub-environments.
+
+Semantics follow ``RMSAEnv`` with ``observation_mode="full"``: same action
+decoding, reach/slot rules, dynamic traffic and info metrics. One
+``TrafficGenerator`` stream feeds all sub-environments, so trajectories are
+statistically (not bitwise) equivalent to N independent ``RMSAEnv`` instances.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, VecEnvIndices
+
+from reward_functions import RewardFunction
+from rmsa_environment import BIT_RATES, RMSAEnv
+from spectrum import clear_ranges, largest_free_block, tightest_fitting_block
+
+VEC_FIT_STRATEGIES = ("first_fit", "last_fit", "best_fit")
+
+
+class RMSAVecEnv(VecEnv):
+    """``num_envs`` independent RMSA networks stepped as one batch.
+
+    ``env_kwargs`` are the ``RMSAEnv`` constructor arguments; a template env is
+    built once for its routing tables and spaces. ``reward_fn`` is deep-copied per
+    sub-environment and applied like ``RewardShapingWrapper`` does.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        reward_fn: Optional[RewardFunction] = None,
+        seed: Optional[int] = None,
+        **env_kwargs: Any,
+    ) -> None:
+        template = RMSAEnv(seed=seed, **env_kwargs)
+        if template.observation_mode != "full":
+            raise ValueError("RMSAVecEnv only supports observation_mode='full'")
+        if template.spectrum_assignment not in VEC_FIT_STRATEGIES:
+            raise ValueError(
+                f"Unknown spectrum assignment for RMSAVecEnv: {template.spectrum_assignment}. "
+                f"Available: {', '.join(VEC_FIT_STRATEGIES)}"
+            )
+
+        self._template = template
+        self.render_mode = None
+        self.episode_length = template.episode_length
+        self.num_nodes = template.num_nodes
+        self.num_edges = template.num_edges
+        self.num_freq_slots = template.num_freq_slots
+        self.num_modulations = template.num_modulations
+        self.dynamic_traffic = template.dynamic_traffic
+        self.mean_holding_time = template.mean_holding_time
+        self.copy_observation = template.copy_observation
+        self.spectrum_assignment = template.spectrum_assignment
+        self.path_table = template.path_table
+        self.slot_table = template.slot_table
+        self._bit_rates = np.asarray(BIT_RATES, dtype=np.float64)
+
+        super().__init__(num_envs, template.observation_space, template.action_space)
+
+        n, e, f = num_envs, self.num_edges, self.num_freq_slots
+        self._env_idx = np.arange(n)
+        self._slot_idx = np.arange(f)
+
+        # Spectrum tensor; row ``e`` of every network is the padding edge
+        self.spectrum = np.zeros((n, e + 1, f), dtype=np.int8)
+        self._edge_occupancy = np.zeros((n, e + 1), dtype=np.int32)
+        self._edge_transitions = np.zeros((n, e + 1), dtype=np.int32)
+        self._slot_occupancy = np.zeros((n, f), dtype=np.int32)
+        self._occupied_total = np.zeros(n, dtype=np.int64)
+        self._transitions_total = np.zeros(n, dtype=np.int64)
+
+        # Active lightpaths, one column per connection (departure == inf when free)
+        max_hops = self.path_table.max_hops
+        self._conn_departure = np.full((n, 64), np.inf)
+        self._conn_start = np.zeros((n, 64), dtype=np.int32)
+        self._conn_slots = np.zeros((n, 64), dtype=np.int32)
+        self._conn_edges = np.full((n, 64, max_hops), e, dtype=np.int32)
+        self._active = np.zeros(n, dtype=np.int32)
+
+        # Current requests and per-network episode state
+        self.source = np.zeros(n, dtype=np.intp)
+        self.destination = np.zeros(n, dtype=np.intp)
+        self.bit_rate = np.zeros(n, dtype=np.float64)
+        self.bit_rate_class = np.zeros(n, dtype=np.intp)
+        self.arrival_time = np.zeros(n, dtype=np.float64)
+        self.holding_time = np.zeros(n, dtype=np.float64)
+        self.clock = np.zeros(n, dtype=np.float64)
+        self.num_requests = np.zeros(n, dtype=np.int64)
+        self.allocated = np.zeros(n, dtype=np.int64)
+        self.blocked = np.zeros(n, dtype=np.int64)
+
+        # Persistent (num_envs, obs_size) buffer with the same layout as RMSAEnv
+        obs_size = template.observation_space.shape[0]
+        self._obs = np.zeros((n, obs_size), dtype=np.float32)
+        offset = 0
+        self._obs_source = self._obs[:, offset : offset + self.num_nodes]
+        offset += self.num_nodes
+        self._obs_destination = self._obs[:, offset : offset + self.num_nodes]
+        offset += self.num_nodes
+        self._obs_bit_rate = self._obs[:, offset]
+        offset += 1
+        self._obs_spectrum = self._obs[:, offset : offset + e * f].reshape(n, e, f)
+        offset += e * f
+        self._obs_link_util = self._obs[:, offset : offset + e]
+
+        self._reward_fns: Optional[List[RewardFunction]] = None
+        if reward_fn is not None:
+            self._reward_fns = [copy.deepcopy(reward_fn) for _ in range(n)]
+
+        # One request stream (generator or trace replay) shared by all networks
+        self.traffic = template.traffic
+        self._actions = np.zeros(n, dtype=np.int64)
+
+    # ------------------------------------------------------------------ VecEnv API
+
+    def reset(self) -> np.ndarray:
+        if self._seeds[0] is not None:
+            self.traffic.seed(self._seeds[0])
+        self._reset_seeds()
+        self._reset_envs(self._env_idx)
+        self._write_requests()
+        return self._observation()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self._actions
+        n = self.num_envs
+        path_idx = actions // self.num_modulations
+        mod_idx = actions % self.num_modulations
+        src, dst = self.source, self.destination
+
+        # Path existence, reach and slot count for every network in one lookup
+        required = self.slot_table[src, dst, path_idx, mod_idx, self.bit_rate_class].astype(np.int64)
+        candidates = required > 0
+
+        allocated = np.zeros(n, dtype=bool)
+        touched = []
+        envs = np.flatnonzero(candidates)
+        if envs.size:
+            edges = self.path_table.edge_ids[src[envs], dst[envs], path_idx[envs]]
+            edges = np.where(edges < 0, self.num_edges, edges)
+            slots, found = self._find_slots(envs, edges, required[envs])
+            allocated[envs[found]] = True
+            if np.any(found):
+                touched.append(self._allocate(envs[found], edges[found], slots[found], required[envs[found]]))
+
+        self.allocated += allocated
+        self.blocked += ~allocated
+        self.num_requests += 1
+        terminated = self.num_requests >= self.episode_length
+        rewards = np.where(allocated, 1.0, -1.0).astype(np.float32)
+
+        # Next request and departures before it arrives, for networks still running
+        running = np.flatnonzero(~terminated)
+        if running.size:
+            self._generate_requests(running)
+            if self.dynamic_traffic:
+                touched.append(self._release_expired(running))
+        if touched:
+            self._sync_rows(np.concatenate(touched))
+
+        self._write_requests()
+        infos = self._infos(allocated)
+
+        if self._reward_fns is not None:
+            for i, reward_fn in enumerate(self._reward_fns):
+                shaped = reward_fn(self._obs[i], int(actions[i]), float(rewards[i]), bool(terminated[i]), infos[i])
+                infos[i]["shaped_reward"] = shaped
+                rewards[i] = shaped
+
+        # Auto-reset finished networks, keeping their last observation in the info
+        done_envs = np.flatnonzero(terminated)
+        if done_envs.size:
+            terminal = self._obs[done_envs].copy()
+            for row, i in enumerate(done_envs):
+                infos[i]["terminal_observation"] = terminal[row]
+                infos[i]["TimeLimit.truncated"] = False
+            self._reset_envs(done_envs)
+            self._write_requests()
+
+        return self._observation(), rewards, terminated, infos
+
+    def close(self) -> None:
+        return None
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        """Attributes are shared by every network, so they are read from the template env."""
+        value = getattr(self._template, attr_name)
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        setattr(self._template, attr_name, value)
+
+    def env_method(
+        self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs
+    ) -> List[Any]:
+        """Call a batched method of this class and split its result per network."""
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result[i] for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        return [False for _ in self._get_indices(indices)]
+
+    def candidate_paths(self):
+        """Per-network view of the current request's candidate paths.
+
+        Returns ``required`` ``(N, k, M)`` slots from ``slot_table`` (-1 if
+        infeasible), the joint ``occupied`` spectrum ``(N, k, F)`` of each path and
+        its ``hops`` ``(N, k)``.
+        """
+        pair_slots = self.slot_table[self.source, self.destination]  # (N, k, M, B)
+        required = pair_slots[self._env_idx, :, :, self.bit_rate_class]
+        edges = self.path_table.edge_ids[self.source, self.destination]  # (N, k, H)
+        edges = np.where(edges < 0, self.num_edges, edges)
+        occupied = self.spectrum[self._env_idx[:, None, None], edges].any(axis=2)
+        return required, occupied, self.path_table.hops[self.source, self.destination]
+
+    def action_masks(self) -> np.ndarray:
+        """``(num_envs, n_actions)`` mask with the semantics of ``RMSAEnv.action_masks``."""
+        required, occupied, _ = self.candidate_paths()
+        largest = largest_free_block(occupied)  # (N, k)
+
+        mask = (required > 0) & (required <= largest[:, :, None])
+        mask = mask.reshape(self.num_envs, -1)
+        mask[~mask.any(axis=1)] = True
+        return mask
+
+    # ------------------------------------------------------------------ internals
+
+    def _reset_envs(self, envs: np.ndarray) -> None:
+        self.spectrum[envs] = 0
+        self._edge_occupancy[envs] = 0
+        self._edge_transitions[envs] = 0
+        self._slot_occupancy[envs] = 0
+        self._occupied_total[envs] = 0
+        self._transitions_total[envs] = 0
+        self._conn_departure[envs] = np.inf
+        self._active[envs] = 0
+        self._obs[envs] = 0.0
+        self.clock[envs] = 0.0
+        self.num_requests[envs] = 0
+        self.allocated[envs] = 0
+        self.blocked[envs] = 0
+        self._generate_requests(envs)
+
+    def _generate_requests(self, envs: np.ndarray) -> None:
+        count = envs.size
+        requests = self.traffic.take(count)
+        self.source[envs] = requests["source"]
+        self.destination[envs] = requests["destination"]
+        self.bit_rate_class[envs] = requests["bit_rate_class"]
+        self.bit_rate[envs] = self._bit_rates[requests["bit_rate_class"]]
+        self.holding_time[envs] = requests["holding_time"]
+        self.clock[envs] += requests["inter_arrival"]
+        self.arrival_time[envs] = self.clock[envs]
+
+    def _find_slots(self, envs: np.ndarray, edges: np.ndarray, required: np.ndarray):
+        """First/last/best-fit start slot per network; returns ``(slots, found)``."""
+        occupied = self.spectrum[envs[:, None], edges].any(axis=1)
+        if self.spectrum_assignment == "best_fit":
+            slots, lengths = tightest_fitting_block(occupied, required)
+            return slots, lengths > 0
+
+        free_prefix = np.zeros((envs.size, self.num_freq_slots + 1), dtype=np.int32)
+        np.cumsum(~occupied, axis=1, out=free_prefix[:, 1:])
+
+        ends = self._slot_idx[None, :] + required[:, None]
+        in_range = ends <= self.num_freq_slots
+        window = np.take_along_axis(free_prefix, np.minimum(ends, self.num_freq_slots), axis=1)
+        fits = in_range & (window - free_prefix[:, :-1] == required[:, None])
+
+        found = fits.any(axis=1)
+        if self.spectrum_assignment == "last_fit":
+            slots = self.num_freq_slots - 1 - fits[:, ::-1].argmax(axis=1)
+        else:
+            slots = fits.argmax(axis=1)
+        return slots, found
+
+    def _allocate(
+        self, envs: np.ndarray, edges: np.ndarray, slots: np.ndarray, required: np.ndarray
+    ) -> np.ndarray:
+        """Occupy the chosen block on every path; returns the flat ids of the touched rows."""
+        ranges = (self._slot_idx[None, :] >= slots[:, None]) & (self._slot_idx[None, :] < (slots + required)[:, None])
+        rows = envs[:, None], edges
+        self.spectrum[rows] |= ranges[:, None, :].astype(np.int8)
+        self.spectrum[:, self.num_edges] = 0
+
+        hops = (edges < self.num_edges).sum(axis=1)
+        # (env, edge) pairs are unique apart from the padding edge, reset just below
+        self._edge_occupancy[rows] += required[:, None].astype(np.int32)
+        self._edge_occupancy[:, self.num_edges] = 0
+        self._slot_occupancy[envs] += ranges * hops[:, None].astype(np.int32)
+        self._occupied_total[envs] += required * hops
+
+        if self.dynamic_traffic:
+            self._add_connections(envs, edges, slots, required)
+
+        rows = envs[:, None] * (self.num_edges + 1) + edges
+        return rows[edges < self.num_edges]
+
+    def _add_connections(self, envs: np.ndarray, edges: np.ndarray, slots: np.ndarray, required: np.ndarray) -> None:
+        free = np.isinf(self._conn_departure[envs])
+        while not free.any(axis=1).all():
+            self._grow_connections()
+            free = np.isinf(self._conn_departure[envs])
+        cols = free.argmax(axis=1)
+        self._conn_departure[envs, cols] = self.arrival_time[envs] + self.holding_time[envs]
+        self._conn_start[envs, cols] = slots
+        self._conn_slots[envs, cols] = required
+        self._conn_edges[envs, cols] = edges
+        self._active[envs] += 1
+
+    def _grow_connections(self) -> None:
+        n, capacity = self._conn_departure.shape
+        self._conn_departure = np.concatenate([self._conn_departure, np.full((n, capacity), np.inf)], axis=1)
+        self._conn_start = np.concatenate([self._conn_start, np.zeros_like(self._conn_start)], axis=1)
+        self._conn_slots = np.concatenate([self._conn_slots, np.zeros_like(self._conn_slots)], axis=1)
+        self._conn_edges = np.concatenate(
+            [self._conn_edges, np.full_like(self._conn_edges, self.num_edges)], axis=1
+        )
+
+    def _release_expired(self, envs: np.ndarray) -> np.ndarray:
+        """Release every lightpath of ``envs`` departing at or before its current clock.
+
+        Returns the flat ids of the touched spectrum rows.
+        """
+        expired = self._conn_departure <= self.clock[:, None]
+        if envs.size < self.num_envs:
+            expired[np.setdiff1d(self._env_idx, envs)] = False
+        env_ids, cols = np.nonzero(expired)
+        if env_ids.size == 0:
+            return np.zeros(0, dtype=np.intp)
+        edges = self._conn_edges[env_ids, cols]
+        starts = self._conn_start[env_ids, cols]
+        lengths = self._conn_slots[env_ids, cols]
+        self._conn_departure[env_ids, cols] = np.inf
+        np.subtract.at(self._active, env_ids, 1)
+
+        real = edges < self.num_edges
+        per_hop = real.sum(axis=1)
+        hop_envs = np.repeat(env_ids, per_hop)
+        hop_edges = edges[real]
+        hop_starts = np.repeat(starts, per_hop)
+        hop_lengths = np.repeat(lengths, per_hop)
+
+        hop_rows = hop_envs * (self.num_edges + 1) + hop_edges
+        clear_ranges(self.spectrum.reshape(-1, self.num_freq_slots), hop_rows, hop_starts, hop_lengths)
+        np.subtract.at(self._edge_occupancy.reshape(-1), hop_rows, hop_lengths)
+        np.subtract.at(self._occupied_total, env_ids, lengths * per_hop)
+
+        delta = np.zeros((self.num_envs, self.num_freq_slots + 1), dtype=np.int32)
+        np.add.at(delta, (env_ids, starts), per_hop)
+        np.add.at(delta, (env_ids, starts + lengths), -per_hop)
+        self._slot_occupancy -= np.cumsum(delta[:, :-1], axis=1, dtype=np.int32)
+        return hop_rows
+
+    def _sync_rows(self, rows: np.ndarray) -> None:
+        """Refresh observation rows and transition counts of the flat spectrum ``rows``."""
+        rows = np.unique(rows)
+        envs, edges = np.divmod(rows, self.num_edges + 1)
+        state = self.spectrum.reshape(-1, self.num_freq_slots)[rows]
+        self._obs_spectrum[envs, edges] = state
+        self._obs_link_util[envs, edges] = self._edge_occupancy.reshape(-1)[rows] / self.num_freq_slots
+
+        transitions = self._edge_transitions.reshape(-1)
+        counts = np.count_nonzero(state[:, 1:] != state[:, :-1], axis=1)
+        np.add.at(self._transitions_total, envs, counts - transitions[rows])
+        transitions[rows] = counts
+
+    def _observation(self) -> np.ndarray:
+        return self._obs.copy() if self.copy_observation else self._obs
+
+    def _write_requests(self) -> None:
+        """Write the current request of every network into the observation buffer."""
+        self._obs_source.fill(0.0)
+        self._obs_destination.fill(0.0)
+        self._obs_source[self._env_idx, self.source] = 1.0
+        self._obs_destination[self._env_idx, self.destination] = 1.0
+        self._obs_bit_rate[:] = self.bit_rate / 400.0
+
+    def _infos(self, allocated: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-network info dicts with the numeric metrics of ``RMSAEnv._get_info``."""
+        requests = np.maximum(self.num_requests, 1)
+        total_slots = self.num_edges * self.num_freq_slots
+        slot_share = self._slot_occupancy / self.num_edges
+        load_balance = 1.0 - np.sqrt(slot_share * (1.0 - slot_share)).mean(axis=1)
+        max_transitions = max(self.num_edges * (self.num_freq_slots - 1), 1)
+
+        columns = zip(
+            allocated.tolist(),
+            (self.blocked / requests).tolist(),
+            (self.allocated / requests).tolist(),
+            (self._occupied_total / total_slots).tolist(),
+            (self._transitions_total / max_transitions).tolist(),
+            load_balance.tolist(),
+            self.num_requests.tolist(),
+            self._active.tolist(),
+            self.clock.tolist(),
+        )
+        return [
+            {
+                "allocation_success": ok,
+                "blocking_probability": blocking,
+                "acceptance_rate": acceptance,
+                "spectral_efficiency": utilization,
+                "fragmentation": fragmentation,
+                "qot": 0.8 if ok else 0.0,
+                "load_balance": balance,
+                "steps": steps,
+                "active_connections": active,
+                "sim_time": clock,
+            }
+            for ok, blocking, acceptance, utilization, fragmentation, balance, steps, active, clock in columns
+        ]
+
+    def spectrum_state(self, index: int) -> np.ndarray:
+        """Dense ``int8`` spectrum of network ``index`` (without the padding edge)."""
+        return self.spectrum[index, : self.num_edges].copy()
+
+
+__all__ = ["RMSAVecEnv", "VEC_FIT_STRATEGIES"]